@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from wordaxe.ahocorasick import AhoCorasick
+from wordaxe.DCWHyphenator import DCWHyphenator
+
+
+def brute_force(keys, text):
+    "All occurrences, computed by trying every key at every position."
+    return sorted([(start, start + len(key), key)
+                   for key in keys
+                   for start in range(len(text))
+                   if text.startswith(key, start)],
+                  key=lambda x: (x[1], -len(x[2])))
+
+
+class AhoCorasickTestCase(unittest.TestCase):
+    "Test the Aho-Corasick automaton and the piece lattice of DCWHyphenator."
+
+    def test_find_all(self):
+        keys = [u"he", u"she", u"his", u"hers", u"s", u"\xfcber"]
+        automaton = AhoCorasick()
+        for key in keys:
+            automaton.add(key, key)
+        for text in [u"ushers", u"shishe", u"", u"x", u"h\xfcber"]:
+            self.assertEqual(automaton.find_all(text), brute_force(keys, text))
+
+    def test_add_after_find(self):
+        automaton = AhoCorasick()
+        automaton.add(u"ab", 1)
+        self.assertEqual(automaton.find_all(u"abc"), [(0, 2, 1)])
+        automaton.add(u"bc", 2)
+        self.assertEqual(automaton.find_all(u"abc"), [(0, 2, 1), (1, 3, 2)])
+
+    def test_piece_lattice(self):
+        hyphenator = DCWHyphenator("DE", 5)
+        word = u"silbentrennungsalgorithmus"
+        lattice = hyphenator._piece_lattice(word)
+        for start in range(len(word) + 1):
+            for kind, abschnitt in enumerate([hyphenator.prefixes, hyphenator.roots, hyphenator.suffixes]):
+                expected = [(order, word[start:start+lae], start + lae, L[word[start:start+lae]])
+                            for order, (lae, L) in enumerate(abschnitt)
+                            if word[start:start+lae] in L]
+                self.assertEqual([(order, piece, end, [candidate.props for candidate, checks in candidates])
+                                  for order, piece, end, candidates in lattice[start][kind]],
+                                 expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
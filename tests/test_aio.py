@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from wordaxe.hyphen import Hyphenator, HyphenatedWord
+from wordaxe.aio import AsyncHyphenator
+from wordaxe.DCWHyphenator import DCWHyphenator
+
+
+class SlowHyphenator(Hyphenator):
+    "A trivial hyphenator that records the calls and the concurrency."
+
+    def __init__(self, delay=0.02):
+        Hyphenator.__init__(self, "DE")
+        self.delay = delay
+        self.words = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def i_hyphenate(self, aWord):
+        with self.lock:
+            self.words.append(aWord)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return HyphenatedWord(aWord, hyphenations=[])
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AsyncHyphenatorTestCase(unittest.TestCase):
+    "Test the asyncio facade."
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(8)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_ahyphenate(self):
+        hyphenator = DCWHyphenator("DE", 5)
+        ahyph = AsyncHyphenator(hyphenator, self.executor)
+        hword = run(ahyph.ahyphenate(u"Silbentrennungsverfahren"))
+        expected = hyphenator.hyphenate(u"Silbentrennungsverfahren")
+        self.assertEqual([repr(hp) for hp in hword.hyphenations],
+                         [repr(hp) for hp in expected.hyphenations])
+
+    def test_merge_and_limit(self):
+        hyphenator = SlowHyphenator()
+        ahyph = AsyncHyphenator(hyphenator, self.executor, max_concurrency=2)
+        words = [u"eins", u"zwei", u"drei", u"vier"] * 3
+        async def main():
+            return await asyncio.gather(*[ahyph.ahyphenate(w) for w in words])
+        results = run(main())
+        self.assertEqual([hw[:] for hw in results], words)
+        self.assertEqual(sorted(hyphenator.words), sorted(set(words)))
+        self.assertTrue(results[0] is results[4])
+        self.assertEqual(hyphenator.max_running, 2)
+        self.assertEqual(ahyph.stats(), {"requests": 12, "merged": 8, "in_progress": 0})
+
+    def test_ahyphenate_many(self):
+        hyphenator = SlowHyphenator(0.001)
+        ahyph = AsyncHyphenator(hyphenator, self.executor, max_concurrency=3, chunk_size=4)
+        words = [u"w%d" % (i % 20) for i in range(50)]
+        async def main():
+            return await asyncio.gather(ahyph.ahyphenate_many(words),
+                                        ahyph.ahyphenate(u"w3"),
+                                        ahyph.ahyphenate_many([u"w1", u"neu"]))
+        many, single, other = run(main())
+        self.assertEqual([hw[:] for hw in many], words)
+        self.assertTrue(single is many[3])
+        self.assertTrue(other[0] is many[1])
+        self.assertEqual(sorted(hyphenator.words), sorted(set(words + [u"neu"])))
+        self.assertTrue(hyphenator.max_running <= 3)
+
+    def test_errors(self):
+        class Failing(SlowHyphenator):
+            def i_hyphenate(self, aWord):
+                raise RuntimeError(aWord)
+        ahyph = AsyncHyphenator(Failing(), self.executor)
+        self.assertRaises(RuntimeError, run, ahyph.ahyphenate(u"Wort"))
+        self.assertRaises(RuntimeError, run, ahyph.ahyphenate_many([u"Wort", u"Satz"]))
+        self.assertEqual(ahyph.stats()["in_progress"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
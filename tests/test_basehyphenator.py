@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from wordaxe.hyphen import SHY
+from wordaxe.BaseHyphenator import Stripper, BaseHyphenator
+
+
+def points(hword):
+    if hword is None:
+        return None
+    return [(hp.indx, hp.quality, hp.sl) for hp in hword.hyphenations]
+
+
+class StripperTestCase(unittest.TestCase):
+    "Test stripping prefix and suffix characters."
+
+    def test_strip(self):
+        stripper = Stripper()
+        self.assertEqual(stripper.strip(u"(Wie denn?"), (u"(", u"Wie denn", u"?"))
+        self.assertEqual(stripper.strip(u"\"Wort\"."), (u"\"", u"Wort\"", u"."))
+        self.assertEqual(stripper.strip(u"(("), (u"((", u"", u""))
+        self.assertEqual(stripper.strip(u"))"), (u"", u"", u"))"))
+        self.assertEqual(Stripper(u"", u"").strip(u"(a)"), (u"", u"(a)", u""))
+
+
+class BaseHyphenatorTestCase(unittest.TestCase):
+    "Test the hyphenation points found by the BaseHyphenator."
+
+    def test_points(self):
+        h = BaseHyphenator("DE", 4)
+        self.assertEqual(points(h.hyphenate(u"Exklusiv-Demo")), [(9, 9, u"")])
+        self.assertEqual(points(h.hyphenate(u"no_data_found")), [(3, 5, SHY), (8, 5, SHY)])
+        self.assertEqual(points(h.hyphenate(u"Silben\xadtrennung")), [(7, 9, u"")])
+        self.assertEqual(points(h.hyphenate(u"reportlab.users")), [(10, 5, SHY)])
+        self.assertEqual(points(h.hyphenate(u"18.10.2003")), None)
+        self.assertEqual(points(h.hyphenate(u"z.B.")), [])
+        self.assertEqual(points(h.hyphenate(u"ab.\xa0cd")), None)
+        self.assertEqual(points(h.hyphenate(u"Wort")), None)
+        self.assertEqual(points(h.hyphenate(u"-12345")), None)
+
+    def test_camel_case(self):
+        h = BaseHyphenator("DE", 4, CamelCase=True)
+        self.assertEqual(points(h.hyphenate(u"CamelCase")), [(5, 5, SHY)])
+        self.assertEqual(points(h.hyphenate(u"getÄrgerNicht-Wert")),
+                         [(3, 5, SHY), (8, 5, SHY), (14, 9, u"")])
+        self.assertEqual(points(h.hyphenate(u"iPhone")), None)
+        # letters outside the BMP
+        self.assertEqual(points(h.hyphenate(u"ab\U00010428\U00010400\U00010428cd_Fgh")),
+                         [(3, 5, SHY), (8, 5, SHY)])
+        self.assertEqual(points(BaseHyphenator("DE", 4).hyphenate(u"CamelCase")), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from wordaxe import benchmark
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    "Test the benchmark suite with small corpora."
+
+    def test_generated_words_are_reproducible(self):
+        words = benchmark.generate_words("en_US", 50, seed=1)
+        self.assertEqual(len(words), 50)
+        self.assertEqual(words, benchmark.generate_words("en_US", 50, seed=1))
+        self.assertNotEqual(words, benchmark.generate_words("en_US", 50, seed=2))
+
+    def test_json_output(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            fname = os.path.join(tmpdir, "results.json")
+            benchmark.main(["-n", "30", "-r", "1", "--no-cold", "-o", fname,
+                            "ExplicitHyphenator", "PyHnjHyphenator:en_US"])
+            with open(fname) as f:
+                results = json.load(f)
+        finally:
+            shutil.rmtree(tmpdir)
+        entries = results["results"]
+        self.assertEqual([(e["hyphenator"], e["corpus"]) for e in entries],
+                         [("ExplicitHyphenator", "dokumentation_de"),
+                          ("PyHnjHyphenator", "generated_en_US")])
+        for entry in entries:
+            self.assertEqual(entry["words"], 30)
+            self.assertTrue(entry["words_per_sec"] > 0)
+            self.assertTrue(entry["latency_us"]["p50"] <= entry["latency_us"]["p99"] <= entry["latency_us"]["max"])
+            self.assertEqual(entry["construct_cold_s"], None)
+            self.assertEqual(entry["first_word_cold_s"], None)
+            self.assertTrue(entry["construct_warm_s"] >= 0)
+            self.assertTrue(entry["first_word_warm_s"] >= 0)
+
+    def test_new_hyphenator_per_run(self):
+        created = []
+        def factory(language):
+            hyphenator = benchmark.FACTORIES["ExplicitHyphenator"](language)
+            created.append(hyphenator)
+            return hyphenator
+        result = benchmark.measure(factory, "DE", [u"Silbentrennung"] * 5, runs=3)
+        self.assertEqual(len(created), 3)
+        self.assertTrue(result["words_per_sec"] > 0)
+
+    def test_construct_cold(self):
+        construct, first_word = benchmark.construct_cold("BaseHyphenator", "DE", u"Silbentrennung")
+        self.assertTrue(construct > 0 and first_word > 0)
+        self.assertEqual(benchmark.construct_cold("BaseHyphenator", "DE")[1], None)
+
+    def test_forget_shared(self):
+        from wordaxe.dcwdict import load_dictionary
+        dictionary = load_dictionary()
+        benchmark.forget_shared()
+        self.assertFalse(load_dictionary() is dictionary)
+        # (None without tracemalloc; the compiled dictionary
+        # is memory-mapped, only the rest is counted)
+        memory = benchmark.peak_memory(benchmark.FACTORIES["DCWHyphenator"], "DE", [])
+        self.assertTrue(memory is None or memory > 100000)
+
+
+if __name__ == "__main__":
+    unittest.main()
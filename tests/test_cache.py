@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from wordaxe.hyphen import SHY, Hyphenator, HyphenatedWord, HyphenationPoint, LRUCache, Cached
+from wordaxe.hyphcache import SharedCache, PersistentCache
+from wordaxe.hyphcache import encode_hyphenations, decode_hyphenations
+
+
+class CountingHyphenator(Hyphenator):
+    "A trivial hyphenator that counts how often it has been called."
+
+    def __init__(self, delay=0):
+        Hyphenator.__init__(self, "DE")
+        self.calls = 0
+        self.delay = delay
+
+    def i_hyphenate(self, aWord):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if aWord.startswith(u"x"):
+            return None # unknown
+        return HyphenatedWord(aWord, hyphenations=[])
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    "Test the LRU cache used by Cached."
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertTrue("a" in cache)
+        self.assertFalse("b" in cache)
+        self.assertTrue("c" in cache)
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_bytes=100, sizeof=lambda key, value: 40)
+        for key in "abcd":
+            cache.put(key, key)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 80)
+        self.assertEqual(cache.keys(), ["c", "d"])
+
+
+class CachedTestCase(unittest.TestCase):
+    "Test the Cached wrapper."
+
+    def test_cached(self):
+        hy = CountingHyphenator()
+        cached = Cached(hy, 10)
+        for word in [u"Wort", u"xyz", u"Wort", u"xyz"]:
+            cached.hyphenate(word)
+        self.assertEqual(hy.calls, 2)
+        self.assertEqual(cached.hyphenate(u"xyz"), None)
+        stats = cached.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 2))
+        cached.purge_cache()
+        self.assertEqual(cached.stats()["entries"], 0)
+
+    def test_no_wipe_when_full(self):
+        hy = CountingHyphenator()
+        cached = Cached(hy, 3)
+        for word in [u"eins", u"zwei", u"drei", u"eins", u"vier"]:
+            cached.hyphenate(word)
+        # "zwei" has been evicted, "eins" is still there
+        self.assertEqual(cached.stats()["entries"], 3)
+        calls = hy.calls
+        cached.hyphenate(u"eins")
+        self.assertEqual(hy.calls, calls)
+        cached.hyphenate(u"zwei")
+        self.assertEqual(hy.calls, calls + 1)
+
+
+class SharedCacheTestCase(unittest.TestCase):
+    "Test the thread-safe SharedCache backend."
+
+    def test_shared_by_wrappers(self):
+        cache = SharedCache(max_entries=100, stripes=4)
+        hy = CountingHyphenator()
+        other = CountingHyphenator()
+        other.language = "EN"
+        a = Cached(hy, cache=cache)
+        b = Cached(hy, cache=cache)
+        c = Cached(other, cache=cache)
+        a.hyphenate(u"Wort")
+        b.hyphenate(u"Wort")
+        c.hyphenate(u"Wort")
+        self.assertEqual(hy.calls, 1)
+        self.assertEqual(other.calls, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_purge_one_wrapper(self):
+        cache = SharedCache(max_entries=100, stripes=4)
+        hy = CountingHyphenator()
+        other = CountingHyphenator()
+        other.language = "EN"
+        a = Cached(hy, cache=cache)
+        b = Cached(other, cache=cache)
+        for word in [u"Wort", u"Satz"]:
+            a.hyphenate(word)
+            b.hyphenate(word)
+        self.assertEqual(len(cache), 4)
+        a.purge_cache()
+        self.assertEqual(len(cache), 2)
+        b.hyphenate(u"Wort")
+        self.assertEqual(other.calls, 2)
+        a.hyphenate(u"Wort")
+        self.assertEqual(hy.calls, 3)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_requests_are_merged(self):
+        cache = SharedCache()
+        hy = CountingHyphenator(delay=0.05)
+        results = []
+        def work():
+            results.append(Cached(hy, cache=cache).hyphenate(u"Silbentrennung"))
+        threads = [threading.Thread(target=work) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(hy.calls, 1)
+        self.assertEqual(len(results), 8)
+        for hword in results:
+            self.assertTrue(hword is results[0])
+        self.assertEqual(cache.stats()["merged"], 7)
+
+
+class PersistentCacheTestCase(unittest.TestCase):
+    "Test the SQLite based PersistentCache backend."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, "cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_encoding(self):
+        points = [HyphenationPoint(2, 5, 0, SHY, 0, u""),
+                  HyphenationPoint(4, 9, 0, u"", 0, u""),
+                  HyphenationPoint(6, 8, 1, u"k" + SHY, 0, u""),
+                  HyphenationPoint(11, 8, 0, SHY, 0, u"f"),
+                 ]
+        data = encode_hyphenations(points)
+        self.assertEqual(len(data), 3 + 3 + (3+4+3) + (3+4+2+1))
+        self.assertEqual([repr(hp) for hp in decode_hyphenations(data)],
+                         [repr(hp) for hp in points])
+
+    def test_encoding_wide(self):
+        points = [HyphenationPoint(3, 20, 0, SHY, 0, u""),
+                  HyphenationPoint(5, -1, 0, u"", 0, u""),
+                  HyphenationPoint(7, 5, 300, SHY, 0, u""),
+                  HyphenationPoint(9, 5, 0, u"x" * 200 + u"\xe4" * 30, 0, u"y"),
+                 ]
+        data = encode_hyphenations(points)
+        self.assertEqual([repr(hp) for hp in decode_hyphenations(data)],
+                         [repr(hp) for hp in points])
+        self.assertRaises(ValueError, encode_hyphenations, [HyphenationPoint(70000, 5)])
+        self.assertRaises(ValueError, encode_hyphenations, [HyphenationPoint(3, 5, 70000, SHY, 0, u"")])
+
+    def test_persistent(self):
+        hy = CountingHyphenator()
+        cache = PersistentCache(self.filename, batch_size=2)
+        cached = Cached(hy, cache=cache)
+        cached.hyphenate(u"Wort")
+        cached.hyphenate(u"xyz")
+        cached.hyphenate(u"Wort")
+        cached.hyphenate(u"Satz")
+        cache.close()
+        self.assertEqual(hy.calls, 3)
+
+        hy = CountingHyphenator()
+        cache = PersistentCache(self.filename)
+        cached = Cached(hy, cache=cache)
+        hword = cached.hyphenate(u"Satz")
+        self.assertTrue(isinstance(hword, HyphenatedWord))
+        self.assertEqual(hword, u"Satz")
+        self.assertEqual(cached.hyphenate(u"xyz"), None)
+        self.assertEqual(hy.calls, 0)
+        self.assertEqual(cache.stats()["entries"], 3)
+        # Other hyphenators use a different namespace
+        hy.language = "EN"
+        Cached(hy, cache=cache).hyphenate(u"Satz")
+        self.assertEqual(hy.calls, 1)
+        cache.close()
+
+    def test_use_after_close(self):
+        hy = CountingHyphenator()
+        cache = PersistentCache(self.filename, max_entries=10)
+        cached = Cached(hy, cache=cache)
+        cached.hyphenate(u"Wort")
+        cache.close()
+        cache.close()
+        # the database is opened again
+        self.assertEqual(cached.hyphenate(u"Wort"), u"Wort")
+        cached.hyphenate(u"Satz")
+        self.assertEqual(hy.calls, 2)
+        self.assertEqual(cache.stats()["entries"], 1)
+        cache.close()
+        other = PersistentCache(self.filename)
+        self.assertEqual(other.stats()["entries"], 2)
+        other.close()
+
+    def test_purge_one_wrapper(self):
+        hy = CountingHyphenator()
+        other = CountingHyphenator()
+        other.language = "EN"
+        cache = PersistentCache(self.filename, max_entries=10, batch_size=1)
+        a = Cached(hy, cache=cache)
+        b = Cached(other, cache=cache)
+        a.hyphenate(u"Wort")
+        b.hyphenate(u"Wort")
+        second = PersistentCache(self.filename)
+        self.assertEqual(second.stats()["entries"], 2)
+        a.purge_cache()
+        self.assertEqual(second.stats()["entries"], 1)
+        self.assertEqual(Cached(other, cache=second).hyphenate(u"Wort"), u"Wort")
+        self.assertEqual(other.calls, 1)
+        a.hyphenate(u"Wort")
+        self.assertEqual(hy.calls, 2)
+        cache.clear()
+        self.assertEqual(second.stats()["entries"], 0)
+        second.close()
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from wordaxe.hyphen import SHY, HyphenatedWord, HyphenationPoint
+from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+from wordaxe.DCWHyphenator import DCWHyphenator
+from wordaxe.wordlist import check_word_list, hyphenated_form, marked_points, read_word_list
+
+TESTDIR = os.path.dirname(os.path.abspath(__file__))
+WORDLIST = os.path.join(TESTDIR, "test_wordlist.txt")
+SPECIAL_WORDS = os.path.join(TESTDIR, "special_words.lst")
+
+
+class WordListHarnessTestCase(unittest.TestCase):
+    "Test the word list regression harness."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_helpers(self):
+        hword = HyphenatedWord(u"backen", [HyphenationPoint(3, 5, 1, u"k" + SHY, 0, u"")])
+        self.assertEqual(hyphenated_form(u"backen", hword), u"bak-ken")
+        self.assertEqual(hyphenated_form(u"backen", None), u"backen")
+        self.assertEqual(marked_points(u"C4-Analyse", u"C4-Ana-ly-se"), set([6, 8]))
+        self.assertEqual(marked_points(u"backen", u"bak-ken"), None)
+        self.assertEqual(list(read_word_list(SPECIAL_WORDS, "iso-8859-1", explicit=True))[0],
+                         (u"Bl\xfctenpracht", u"Bl\xfcten-pracht"))
+
+    def test_precision_recall(self):
+        fname = os.path.join(self.tmpdir, "words.txt")
+        with io.open(fname, "w", encoding="utf-8") as f:
+            f.write(u"# test\n\nabcdef abc-def\nghijkl ghi-jkl\n")
+        hyphenator = ExplicitHyphenator("DE", 4)
+        hyphenator.add_entries({u"abcdef": u"ab5c5def", u"ghijkl": u"ghi5jkl"})
+        diff = os.path.join(self.tmpdir, "diff.txt")
+        report = check_word_list(hyphenator, fname, diff_file=diff)
+        self.assertEqual((report.words, report.correct), (2, 1))
+        self.assertEqual((report.tp, report.fp, report.fn), (2, 1, 0))
+        self.assertEqual(report.precision(), 2 / 3.0)
+        self.assertEqual(report.recall(), 1.0)
+        with io.open(diff, encoding="utf-8") as f:
+            self.assertEqual(f.read().splitlines()[1:], [u"abcdef\tabc-def\tab-c-def"])
+
+    def test_explicit_entries(self):
+        hyphenator = ExplicitHyphenator("DE", 4)
+        hyphenator.add_entries_from_file(SPECIAL_WORDS)
+        report = check_word_list(hyphenator, SPECIAL_WORDS, "iso-8859-1", explicit=True)
+        self.assertEqual(report.words, report.correct)
+
+    def test_parallel(self):
+        hyphenator = DCWHyphenator("DE", 4)
+        serial = check_word_list(hyphenator, [WORDLIST, WORDLIST])
+        parallel = check_word_list(hyphenator, [WORDLIST, WORDLIST], processes=2, chunk_size=7)
+        self.assertEqual(parallel.words, 100)
+        self.assertEqual(parallel.mismatches, serial.mismatches)
+        for key in ["words", "correct", "precision", "recall"]:
+            self.assertEqual(parallel.as_dict()[key], serial.as_dict()[key])
+        self.assertTrue(parallel.words_per_sec() > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+import sys
+import unittest
+
+from wordaxe.hyphen import SHY, HyphenationPoint, HyphenatedWord, CompactHyphenations, Cached
+from wordaxe.DCWHyphenator import DCWHyphenator
+
+
+def points():
+    return [HyphenationPoint(5,8,0,u"f"+SHY,0,u""),
+            HyphenationPoint(11,9,0,SHY,0,u""),
+            HyphenationPoint(13,4,0,SHY,0,u""),
+            HyphenationPoint(15,4,0,u"",0,u""),
+            HyphenationPoint(19,9,0,SHY,0,u""),
+            HyphenationPoint(22,4,1,u"k"+SHY,0,u""),
+            HyphenationPoint(25,9,0,SHY,0,u""),
+           ]
+
+def texts(hword):
+    return [hword[:], [repr(hp) for hp in hword.hyphenations]]
+
+
+class CompactHyphenationsTestCase(unittest.TestCase):
+    "Test the compact representation of hyphenation points."
+
+    def setUp(self):
+        self.word = u"Schiffahrtskapit\xe4nsbackenzahn"
+        self.hword = HyphenatedWord(self.word, points())
+        self.cword = HyphenatedWord(self.word, points()).compact()
+
+    def test_sequence(self):
+        compact = self.cword.hyphenations
+        self.assertTrue(isinstance(compact, CompactHyphenations))
+        self.assertEqual(len(compact), 7)
+        self.assertEqual(repr(compact[0]), repr(points()[0]))
+        self.assertEqual(repr(compact[-1]), repr(points()[-1]))
+        self.assertEqual([repr(hp) for hp in compact[1:3]], [repr(hp) for hp in points()[1:3]])
+        self.assertEqual([repr(hp) for hp in compact], [repr(hp) for hp in points()])
+        compact[1].indx = 1 # changes a copy only
+        self.assertEqual(repr(compact[1]), repr(points()[1]))
+        listsize = sys.getsizeof(points()) + sum([sys.getsizeof(hp) for hp in points()])
+        self.assertTrue(sys.getsizeof(compact) < listsize / 2)
+
+    def test_split(self):
+        hword, cword = self.hword, self.cword
+        while hword.hyphenations:
+            left, right = hword.split(hword.hyphenations[0])
+            cleft, cright = cword.split(cword.hyphenations[0])
+            self.assertEqual(left, cleft)
+            self.assertEqual(texts(right), texts(cright))
+            hword, cword = right, cright
+
+    def test_join_prepend_append(self):
+        a = HyphenatedWord(u"Vogel", [HyphenationPoint(2,5,0,SHY,0,u"")])
+        b = HyphenatedWord(u"grippe", [HyphenationPoint(4,5,0,SHY,0,u"")])
+        joined = HyphenatedWord.join(a, b)
+        cjoined = HyphenatedWord.join(HyphenatedWord(a).compact(), HyphenatedWord(b).compact())
+        self.assertEqual(texts(joined), texts(cjoined))
+        self.assertEqual(texts(self.hword.prepend(u"(").append(u")")),
+                         texts(self.cword.prepend(u"(").append(u")")))
+
+    def test_pickle(self):
+        cword = pickle.loads(pickle.dumps(self.cword))
+        self.assertEqual(texts(cword), texts(self.hword))
+
+    def test_cached(self):
+        hyphenator = DCWHyphenator("DE", 5)
+        cached = Cached(hyphenator, 100, compact=True)
+        hword = cached.hyphenate(u"Silbentrennungsverfahren")
+        self.assertTrue(isinstance(hword.hyphenations, CompactHyphenations))
+        self.assertEqual(texts(hword), texts(hyphenator.hyphenate(u"Silbentrennungsverfahren")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import unittest
+
+import wordaxe
+from wordaxe.DCWHyphenator import DCWHyphenator
+from wordaxe.corpus import CorpusHyphenator, hyphenate_corpus, chunked
+
+
+def corpus_words(limit=2000):
+    "Returns some words from the German documentation."
+    fname = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dokumentation_de.txt")
+    with io.open(fname, "r", encoding="iso-8859-1") as f:
+        return f.read().split()[:limit]
+
+
+def as_text(hword):
+    if hword is None:
+        return None
+    return (hword[:], [repr(hp) for hp in hword.hyphenations])
+
+
+class CorpusTestCase(unittest.TestCase):
+    "Test hyphenation with a pool of worker processes."
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_corpus(self):
+        words = corpus_words()
+        hyphenator = DCWHyphenator("DE", 5)
+        expected = [as_text(hyphenator.hyphenate(w)) for w in words]
+        driver = CorpusHyphenator(hyphenator, processes=2, chunk_size=100, max_pending=3)
+        try:
+            results = list(driver.hyphenate(iter(words)))
+        finally:
+            driver.close()
+        self.assertEqual([w for w, hword in results], words)
+        self.assertEqual([as_text(hword) for w, hword in results], expected)
+        stats = driver.stats()
+        self.assertTrue(1 <= len(stats) <= 2)
+        self.assertEqual(sum([s["words"] for s in stats.values()]), len(words))
+
+    def test_registry(self):
+        saved = wordaxe.hyphRegistry.get("DE")
+        wordaxe.hyphRegistry["DE"] = DCWHyphenator("DE", 5)
+        words = [u"Silbentrennung", u"Bundeskanzleramt"]
+        try:
+            results = list(hyphenate_corpus(words, "DE", processes=1))
+        finally:
+            del wordaxe.hyphRegistry["DE"]
+            if saved is not None:
+                wordaxe.hyphRegistry["DE"] = saved
+        self.assertEqual([w for w, hword in results], words)
+        self.assertTrue(len(results[0][1].hyphenations) > 0)
+        self.assertRaises(ValueError, CorpusHyphenator, "XX")
+
+    def test_registry_factory(self):
+        wordaxe.hyphRegistry.register("XY", DCWHyphenator, "DE", 5)
+        try:
+            results = list(hyphenate_corpus([u"Silbentrennung"], "XY", processes=1))
+            # only the worker process has built the hyphenator
+            self.assertFalse("XY" in wordaxe.hyphRegistry.loaded())
+        finally:
+            del wordaxe.hyphRegistry["XY"]
+        self.assertTrue(len(results[0][1].hyphenations) > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
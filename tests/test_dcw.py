@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+import unittest
+
+from wordaxe.DCWHyphenator import DCWHyphenator
+from wordaxe.hyphrules import HyphRule, RuleList, check_mask, Prefix, Root, Suffix
+from wordaxe.hyphrules import NEED_PREFIX, NO_PREFIX, ONLY_FIRST, NEED_SUFFIX, NO_SUFFIX, ONLY_LAST, FREMDWORT
+from wordaxe.DCWHyphenator import WordFrag, SuffixWordFrag, PrefixWordFrag, Chain, EMPTY
+from wordaxe.dcwdict import DCWDictionary, module_sections
+import wordaxe.dict.DEhyph as DEhyph
+
+WORDS = [u"Bundesausbildungsf\xf6rderungsgesetzes\xe4nderungsvorlage",
+         u"Silbentrennungsalgorithmusbeschreibungsversuch",
+         u"Wachstube", u"Donaudampfschifffahrt", u"(Dampfschiff)", u"xyz"]
+
+
+def positions(solutions):
+    return [[(hp.indx, hp.quality, hp.nl, hp.sl, hp.nr, hp.sr) for hp in solution]
+            for solution in solutions]
+
+
+class CustomWordRule(HyphRule):
+    name = "CUSTOM_WORD_RULE"
+
+    def __init__(self, args=""):
+        HyphRule.__init__(self, [HyphRule.PRE_WORD])
+
+    def check(self, compWord, when, nextPiece=None):
+        return True
+
+
+class CustomMarkRule(HyphRule):
+    "Marks the fragment before the root, like ForeignWordRule."
+    name = "CUSTOM_MARK"
+
+    def __init__(self, args=""):
+        HyphRule.__init__(self, [HyphRule.PRE_PIECE])
+
+    def check(self, wfrag, when, nextPiece=None):
+        if not wfrag.root:
+            setattr(wfrag, self.name, True)
+            return True
+        return getattr(wfrag, self.name, False)
+
+WordFrag.allow_mark(CustomMarkRule.name)
+WordFrag.allow_mark("OTHER_MARK")
+
+
+class MemoizeTestCase(unittest.TestCase):
+    "Test the memoizing mode of DCWHyphenator._zerlegeWort."
+
+    def setUp(self):
+        self.plain = DCWHyphenator("DE", 5)
+        self.memo = DCWHyphenator("DE", 5, memoize=True)
+
+    def test_same_results(self):
+        for word in WORDS:
+            self.assertEqual(positions(self.memo.zerlegeWort(word)),
+                             positions(self.plain.zerlegeWort(word)))
+            self.assertEqual([[str(frag) for frag in cword] for cword in self.memo._zerlegeWort(word.lower())],
+                             [[str(frag) for frag in cword] for cword in self.plain._zerlegeWort(word.lower())])
+
+    def test_fewer_states(self):
+        word = WORDS[0]
+        self.plain.zerlegeWort(word)
+        self.memo.zerlegeWort(word)
+        self.assertTrue(self.memo.numStatesExamined < self.plain.numStatesExamined / 2)
+
+    def test_unknown_word_rule(self):
+        # (a private copy of the dictionary, which is modified)
+        self.memo = DCWHyphenator("DE", 5, memoize=True, dictionary=DCWDictionary(module_sections(DEhyph)))
+        self.assertEqual(self.memo._memo_after_words(), set([u"best"]))
+        lae, L = self.memo.roots[0]
+        L[sorted(L)[0]][0].append(CustomWordRule())
+        self.memo._after_words = None
+        self.assertEqual(self.memo._memo_after_words(), None)
+        self.memo.zerlegeWort(WORDS[0])
+        self.plain.zerlegeWort(WORDS[0])
+        self.assertEqual(self.memo.numStatesExamined, self.plain.numStatesExamined)
+
+    def test_no_after_word_rules(self):
+        sections = module_sections(DEhyph)
+        sections["roots"] = sections["roots"].replace(u"ehe,NOT_AFTER_WORD:best", u"ehe")
+        dictionary = DCWDictionary(sections)
+        self.plain = DCWHyphenator("DE", 5, dictionary=dictionary)
+        self.memo = DCWHyphenator("DE", 5, memoize=True, dictionary=dictionary)
+        self.assertEqual(self.memo._memo_after_words(), set())
+        for word in WORDS:
+            self.assertEqual(positions(self.memo.zerlegeWort(word)),
+                             positions(self.plain.zerlegeWort(word)))
+        self.plain.zerlegeWort(WORDS[0])
+        self.memo.zerlegeWort(WORDS[0])
+        self.assertTrue(self.memo.numStatesExamined < self.plain.numStatesExamined / 2)
+
+
+class ChainTestCase(unittest.TestCase):
+    "Test the immutable lists and the fragments of the search."
+
+    def test_chain(self):
+        abc = Chain(u"c", Chain(u"b", Chain(u"a", EMPTY)))
+        abd = Chain(u"d", abc.before)
+        self.assertEqual(list(abc), [u"a", u"b", u"c"])
+        self.assertEqual(list(abd), [u"a", u"b", u"d"])
+        self.assertEqual((len(abc), abc[-1], abc[0], abc[1:]), (3, u"c", u"a", [u"b", u"c"]))
+        self.assertTrue(abc == [u"a", u"b", u"c"] and abc != abd and abc == Chain(u"c", abd.before))
+        self.assertTrue(EMPTY == [] and not EMPTY and len(EMPTY) == 0)
+        self.assertEqual(repr(abd), repr([u"a", u"b", u"d"]))
+
+    def test_frags(self):
+        frag = PrefixWordFrag(None, prefix_chars=u"(")
+        FREMDWORT().check(frag, HyphRule.PRE_PIECE, Root(u"silb", []))
+        prefixed = frag.clone()
+        prefixed.prefix = Chain(Prefix(u"ab", []), frag.prefix)
+        rooted = SuffixWordFrag(prefixed, Root(u"silb", []))
+        self.assertEqual((len(frag.prefix), str(rooted)), (0, "SuffixWF (ab|silb|"))
+        self.assertTrue(FREMDWORT().check(rooted, HyphRule.PRE_PIECE, Suffix(u"e", [])))
+        self.assertFalse(FREMDWORT().check(SuffixWordFrag(None, Root(u"silb", [])),
+                                           HyphRule.PRE_PIECE, Suffix(u"e", [])))
+        # marks of other rules
+        frag = PrefixWordFrag(None)
+        self.assertTrue(CustomMarkRule().check(frag, HyphRule.PRE_PIECE, Root(u"silb", [])))
+        rooted = SuffixWordFrag(frag.clone(), Root(u"silb", []))
+        self.assertTrue(CustomMarkRule().check(rooted, HyphRule.PRE_PIECE, Suffix(u"e", [])))
+        rooted.OTHER_MARK = True
+        self.assertEqual(rooted.marks, {"CUSTOM_MARK": True, "OTHER_MARK": True})
+        self.assertEqual(frag.marks, {"CUSTOM_MARK": True})
+        self.assertEqual(PrefixWordFrag(None).marks, None)
+        self.assertRaises(AttributeError, setattr, rooted, "unknown", True)
+        self.assertFalse(CustomMarkRule().check(SuffixWordFrag(None, Root(u"silb", [])),
+                                                HyphRule.PRE_PIECE, Suffix(u"e", [])))
+        # ... in a search
+        hyphenator = DCWHyphenator("DE", 5, dictionary=DCWDictionary(module_sections(DEhyph)))
+        for lae, L in hyphenator.prefixes:
+            for props in L.get(u"be", []):
+                props.append(CustomMarkRule())
+        self.assertEqual(positions(hyphenator.zerlegeWort(u"Wegbeschreibung")),
+                         positions(DCWHyphenator("DE", 5).zerlegeWort(u"Wegbeschreibung")))
+
+
+class RuleListTestCase(unittest.TestCase):
+    "Test the bitmasks for simple rules."
+
+    def test_mask(self):
+        self.assertEqual(RuleList([NO_PREFIX(), ONLY_FIRST()]).mask, 6)
+        self.assertEqual(RuleList([NEED_PREFIX(u"be ge")]).mask, None)
+        self.assertEqual(RuleList([NO_PREFIX(), FREMDWORT()]).mask, None)
+        self.assertEqual(Root(u"silb", [NEED_SUFFIX(), FREMDWORT()]).getChecks()[HyphRule.PRE_NEXT_PIECE].mask, None)
+        self.assertEqual(Root(u"silb", [NEED_SUFFIX()]).getChecks()[HyphRule.PRE_NEXT_PIECE].mask, 8)
+
+    def test_check_mask(self):
+        "check_mask gives the same results as calling the rules."
+        def call(rules, when, frag, piece):
+            for rule in rules:
+                if not rule.check(frag, when, piece):
+                    return False
+            return True
+        frags = []
+        for prefix in [[], [Prefix(u"be", [])]]:
+            for suffix in [[], [Suffix(u"ung", [])]]:
+                frag = SuffixWordFrag(None, Root(u"trenn", []), suffix)
+                frag.prefix = prefix
+                frags.append(frag)
+        pieces = [Prefix(u"ab", []), Root(u"silb", []), Suffix(u"e", [])]
+        for when, classes in [(HyphRule.PRE_PIECE, [NEED_PREFIX, NO_PREFIX, ONLY_FIRST]),
+                              (HyphRule.PRE_NEXT_PIECE, [NEED_SUFFIX, NO_SUFFIX, ONLY_LAST])]:
+            for n in range(len(classes) + 1):
+                for combination in itertools.permutations(classes, n):
+                    rules = RuleList([cls() for cls in combination])
+                    for frag in frags:
+                        for piece in pieces:
+                            # (None: the rules have to be called)
+                            result = check_mask(rules.mask, when, frag, piece)
+                            if result is not None:
+                                self.assertEqual(result, call(rules, when, frag, piece))
+
+
+if __name__ == "__main__":
+    unittest.main()
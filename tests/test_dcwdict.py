@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from wordaxe.DCWHyphenator import DCWHyphenator
+from wordaxe import dcwdict
+from wordaxe.dcwdict import DCWDictionary, load_dictionary, compile_dictionary, read_compiled, module_sections
+import wordaxe.dict.DEhyph as DEhyph
+
+WORDS = u"""
+[special_words]
+wordaxe,TRENNUNG:word8axe
+[roots]
+silb,NEED_SUFFIX
+trenn
+[prefixes]
+ab
+[suffixes]
+e
+ung
+"""
+
+
+class Planted(object):
+    "Creates a directory when it is unpickled."
+
+    def __init__(self, path):
+        self.path = path
+
+    def __reduce__(self):
+        return (os.mkdir, (self.path,))
+
+
+def positions(hword):
+    return hword and [(hp.indx, hp.quality) for hp in hword.hyphenations]
+
+
+class DictionaryTestCase(unittest.TestCase):
+    "Test the compiled dictionaries of DCWHyphenator."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmpdir, "words.txt")
+        with io.open(self.source, "w", encoding="utf-8") as f:
+            f.write(WORDS)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_default(self):
+        dictionary = load_dictionary()
+        self.assertTrue(load_dictionary() is dictionary)
+        self.assertTrue(DCWHyphenator("DE", 5).dictionary is dictionary)
+        parsed = DCWDictionary(module_sections(DEhyph))
+        self.assertEqual(dictionary.version, parsed.version)
+        self.assertEqual(dictionary.entries, parsed.entries)
+        self.assertEqual([(lae, sorted(L)) for lae, L in dictionary.roots],
+                         [(lae, sorted(L)) for lae, L in parsed.roots])
+
+    def test_compile(self):
+        target = os.path.join(self.tmpdir, "words.wxc")
+        compile_dictionary([self.source], target)
+        dictionary = read_compiled(target)
+        self.assertEqual(dictionary.entries, [(u"wordaxe", u"word8axe")])
+        self.assertEqual(dictionary.prefix_chars, DEhyph.prefix_chars)
+        hyphenator = DCWHyphenator("DE", 5, dictionary=dictionary)
+        self.assertEqual(positions(hyphenator.hyphenate(u"Silbentrennung")), [])
+        self.assertEqual(positions(hyphenator.hyphenate(u"Silbe")), [(3, 5)])
+        self.assertEqual(positions(hyphenator.hyphenate(u"Abtrennung")), [(2, 7), (6, 5)])
+        self.assertEqual(positions(hyphenator.hyphenate(u"wordaxe")), [(4, 8)])
+
+    def test_cache(self):
+        cache_dir = os.path.join(self.tmpdir, "cache")
+        dictionary = load_dictionary(self.source, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertEqual(read_compiled(os.path.join(cache_dir, os.listdir(cache_dir)[0])).version,
+                         dictionary.version)
+        # a changed source is compiled again
+        with io.open(self.source, "a", encoding="utf-8") as f:
+            f.write(u"\n[roots]\nsilben\n")
+        changed = load_dictionary(self.source, cache_dir=cache_dir)
+        self.assertNotEqual(changed.version, dictionary.version)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertTrue(u"silben" in dict(changed.roots)[6])
+        self.assertEqual(read_compiled(os.path.join(cache_dir, os.listdir(cache_dir)[0])).version,
+                         changed.version)
+
+    def test_stamp(self):
+        cache_dir = os.path.join(self.tmpdir, "cache")
+        dictionary = load_dictionary(self.source, cache_dir=cache_dir)
+        # in another process, the source is neither read nor hashed
+        dcwdict.forget_loaded()
+        read_sections = dcwdict.read_sections
+        dcwdict.read_sections = None
+        try:
+            loaded = load_dictionary(self.source, cache_dir=cache_dir)
+        finally:
+            dcwdict.read_sections = read_sections
+        self.assertFalse(loaded is dictionary)
+        self.assertEqual(loaded.version, dictionary.version)
+        # a touched source is read, but the compiled file is used
+        st = os.stat(self.source)
+        os.utime(self.source, (st.st_atime, st.st_mtime + 10))
+        touched = load_dictionary(self.source, cache_dir=cache_dir)
+        self.assertEqual(touched.version, dictionary.version)
+        compiled = read_compiled(os.path.join(cache_dir, os.listdir(cache_dir)[0]))
+        self.assertEqual(compiled._stamp, [st.st_mtime + 10, st.st_size])
+
+    def test_pickle(self):
+        target = os.path.join(self.tmpdir, "words.wxc")
+        compile_dictionary([self.source], target)
+        dictionary = pickle.loads(pickle.dumps(read_compiled(target), 2))
+        self.assertEqual(dictionary.entries, [(u"wordaxe", u"word8axe")])
+        hyphenator = DCWHyphenator("DE", 5, dictionary=dictionary)
+        self.assertEqual(positions(hyphenator.hyphenate(u"Abtrennung")), [(2, 7), (6, 5)])
+
+    def test_invalid_file(self):
+        target = os.path.join(self.tmpdir, "words.wxc")
+        with open(target, "wb") as f:
+            f.write(b"WXDCgarbage")
+        self.assertRaises(ValueError, read_compiled, target)
+        with io.open(self.source, "a", encoding="utf-8") as f:
+            f.write(u"[unknown]\n")
+        self.assertRaises(ValueError, load_dictionary, self.source)
+
+    def test_no_code_execution(self):
+        target = os.path.join(self.tmpdir, "words.wxc")
+        planted = os.path.join(self.tmpdir, "planted")
+        with open(target, "wb") as f:
+            f.write(b"WXDC")
+            pickle.dump(Planted(planted), f, 2)
+        self.assertRaises(ValueError, read_compiled, target)
+        self.assertFalse(os.path.exists(planted))
+
+    def test_other_wordaxe_version(self):
+        target = os.path.join(self.tmpdir, "words.wxc")
+        package_version = dcwdict._package_version
+        dcwdict._package_version = lambda: u"wordaxe 0.0"
+        try:
+            compile_dictionary([self.source], target)
+        finally:
+            dcwdict._package_version = package_version
+        self.assertRaises(ValueError, read_compiled, target)
+        # a file from another version is never used, the name differs
+        # (another source, which is not yet loaded in this process)
+        with io.open(self.source, "a", encoding="utf-8") as f:
+            f.write(u"\n[roots]\nversion\n")
+        cache_dir = os.path.join(self.tmpdir, "cache")
+        load_dictionary(self.source, cache_dir=cache_dir)
+        self.assertTrue(os.listdir(cache_dir)[0].endswith("-wordaxe_1.1.0beta.wxc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
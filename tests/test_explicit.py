@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import shutil
+import pickle
+import tempfile
+import time
+import threading
+import unittest
+
+from wordaxe.hyphen import SHY, HyphenationPoint, HyphenatedWord, Cached
+from wordaxe.hyphcache import SharedCache, PersistentCache
+from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+
+SPECIAL_WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "special_words.lst")
+
+
+def positions(hword):
+    return [(hp.indx, hp.quality) for hp in hword.hyphenations]
+
+
+class ExplicitHyphenatorTestCase(unittest.TestCase):
+    "Test the entries of the ExplicitHyphenator."
+
+    def setUp(self):
+        self.hyphenator = ExplicitHyphenator("DE", 5)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, text):
+        fname = os.path.join(self.tmpdir, "entries.lst")
+        with io.open(fname, "w", encoding="utf-8") as f:
+            f.write(text)
+        return fname
+
+    def test_case_folding(self):
+        self.hyphenator.add_entry(u"Bl\xfctenPracht", u"Bl\xfcten8pracht")
+        for word in [u"bl\xfctenpracht", u"Bl\xfctenpracht", u"BL\xdcTENPRACHT"]:
+            hword = self.hyphenator.hyph(word)
+            self.assertEqual(hword, word)
+            self.assertEqual(positions(hword), [(6, 8)])
+        self.assertEqual(self.hyphenator.hyph(u"Bl\xfcte"), None)
+
+    def test_tilde(self):
+        self.hyphenator.add_entry(u"Auto", u"Au~to")
+        self.assertEqual(positions(self.hyphenator.hyph(u"Auto")), [(2, 5)])
+
+    def test_load_file(self):
+        self.hyphenator.add_entries_from_file(SPECIAL_WORDS)
+        hword = self.hyphenator.hyphenate(u"Superkalifragilistisch")
+        self.assertEqual(positions(hword), [(5, 8), (9, 8), (14, 8), (17, 5)])
+        self.assertEqual(positions(self.hyphenator.hyph(u"Bl\xfctenpracht")), [(6, 8)])
+
+    def test_comments_and_blank_lines(self):
+        fname = self.write(u"# -*- coding: utf-8 -*-\n\n  # Kommentar\nFooBar  Foo7bar\n\n\tBaz ba5z \n")
+        self.hyphenator.add_entries_from_file(fname)
+        self.assertEqual(sorted(self.hyphenator.entries), [u"baz", u"foobar"])
+        self.assertEqual(positions(self.hyphenator.hyph(u"FOOBAR")), [(3, 7)])
+
+    def test_bad_lines(self):
+        for text in [u"Foo Fo5o\nBar\nBaz Ba5z\n", u"Foo Fo5o Bar\nBaz\n"]:
+            fname = self.write(text)
+            self.assertRaises(ValueError, self.hyphenator.add_entries_from_file, fname, "utf-8")
+
+    def test_shared_points(self):
+        self.hyphenator.add_entries([(u"Abcdef", u"abc5def"), (u"Uvwxyz", u"uvw5xyz")])
+        a = self.hyphenator.hyph(u"abcdef").hyphenations
+        b = self.hyphenator.hyph(u"uvwxyz").hyphenations
+        self.assertEqual(positions(self.hyphenator.hyph(u"abcdef")), [(3, 5)])
+        # the entries share the points, but the results don't
+        self.assertTrue(self.hyphenator.entries[u"abcdef"] is self.hyphenator.entries[u"uvwxyz"])
+        self.assertFalse(a[0] is b[0])
+        a.append(None) # the index must not be modified
+        a[0].indx = 1
+        a[0].quality = 9
+        self.assertEqual(positions(self.hyphenator.hyph(u"abcdef")), [(3, 5)])
+        self.assertEqual(positions(self.hyphenator.hyph(u"uvwxyz")), [(3, 5)])
+
+    def test_dictionary_version(self):
+        version = self.hyphenator.dictionary_version()
+        self.hyphenator.add_entries({u"Abcdef": u"abc5def"})
+        self.assertNotEqual(self.hyphenator.dictionary_version(), version)
+        other = ExplicitHyphenator("DE", 5)
+        other.add_entry(u"abcdef", u"abc5def")
+        self.assertEqual(other.dictionary_version(), self.hyphenator.dictionary_version())
+
+
+class CountingHyphenator(ExplicitHyphenator):
+    "Hyphenates each word after the third letter, counting the calls."
+
+    def __init__(self, *args, **kwargs):
+        ExplicitHyphenator.__init__(self, *args, **kwargs)
+        self.calls = []
+
+    def hyph(self, word):
+        self.calls.append(word)
+        if len(word) < 6:
+            return None
+        return HyphenatedWord(word, [HyphenationPoint(3, 5, sl=SHY)])
+
+    def i_hyphenate(self, aWord):
+        return self.i_hyphenate_derived(aWord)
+
+    def i_hyphenate_many(self, words):
+        return self.i_hyphenate_many_derived(words)
+
+
+class SubwordCacheTestCase(unittest.TestCase):
+    "Test the cache for the subwords in i_hyphenate_derived."
+
+    def test_cache(self):
+        hyphenator = CountingHyphenator("DE", 5, subwordCache=100)
+        first = hyphenator.hyphenate(u"Python-Leiter")
+        self.assertEqual(hyphenator.calls, [u"Python-", u"Leiter"])
+        second = hyphenator.hyphenate(u"(Python-Leiter)")
+        self.assertEqual(hyphenator.calls, [u"Python-", u"Leiter"])
+        self.assertEqual(positions(first), [(3, 5), (7, 9), (10, 5)])
+        self.assertEqual(positions(second), [(4, 5), (8, 9), (11, 5)])
+        self.assertEqual(hyphenator.hyphenate(u"Bus-Leiter"), u"Bus-Leiter")
+        self.assertEqual(hyphenator.hyphenate(u"Bus-Leiter"), u"Bus-Leiter")
+        self.assertEqual(hyphenator.calls, [u"Python-", u"Leiter", u"Bus-"])
+        stats = hyphenator.subword_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (5, 3, 3))
+        # the cached points are not shared with the results
+        first.hyphenations[-1].indx = 1
+        self.assertEqual(positions(hyphenator.hyphenate(u"Python-Leiter")), [(3, 5), (7, 9), (10, 5)])
+
+    def test_explicit_entries_first(self):
+        hyphenator = CountingHyphenator("DE", 5)
+        hyphenator.hyphenate(u"Python-Leiter")
+        hyphenator.add_entry(u"Leiter", u"Le5iter")
+        self.assertEqual(positions(hyphenator.hyphenate(u"Python-Leiter")), [(3, 5), (7, 9), (9, 5)])
+
+    def test_eviction(self):
+        hyphenator = CountingHyphenator("DE", 5, subwordCache=2)
+        for word in [u"Abcdefg", u"Bcdefgh", u"Cdefghi", u"Abcdefg"]:
+            hyphenator.hyphenate(word)
+        self.assertEqual(len(hyphenator.calls), 4)
+        self.assertEqual(hyphenator.subword_cache.stats()["evictions"], 2)
+
+    def test_created_on_first_use(self):
+        hyphenator = ExplicitHyphenator("DE", 5)
+        hyphenator.add_entry(u"Leiter", u"Lei5ter")
+        hyphenator.hyphenate(u"Leiter")
+        self.assertEqual(hyphenator.subword_cache, None)
+        hyphenator = CountingHyphenator("DE", 5)
+        self.assertEqual(hyphenator.subword_cache, None)
+        hyphenator.hyphenate(u"Leiter")
+        self.assertTrue(isinstance(hyphenator.subword_cache, SharedCache))
+
+    def test_disabled(self):
+        hyphenator = CountingHyphenator("DE", 5, subwordCache=0)
+        self.assertEqual(hyphenator.subword_cache, None)
+        hyphenator.hyphenate_many([u"Python-Leiter", u"Leiter"])
+        hyphenator.hyphenate(u"Leiter")
+        self.assertEqual(hyphenator.calls, [u"Python-", u"Leiter", u"Leiter"])
+
+    def test_threads(self):
+        hyphenator = CountingHyphenator("DE", 5, subwordCache=3)
+        self.assertEqual(hyphenator.subword_cache, None)
+        words = [u"Wort%s" % u"".join([u"abcdefghij"[int(d)] for d in str(i)]) for i in range(50)]
+        errors = []
+        def work():
+            try:
+                for i in range(20):
+                    hyphenator.hyphenate_many(words)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=work) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(isinstance(hyphenator.subword_cache, SharedCache))
+        stats = hyphenator.subword_cache.stats()
+        self.assertEqual(stats["entries"], 3)
+        cache = hyphenator.subword_cache._stripes[0].cache
+        self.assertEqual(stats["bytes"], sum([cache.sizeof(key, value) for key, (value, size) in cache._data.items()]))
+
+
+class ReloadTestCase(unittest.TestCase):
+    "Test reloading the entries from modified files."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, "entries.lst")
+        self.write(u"Python Py5thon\nLeiter Lei5ter\nKurs Ku5rs\n")
+        self.hyphenator = CountingHyphenator("DE", 5)
+        self.hyphenator.add_entries_from_file(self.fname, "utf-8")
+
+    def tearDown(self):
+        self.hyphenator.stop_watching()
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, text):
+        with io.open(self.fname, "w", encoding="utf-8") as f:
+            f.write(text)
+        # make sure the modification is noticed
+        stamp = time.time() + len(text)
+        os.utime(self.fname, (stamp, stamp))
+
+    def test_reload(self):
+        hyphenator = self.hyphenator
+        entries = hyphenator.entries
+        self.assertEqual(hyphenator.reload_entries(), set())
+        self.assertTrue(hyphenator.entries is entries)
+        self.assertEqual(positions(ExplicitHyphenator.hyph(hyphenator, u"Leiter")), [(3, 5)])
+        version = hyphenator.dictionary_version()
+        self.write(u"Python Py5thon\nLeiter Le5iter\nBus Bu5s\n")
+        self.assertEqual(hyphenator.reload_entries(), set([u"leiter", u"bus", u"kurs"]))
+        self.assertEqual(positions(ExplicitHyphenator.hyph(hyphenator, u"Leiter")), [(2, 5)])
+        self.assertEqual(positions(ExplicitHyphenator.hyph(hyphenator, u"Bus")), [(2, 5)])
+        self.assertEqual(ExplicitHyphenator.hyph(hyphenator, u"Kurs"), None)
+        self.assertTrue(hyphenator.entries["python"] is entries["python"])
+        self.assertNotEqual(hyphenator.dictionary_version(), version)
+        self.assertEqual(hyphenator.reload_entries(), set())
+        self.assertEqual(hyphenator.reload_entries(self.fname), set())
+
+    def test_invalidate_cached(self):
+        cached = Cached(self.hyphenator)
+        for word in [u"Python-Leiter", u"Leiter", u"Python", u"Blumenkurs"]:
+            cached.hyphenate(word)
+        self.write(u"Python Py5thon\nLeiter Le5iter\nKurs Ku5rs\n")
+        self.assertEqual(self.hyphenator.reload_entries(), set([u"leiter"]))
+        self.assertEqual(sorted(cached.cache.keys()), [u"Blumenkurs", u"Python"])
+        self.assertEqual(positions(cached.hyphenate(u"Python-Leiter")), [(3, 5), (7, 9), (9, 5)])
+        self.assertEqual(cached.invalidate([u"kurs"]), 1)
+
+    def test_invalidate_backends(self):
+        persistent = PersistentCache(os.path.join(self.tmpdir, "cache.sqlite"), max_entries=10, batch_size=2)
+        try:
+            for cache in [None, SharedCache(), persistent]:
+                cached = Cached(self.hyphenator, cache=cache)
+                for word in [u"Python-Leiter", u"Leiter", u"Python", u"Blumenkurs"]:
+                    self.assertEqual(positions(cached.hyphenate(u"Leiter")), [(3, 5)])
+                    cached.hyphenate(word)
+                self.write(u"Python Py5thon\nLeiter Le5iter\nKurs Ku5rs\n")
+                self.hyphenator.reload_entries()
+                self.assertEqual(positions(cached.hyphenate(u"Leiter")), [(2, 5)])
+                self.assertEqual(positions(cached.hyphenate(u"Python-Leiter")), [(3, 5), (7, 9), (9, 5)])
+                self.write(u"Python Py5thon\nLeiter Lei5ter\nKurs Ku5rs\n")
+                self.hyphenator.reload_entries()
+                self.assertEqual(positions(cached.hyphenate(u"Leiter")), [(3, 5)])
+            self.assertEqual(cached.invalidate([u"kurs"]), 1)
+            self.assertEqual(sorted([word for ns, word in persistent.keys()]),
+                             [u"Leiter", u"Python"])
+        finally:
+            persistent.close()
+
+    def test_subword_cache(self):
+        hyphenator = self.hyphenator
+        hyphenator.hyphenate(u"Python-Bus")
+        self.assertEqual(hyphenator.calls, [u"Python-", u"Bus"])
+        self.write(u"Python Py5thon\nLeiter Lei5ter\nKurs Ku5rs\nBus Bu5s\n")
+        hyphenator.reload_entries()
+        self.assertEqual(hyphenator.subword_cache.keys(), [u"Python-"])
+        self.assertEqual(positions(hyphenator.hyphenate(u"Python-Bus")), [(3, 5), (7, 9), (9, 5)])
+
+    def test_pickle(self):
+        Cached(self.hyphenator)
+        other = pickle.loads(pickle.dumps(self.hyphenator))
+        self.write(u"Python Pyth5on\n")
+        self.assertEqual(other.reload_entries(), set([u"python", u"leiter", u"kurs"]))
+        self.assertEqual(positions(ExplicitHyphenator.hyph(other, u"Python")), [(4, 5)])
+        self.assertEqual(positions(ExplicitHyphenator.hyph(self.hyphenator, u"Python")), [(2, 5)])
+
+    def test_watch(self):
+        self.hyphenator.watch_entries(0.01)
+        self.write(u"Python Pyth5on\n")
+        for i in range(500):
+            if u"kurs" not in self.hyphenator.entries:
+                break
+            time.sleep(0.01)
+        self.assertEqual(positions(ExplicitHyphenator.hyph(self.hyphenator, u"Python")), [(4, 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
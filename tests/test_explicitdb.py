@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+from wordaxe.explicitdb import CompiledEntries, compile_entries, save_entries
+
+SPECIAL_WORDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "special_words.lst")
+
+
+def positions(hword):
+    return hword and [(hp.indx, hp.quality) for hp in hword.hyphenations]
+
+
+class CompiledEntriesTestCase(unittest.TestCase):
+    "Test the compiled format for ExplicitHyphenator entries."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.fname = os.path.join(self.tmpdir, "entries.wxd")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_compile_file(self):
+        self.assertEqual(compile_entries(SPECIAL_WORDS, self.fname), 2)
+        reference = ExplicitHyphenator("DE", 5)
+        reference.add_entries_from_file(SPECIAL_WORDS)
+        hyphenator = ExplicitHyphenator("DE", 5)
+        hyphenator.add_compiled_file(self.fname)
+        self.assertEqual(hyphenator.entries, {})
+        for word in [u"Bl\xfctenpracht", u"SUPERKALIFRAGILISTISCH", u"Bl\xfcte"]:
+            self.assertEqual(positions(hyphenator.hyph(word)), positions(reference.hyph(word)))
+        compiled = hyphenator.compiled[0]
+        self.assertEqual(len(compiled), 2)
+        self.assertEqual(compiled.keys(), [u"bl\xfctenpracht", u"superkalifragilistisch"])
+        self.assertEqual(compiled.version, reference.dictionary_version())
+
+    def test_many_entries(self):
+        entries = ExplicitHyphenator("DE", 5)
+        for i in range(1000):
+            word = u"w\xf6rter%sabc" % u"".join([u"xyz"[int(d) % 3] for d in str(i)])
+            entries.add_entry(word, word[:3] + u"5" + word[3:7] + u"~" + word[7:])
+        save_entries(entries, self.fname)
+        compiled = CompiledEntries(self.fname)
+        for word in entries.entries:
+            self.assertTrue(compiled.get(word) is entries._points(word))
+        self.assertEqual(compiled.get(u"w\xf6rterabc"), None)
+        self.assertFalse(u"w\xf6rter" in compiled)
+        compiled.close()
+
+    def test_precedence(self):
+        compile_entries(SPECIAL_WORDS, self.fname)
+        hyphenator = ExplicitHyphenator("DE", 5)
+        hyphenator.add_compiled_file(self.fname)
+        version = hyphenator.dictionary_version()
+        hyphenator.add_entry(u"Bl\xfctenpracht", u"Bl\xfc5ten5pracht")
+        self.assertEqual(positions(hyphenator.hyph(u"Bl\xfctenpracht")), [(3, 5), (6, 5)])
+        self.assertNotEqual(hyphenator.dictionary_version(), version)
+
+    def test_pickle(self):
+        compile_entries([SPECIAL_WORDS], self.fname)
+        hyphenator = ExplicitHyphenator("DE", 5)
+        hyphenator.add_compiled_file(self.fname)
+        other = pickle.loads(pickle.dumps(hyphenator))
+        self.assertEqual(positions(other.hyph(u"Bl\xfctenpracht")), [(6, 8)])
+        self.assertEqual(other.dictionary_version(), hyphenator.dictionary_version())
+
+    def test_invalid_file(self):
+        with io.open(self.fname, "wb") as f:
+            f.write(b"# -*- coding: utf-8 -*-\n" * 3)
+        self.assertRaises(ValueError, CompiledEntries, self.fname)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import unittest
+
+from wordaxe.hyphen import Cached
+from wordaxe.BaseHyphenator import BaseHyphenator
+from wordaxe.DCWHyphenator import DCWHyphenator
+
+
+def corpus_words(limit=3000):
+    "Returns some words from the German documentation."
+    fname = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dokumentation_de.txt")
+    with io.open(fname, "r", encoding="iso-8859-1") as f:
+        return f.read().split()[:limit]
+
+
+def as_text(hword):
+    if hword is None:
+        return None
+    return (hword[:], [repr(hp) for hp in hword.hyphenations])
+
+
+class HyphenateManyTestCase(unittest.TestCase):
+    "Test the batch API hyphenate_many."
+
+    def check(self, hyphenator, words):
+        expected = [as_text(hyphenator.hyphenate(w)) for w in words]
+        results = hyphenator.hyphenate_many(iter(words))
+        self.assertEqual(len(results), len(words))
+        self.assertEqual([as_text(hw) for hw in results], expected)
+        return results
+
+    def test_base(self):
+        words = [u"Exklusiv-Demo", u"CamelCase", u"no_data_found", u"Wort", u"Exklusiv-Demo"]
+        results = self.check(BaseHyphenator("DE", 5), words)
+        self.assertTrue(results[0] is results[-1])
+
+    def test_dcw(self):
+        words = corpus_words() + [u"Bundeskanzleramt", u"BUNDESKANZLERAMT", u"(bundeskanzleramt)"]
+        self.check(DCWHyphenator("DE", 5), words)
+
+    def test_cached(self):
+        hyphenator = DCWHyphenator("DE", 5)
+        cached = Cached(hyphenator, 1000)
+        words = corpus_words(500)
+        cached.hyphenate(words[0])
+        results = cached.hyphenate_many(words)
+        self.assertEqual([as_text(hw) for hw in results],
+                         [as_text(hyphenator.hyphenate(w)) for w in words])
+        stats = cached.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["entries"], len(set(words)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+import unittest
+
+from wordaxe.DCWHyphenator import DCWHyphenator
+
+
+def corpus_words():
+    "Returns the words of the German documentation, with paragraph marks."
+    fname = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dokumentation_de.txt")
+    words = []
+    with io.open(fname, "r", encoding="iso-8859-1") as f:
+        for line in f:
+            words.extend(line.split() or [u"\n"])
+    return words
+
+
+class LearnTestCase(unittest.TestCase):
+    "Test the coverage report of learn."
+
+    def setUp(self):
+        self.hyphenator = DCWHyphenator("DE", 5)
+        self.words = corpus_words()
+
+    def test_streaming(self):
+        html = io.StringIO()
+        cntWords, cntOK, cntTooShort, unknown = self.hyphenator.learn(iter(self.words + [u"Xyzzyq", u"xyzzyq"]), html)
+        self.assertTrue(0 < cntOK < cntWords)
+        self.assertTrue(cntTooShort > 0)
+        text = html.getvalue()
+        self.assertTrue(text.startswith(u"<html>"))
+        self.assertTrue(text.endswith(u"</p></body></html>"))
+        stats = self.hyphenator.learn_stats([u"Abc", u"Silbentrennung", u"Silbentrennung"])
+        self.assertEqual((stats.cntWords, stats.cntOK, stats.cntTooShort), (3, 2, 1))
+
+    def test_parallel(self):
+        html = io.StringIO()
+        expected = self.hyphenator.learn(self.words, html)
+        parallel_html = io.StringIO()
+        stats = self.hyphenator.learn_stats(iter(self.words), parallel_html, processes=2, chunk_size=500)
+        self.assertEqual((stats.cntWords, stats.cntOK, stats.cntTooShort, list(stats.unknown)), expected)
+        self.assertEqual(parallel_html.getvalue(), html.getvalue())
+
+    def test_parallel_verbose(self):
+        words = self.words[:1500]
+        expected = self.capture_stdout(lambda: self.hyphenator.learn_stats(words, VERBOSE=True))
+        self.assertTrue(expected)
+        output = self.capture_stdout(lambda: self.hyphenator.learn_stats(words, VERBOSE=True, processes=2, chunk_size=500))
+        self.assertEqual(output, expected)
+
+    def capture_stdout(self, func):
+        "Calls func and returns what it printed."
+        stdout = sys.stdout
+        sys.stdout = io.StringIO() if sys.version_info[0] >= 3 else io.BytesIO()
+        try:
+            func()
+            return sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+
+
+if __name__ == "__main__":
+    unittest.main()
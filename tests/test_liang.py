@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from wordaxe.liang import PatternTrie, CompiledPatterns, parse_pattern, read_patterns, compiled_patterns, patterns_version
+from wordaxe.cachedir import private_temp_dir
+from wordaxe.PyHnjHyphenator import PyHnjHyphenator
+from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+
+try:
+    from wordaxe.liangbatch import batch_matcher
+except ImportError:
+    batch_matcher = None # NumPy is not installed
+
+DICT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wordaxe", "dict")
+
+
+def brute_force(patterns, word):
+    "The priorities, computed by trying every pattern at every position."
+    prios = [0] * (len(word) + 1)
+    for letters, priorities in [parse_pattern(p) for p in patterns]:
+        start = word.find(letters)
+        while start >= 0:
+            for pos, prio in enumerate(priorities):
+                prios[start+pos] = max(prios[start+pos], prio)
+            start = word.find(letters, start + 1)
+    return prios
+
+
+def points(hword):
+    return [(hp.indx, hp.quality, hp.nl, hp.sl, hp.nr, hp.sr) for hp in hword.hyphenations]
+
+
+class LiangTestCase(unittest.TestCase):
+    "Test the trie of hyphenation patterns."
+
+    def test_parse_pattern(self):
+        self.assertEqual(parse_pattern(u".ab3a4s"), (u".abas", (0, 0, 0, 3, 4, 0)))
+        self.assertEqual(parse_pattern(u"4b1c."), (u"bc.", (4, 1, 0, 0)))
+        self.assertEqual(parse_pattern(u"\xe4u1\xdf"), (u"\xe4u\xdf", (0, 0, 1, 0)))
+
+    def test_priorities(self):
+        patterns = [u"hy3ph", u"he2n", u"hena4", u"hen5at", u"1na", u"n2at", u"1tio", u"2io", u"o2n."]
+        trie = PatternTrie(patterns)
+        word = u".hyphenation."
+        prios = trie.priorities(word)
+        self.assertEqual(prios, brute_force(patterns, word))
+        self.assertEqual(prios[3], 3) # hy-phen
+        self.assertEqual(prios[11], 2) # from "o2n."
+        self.assertEqual(trie.priorities(u""), [0])
+        self.assertEqual(pickle.loads(pickle.dumps(trie)).priorities(word), prios)
+
+    def test_pattern_file(self):
+        characters, patterns = read_patterns(os.path.join(DICT_DIR, "hyph_de_DE.dic"))
+        self.assertEqual(characters, u"ISO8859-1")
+        self.assertTrue(u".aa6l" in patterns)
+        trie = PatternTrie(patterns)
+        for word in [u".silbentrennung.", u".gr\xf6\xdfenordnung.", u".schifffahrt."]:
+            self.assertEqual(trie.priorities(word), brute_force(patterns, word))
+
+    def test_pure_python(self):
+        hyphenator = PyHnjHyphenator("en_US", 5, purePython=True)
+        self.assertEqual([hp.indx for hp in hyphenator.zerlegeWort(u"Hyphenation")], [2, 6, 7])
+        self.assertEqual([hp.indx for hp in hyphenator.zerlegeWort(u"computer")], [3])
+        self.assertEqual(hyphenator.patterns[u".abi"], (0, 0, 0, 4, 0))
+
+
+class CompiledPatternsTestCase(unittest.TestCase):
+    "Test the compiled (double-array) pattern files."
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_same_priorities(self):
+        fname = os.path.join(DICT_DIR, "hyph_de_DE.dic")
+        compiled = compiled_patterns(fname, cache_dir=self.tmpdir)
+        self.assertTrue(isinstance(compiled, CompiledPatterns))
+        self.assertEqual(compiled.characters, u"ISO8859-1")
+        characters, patterns = read_patterns(fname)
+        trie = PatternTrie(patterns)
+        for word in [u".silbentrennung.", u".gr\xf6\xdfenordnung.", u".schifffahrt.", u".\u0444x.", u""]:
+            self.assertEqual(compiled.priorities(word), trie.priorities(word))
+        self.assertEqual(pickle.loads(pickle.dumps(compiled)).priorities(u".aalen."),
+                         trie.priorities(u".aalen."))
+
+    def test_cache(self):
+        gb = compiled_patterns(os.path.join(DICT_DIR, "hyph_en_GB.dic"), 2, self.tmpdir)
+        us = compiled_patterns(os.path.join(DICT_DIR, "hyph_en_US.dic"), 2, self.tmpdir)
+        self.assertEqual(gb.filename, us.filename)
+        self.assertEqual(os.listdir(self.tmpdir), [os.path.basename(gb.filename)])
+        # (replace the file instead of overwriting the mapped one)
+        with open(gb.filename + ".new", "wb") as f:
+            f.write(b"garbage")
+        getattr(os, "replace", os.rename)(gb.filename + ".new", gb.filename)
+        self.assertRaises(ValueError, CompiledPatterns, gb.filename)
+        again = compiled_patterns(os.path.join(DICT_DIR, "hyph_en_GB.dic"), 2, self.tmpdir)
+        self.assertEqual(again.priorities(u".hyphenation."), us.priorities(u".hyphenation."))
+        # a truncated file with a valid header
+        with open(again.filename, "rb") as f:
+            data = f.read()
+        with open(gb.filename + ".new", "wb") as f:
+            f.write(data[:len(data) // 2])
+        getattr(os, "replace", os.rename)(gb.filename + ".new", gb.filename)
+        self.assertRaises(ValueError, CompiledPatterns, gb.filename)
+        again = compiled_patterns(os.path.join(DICT_DIR, "hyph_en_GB.dic"), 2, self.tmpdir)
+        self.assertEqual(again.priorities(u".hyphenation."), us.priorities(u".hyphenation."))
+
+    @unittest.skipIf(not hasattr(os, "getuid"), "no file owners")
+    def test_private_temp_dir(self):
+        path = private_temp_dir("test")
+        self.assertTrue(os.path.isdir(path))
+        self.assertEqual(os.stat(path).st_mode & 0o077, 0)
+        self.assertEqual(private_temp_dir("test"), path)
+        os.chmod(path, 0o777)
+        try:
+            self.assertEqual(private_temp_dir("test"), None) # others could plant files
+        finally:
+            os.rmdir(path)
+
+    def test_pyhnj(self):
+        compiled = PyHnjHyphenator("de_DE", 5, purePython=True)
+        plain = PyHnjHyphenator("de_DE", 5, purePython=True, compiledPatterns=False)
+        self.assertTrue(isinstance(compiled.trie, CompiledPatterns))
+        self.assertTrue(isinstance(plain.trie, PatternTrie))
+        self.assertEqual(compiled.characters, plain.characters)
+        for word in [u"Silbentrennung", u"Gr\xf6\xdfenordnung", u"Schifffahrt"]:
+            self.assertEqual([hp.indx for hp in compiled.zerlegeWort(word)],
+                             [hp.indx for hp in plain.zerlegeWort(word)])
+        # the pattern file is only hashed when the version is needed
+        self.assertEqual(plain._patterns_version, None)
+        self.assertEqual(plain.dictionary_version(), compiled.dictionary_version())
+        self.assertEqual(plain._patterns_version, patterns_version(plain.fname))
+
+
+@unittest.skipIf(batch_matcher is None, "NumPy is not installed")
+class BatchTestCase(unittest.TestCase):
+    "Test Liang's algorithm for many words at once."
+
+    def test_priorities(self):
+        patterns = [u"hy3ph", u"he2n", u"hena4", u"hen5at", u"1na", u"n2at", u"1tio", u"2io", u"o2n."]
+        trie = PatternTrie(patterns)
+        words = [u".hyphenation.", u"", u".ab\u0444", u".nation"]
+        prios = batch_matcher(trie).priorities(words)
+        for word, row in zip(words, prios.tolist()):
+            self.assertEqual(row[:len(word)+1], trie.priorities(word))
+        self.assertTrue(batch_matcher(trie) is batch_matcher(trie))
+
+    def test_hyphenate_many(self):
+        hyphenator = PyHnjHyphenator("de_DE", 5, purePython=True)
+        hyphenator.add_entry(u"Silbentrennung", u"Sil3ben5tren1nung")
+        words = [u"Silbentrennung", u"Gr\xf6\xdfenordnung", u"Schifffahrt", u"(Schifffahrt)",
+                 u"Silben-Trennung", u"ab", u"Donau\xaddampfschiff", u"\u0444\u0444\u0444\u0444\u0444"]
+        words += [u"Wort%s" % u"".join([u"aeioulmnst"[int(d)] for d in str(i)]) for i in range(200)]
+        batch = hyphenator.i_hyphenate_many(words)
+        single = ExplicitHyphenator.i_hyphenate_many_derived(hyphenator, words)
+        self.assertEqual([points(hword) for hword in batch], [points(hword) for hword in single])
+        self.assertEqual([hp.indx for hp in batch[0].hyphenations], [3, 6, 10])
+
+
+if __name__ == "__main__":
+    unittest.main()
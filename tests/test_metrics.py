@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from wordaxe.hyphen import Hyphenator, Cached
+from wordaxe.metrics import Instrumented, LatencyHistogram
+from wordaxe.DCWHyphenator import DCWHyphenator
+
+
+class LatencyHistogramTestCase(unittest.TestCase):
+    "Test the latency histogram."
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram((0.001, 0.01, 0.1))
+        self.assertEqual(histogram.percentile(50), None)
+        for seconds in [0.0005] * 8 + [0.005, 0.05]:
+            histogram.observe(seconds)
+        histogram.observe(2.0, 0)
+        self.assertEqual(histogram.counts, [8, 1, 1, 0])
+        self.assertEqual(histogram.percentile(50), 0.001)
+        self.assertEqual(histogram.percentile(90), 0.01)
+        self.assertEqual(histogram.percentile(100), 0.1)
+        histogram.observe(2.0)
+        self.assertEqual(histogram.percentile(100), None)
+
+
+class InstrumentedTestCase(unittest.TestCase):
+    "Test the instrumentation wrapper."
+
+    def setUp(self):
+        self.dcw = DCWHyphenator("DE", 5)
+
+    def test_counters(self):
+        events = []
+        hyphenator = Instrumented(self.dcw, callback=lambda *args: events.append(args))
+        hword = hyphenator.hyphenate(u"Silbentrennung")
+        self.assertEqual(hword, u"Silbentrennung")
+        # the base class does not know any words
+        other = Instrumented(Hyphenator("DE"), callback=hyphenator.callback, metrics=hyphenator.metrics)
+        other.hyphenate(u"Xqzyxw")
+        hwords = hyphenator.hyphenate_many([u"Bundeskanzleramt", u"Silbentrennung", u"Bundeskanzleramt"])
+        self.assertEqual(len(hwords), 3)
+        stats = hyphenator.stats()
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["words"], 5)
+        self.assertEqual(stats["unknown"], 1)
+        points = 2 * len(hword.hyphenations) + 2 * len(hwords[0].hyphenations)
+        self.assertEqual(stats["points"], points)
+        self.assertEqual(stats["points_per_word"], points / 4.0)
+        self.assertEqual(stats["latency"]["count"], 5)
+        self.assertTrue(stats["states_examined"] > 0)
+        self.assertTrue(stats["subword_cache"]["misses"] > 0)
+        self.assertEqual(len(events), 3)
+        self.assertTrue(events[0][0] is hyphenator)
+        self.assertTrue(events[1][0] is other)
+        self.assertEqual(events[1][1:3], ([u"Xqzyxw"], [None]))
+
+    def test_sampling(self):
+        events = []
+        hyphenator = Instrumented(self.dcw, sample_every=3, callback=lambda *args: events.append(args))
+        for i in range(10):
+            hyphenator.hyphenate(u"Silbentrennung")
+        stats = hyphenator.stats()
+        self.assertEqual(stats["calls"], 10)
+        self.assertEqual(stats["latency"]["count"], 4)
+        self.assertEqual(len(events), 4)
+        hyphenator.metrics.reset()
+        hyphenator.sample_every = 0
+        hyphenator.hyphenate(u"Silbentrennung")
+        self.assertEqual(hyphenator.stats()["latency"]["count"], 0)
+
+    def test_cached(self):
+        inner = Instrumented(self.dcw)
+        cached = Cached(inner, 100)
+        for i in range(5):
+            cached.hyphenate(u"Silbentrennung")
+        self.assertEqual(inner.stats()["calls"], 1)
+        self.assertEqual(inner.cache_namespace(), self.dcw.cache_namespace())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+
+from wordaxe.hyphen import Hyphenator
+from wordaxe.registry import HyphenatorRegistry
+
+
+class CountingFactory(object):
+    "Counts how many hyphenators have been built."
+
+    def __init__(self):
+        self.built = 0
+
+    def __call__(self, language, minWordLength=4):
+        self.built += 1
+        time.sleep(0.01)
+        return Hyphenator(language, minWordLength)
+
+
+class RegistryTestCase(unittest.TestCase):
+    "Test the lazy hyphenator registry."
+
+    def test_lazy(self):
+        registry = HyphenatorRegistry()
+        factory = CountingFactory()
+        registry.register("DE", factory, "DE", minWordLength=5)
+        self.assertTrue("DE" in registry)
+        self.assertEqual(factory.built, 0)
+        self.assertEqual(registry.loaded(), [])
+        hyphenator = registry.get("DE")
+        self.assertEqual(hyphenator.language, "DE")
+        self.assertTrue(registry["DE"] is hyphenator)
+        self.assertEqual(factory.built, 1)
+        self.assertEqual(registry.loaded(), ["DE"])
+        self.assertEqual(registry.get("XX"), None)
+        self.assertRaises(KeyError, registry.__getitem__, "XX")
+
+    def test_instance(self):
+        registry = HyphenatorRegistry()
+        hyphenator = Hyphenator("EN")
+        registry["EN"] = hyphenator
+        self.assertTrue(registry.get("EN") is hyphenator)
+        self.assertEqual(registry.factory("EN"), None)
+        self.assertFalse(registry.unload("EN"))
+        self.assertEqual(registry.unload_idle(0), [])
+        self.assertTrue(registry["EN"] is hyphenator)
+        del registry["EN"]
+        self.assertEqual(len(registry), 0)
+
+    def test_concurrent_build(self):
+        registry = HyphenatorRegistry()
+        factory = CountingFactory()
+        registry.register("DE", factory, "DE")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry["DE"]))
+                   for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(factory.built, 1)
+        for hyphenator in results:
+            self.assertTrue(hyphenator is results[0])
+
+    def test_unload(self):
+        registry = HyphenatorRegistry()
+        factory = CountingFactory()
+        registry.register("DE", factory, "DE")
+        registry.register("NL", factory, "NL")
+        registry["DE"]
+        registry["NL"]
+        self.assertTrue(registry.unload("NL"))
+        self.assertEqual(registry.loaded(), ["DE"])
+        time.sleep(0.05)
+        self.assertEqual(registry.unload_idle(0.02), ["DE"])
+        self.assertEqual(registry.loaded(), [])
+        registry["DE"]
+        self.assertEqual(factory.built, 3)
+
+    def test_max_idle(self):
+        registry = HyphenatorRegistry(max_idle=0.05)
+        factory = CountingFactory()
+        registry.register("DE", factory, "DE")
+        registry.register("NL", factory, "NL")
+        registry["NL"]
+        registry["DE"]
+        time.sleep(0.1)
+        registry["DE"]
+        self.assertEqual(registry.loaded(), ["DE"])
+
+
+if __name__ == "__main__":
+    unittest.main()
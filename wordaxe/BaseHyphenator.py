@@ -16,6 +16,7 @@ any language.
 '''
 
 import sys
+import re
 import logging
 logging.basicConfig()
 log = logging.getLogger("BaseHyphenator")
@@ -24,11 +25,14 @@ log.setLevel(logging.INFO)
 # Unicode type compatibility for Python 2 and 3
 if sys.version < '3':
     unicode_type = unicode # @UndefinedVariable
+    unicode_chr = unichr # @UndefinedVariable
 else:
     unicode_type = str
+    unicode_chr = chr
 
 from xml.sax.saxutils import escape,quoteattr
 import codecs
+from collections import OrderedDict
 from wordaxe.hyphen import *
 
 class Stripper(object):
@@ -48,14 +52,10 @@ class Stripper(object):
         Returns a tuple (prefix, base, postfix)
         such that word = prefix+base+postfix.
         """
-        lenword = len(word)
-        offs_l = 0
-        offs_r = lenword
-        while offs_l < lenword and word[offs_l] in self.prefix_chars:
-            offs_l += 1
-        while offs_r > offs_l and word[offs_r-1] in self.suffix_chars:
-            offs_r -= 1
-        return word[:offs_l], word[offs_l:offs_r], word[offs_r:]
+        base = word.lstrip(self.prefix_chars)
+        offs_l = len(word) - len(base)
+        base = base.rstrip(self.suffix_chars)
+        return word[:offs_l], base, word[offs_l+len(base):]
 
     def apply_stripped(self, func, hyphenator, word, *args, **kwargs):
         """
@@ -85,6 +85,118 @@ class Stripper(object):
 assert Stripper().strip(u"(Wie denn?") == (u"(", u"Wie denn", u"?")
 
 
+def _char_class(predicate):
+    """
+    Returns a regular expression character class (without the brackets)
+    matching the characters of the Basic Multilingual Plane
+    for which predicate is true.
+    """
+    ranges = []
+    start = None
+    for i in range(0x10001):
+        if i < 0x10000 and predicate(unicode_chr(i)):
+            if start is None:
+                start = i
+        elif start is not None:
+            ranges.append(u"%s-%s" % (re.escape(unicode_chr(start)), re.escape(unicode_chr(i-1))))
+            start = None
+    return u"".join(ranges)
+
+_CASE_CLASSES = []
+
+def _case_classes():
+    "Returns the character classes for lower and upper case letters (computed once)."
+    if not _CASE_CLASSES:
+        _CASE_CLASSES.extend([_char_class(lambda c: c.islower()),
+                              _char_class(lambda c: c.isupper())])
+    return _CASE_CLASSES
+
+# (shy, CamelCase) -> compiled scanner, see BaseHyphenator.hyph
+_SCANNERS = {}
+
+def _scanner(shy, camelCase):
+    """
+    Returns a compiled regular expression that finds all the
+    characters of interest for BaseHyphenator.hyph in a single pass.
+    """
+    try:
+        return _SCANNERS[shy, camelCase]
+    except KeyError:
+        pattern = u"(?P<hyphen>[-%s])|(?P<dot>[.,])|(?P<underscore>_)" % re.escape(shy)
+        if camelCase:
+            lower, upper = _case_classes()
+            pattern += u"|(?<=[%s])(?P<camel>[%s])(?=[%s])" % (lower, upper, lower)
+        scanner = _SCANNERS[shy, camelCase] = re.compile(pattern, re.UNICODE)
+        return scanner
+
+
+# The letters that learn counts
+_LEARN_LETTERS = frozenset(u"abcdefghijklmnopqrstuvwxyz\xe4\xf6\xfc\xc4\xd6\xdc\xdf")
+
+LEARN_HTML_HEADER = """<html>
+<head>
+<title>Silbentrennung</title>
+<style type="text/css">
+  span.ok         { background-color:#e0ffe0; }
+  span.unbekannt  { background-color:#fff8f8; color:#ff0000; font-weight:bold; }
+  span.mehrdeutig { background-color:#fff8f8; color:#ff4040; }
+  span.untrennbar { background-color:#e0ffe0; color:#004000; }
+  span.
+</style>
+</head>
+<body>
+<h1>Silbentrennung Trennungstest</h1>
+<p>
+"""
+
+LEARN_HTML_FOOTER = "</p></body></html>"
+
+class LearnStats(object):
+    """
+    The statistics collected by BaseHyphenator.learn_stats:
+    cntWords    - the number of words (with at least two different letters)
+    cntOK       - the number of words with hyphenation points
+    cntTooShort - the number of words shorter than minWordLength
+    unknown     - maps each unknown word (in lower case) to
+                  the number of occurences, in the order of
+                  their first occurence.
+    """
+
+    def __init__(self):
+        self.cntWords = 0
+        self.cntOK = 0
+        self.cntTooShort = 0
+        self.unknown = OrderedDict()
+
+    def merge(self, other):
+        "Adds the statistics of other (e.g. from another chunk of words)."
+        self.cntWords += other.cntWords
+        self.cntOK += other.cntOK
+        self.cntTooShort += other.cntTooShort
+        unknown = self.unknown
+        for word, count in other.unknown.items():
+            unknown[word] = unknown.get(word, 0) + count
+        return self
+
+class _Fragments(object):
+    "Collects the HTML (or VERBOSE) output of a chunk (file-like)."
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+    def getvalue(self):
+        return "".join(self.parts)
+
+def _learn_chunk(args):
+    "Runs learn for a chunk of words in a worker process, see learn_stats."
+    from wordaxe.corpus import worker_hyphenator
+    words, wantHtml, verbose = args
+    htmlFile = wantHtml and _Fragments() or None
+    verboseFile = verbose and _Fragments() or None
+    stats = worker_hyphenator()._learn(words, LearnStats(), htmlFile, verbose, verboseFile)
+    return (stats, htmlFile and htmlFile.getvalue() or "",
+            verboseFile and verboseFile.getvalue() or "")
+
+
 class BaseHyphenator(Hyphenator):
     """
     This hyphenator is the most basic hyphenator which should work for
@@ -106,37 +218,42 @@ class BaseHyphenator(Hyphenator):
         This is the non-recursive hyphenation function.
         """
         #print "BaseHyphenator hyph", word
-        hword = HyphenatedWord(word, hyphenations=[])
-        # strip common prefix- and suffix-characters
         l = len(word)
         if l < self.minWordLength:
-            return hword
-        # @TODO better use a regular expression for number/date detection
+            return HyphenatedWord(word, hyphenations=[])
+        camelCase = bool(self.options.get("CamelCase"))
+        # The scanner only knows the letter cases inside the BMP
+        bmp = not camelCase or max(word) <= u"\uffff"
         hyphenations = []
-        for p in range(1,l-1):
-            if word[p] in [u"-", self.shy]:
+        for m in _scanner(self.shy, camelCase and bmp).finditer(word, 1):
+            p = m.start()
+            if p >= l-1:
+                break
+            kind = m.lastgroup
+            if kind == "hyphen":
                 hyphenations.append(HyphenationPoint(p+1,9,0,u"",0,u""))
-            elif word[p] in ".,":
-                if word[p-1] in u"-+0123456789" and p+1<l and word[p+1] in u"-+0123456789":
+            elif kind == "dot":
+                if word[p-1] in u"-+0123456789" and word[p+1] in u"-+0123456789":
                     # a number or a date
                     pass
                 elif l<=3 or (word[p]==u"." and word[-1]==u"."):
                     # an abbreviation, for example "i.e."
-                    return hword
-                elif p+1<l and word[p+1] not in [u'.', u'\xA0']:
+                    return HyphenatedWord(word, hyphenations=[])
+                elif word[p+1] not in [u'.', u'\xA0']:
                     hyphenations.append(HyphenationPoint(p+1,5,0,self.shy,0,u""))
-            elif word[p] in "_":
+            elif kind == "underscore":
                 hyphenations.append(HyphenationPoint(p+1,5,0,self.shy,0,u""))
-        if self.options.get("CamelCase"):
+            elif 2 <= p < l-2:
+                # CamelCase
+                hyphenations.append(HyphenationPoint(p,5,0,self.shy,0,u""))
+        if not bmp:
             # add CamelCase hyphenation points
-            # TODO performance tuning
             for p in range(2,l-2):
                 if word[p-1].islower() and word[p].isupper() and word[p+1].islower():
                     hyphenations.append(HyphenationPoint(p,5,0,self.shy,0,u""))
-            hyphenations.sort()
+            hyphenations.sort(key=lambda hp: hp.indx)
         if hyphenations:
-            hword.hyphenations = hyphenations
-            return hword
+            return HyphenatedWord(word, hyphenations=hyphenations)
         return None # unknown
 
     def i_hyphenate(self,aWord):
@@ -146,55 +263,74 @@ class BaseHyphenator(Hyphenator):
         assert isinstance(aWord, unicode_type)
         return self.stripper.apply_stripped(BaseHyphenator.hyph, self, aWord)
 
-    def learn(self,wordlist,htmlFile=None,VERBOSE=False):
-        #print sys.stdout.encoding
-        #print "VERBOSE:", VERBOSE
-        cntWords = 0
-        cntOK = 0
-        unknownWords = []
-        cntTooShort = 0
-        letters = "abcdefghijklmnopqrstuvwxyz".decode("iso-8859-1")
+    def learn(self,wordlist,htmlFile=None,VERBOSE=False,processes=None,chunk_size=10000):
+        """
+        Hyphenates the words from wordlist (any iterable, "\n" marks
+        a new paragraph) to find words that the hyphenator does not know.
+        Returns a tuple (cntWords, cntOK, cntTooShort, unknownWords),
+        see learn_stats for the details.
+        """
+        stats = self.learn_stats(wordlist, htmlFile, VERBOSE, processes, chunk_size)
+        return (stats.cntWords, stats.cntOK, stats.cntTooShort, list(stats.unknown))
 
+    def learn_stats(self,wordlist,htmlFile=None,VERBOSE=False,processes=None,chunk_size=10000):
+        """
+        Like learn, but returns a LearnStats instance.
+        
+        The words are read from wordlist one by one, so it can be
+        an iterator over a huge corpus.
+        If processes is given, the work is shared by that many
+        worker processes (in chunks of chunk_size words);
+        the statistics, the HTML output and the VERBOSE output
+        (printed by the main process) are merged in the order
+        of the input.
+        """
+        stats = LearnStats()
         if htmlFile:
-            htmlFile.write ("""<html>
-<head>
-<title>Silbentrennung</title>
-<style type="text/css">
-  span.ok         { background-color:#e0ffe0; }
-  span.unbekannt  { background-color:#fff8f8; color:#ff0000; font-weight:bold; }
-  span.mehrdeutig { background-color:#fff8f8; color:#ff4040; }
-  span.untrennbar { background-color:#e0ffe0; color:#004000; }
-  span.
-</style>
-</head>
-<body>
-<h1>Silbentrennung Trennungstest</h1>
-<p>
-""")
+            htmlFile.write(LEARN_HTML_HEADER)
+        if processes:
+            from wordaxe.corpus import CorpusHyphenator, chunked
+            with CorpusHyphenator(self, processes=processes, chunk_size=chunk_size) as driver:
+                chunks = driver.map_chunks(_learn_chunk, 
+                                           ((chunk, bool(htmlFile), bool(VERBOSE))
+                                            for chunk in chunked(wordlist, chunk_size)))
+                for (chunk, wantHtml, verbose), (chunk_stats, html, output) in chunks:
+                    stats.merge(chunk_stats)
+                    if htmlFile:
+                        htmlFile.write(html)
+                    if output:
+                        sys.stdout.write(output)
+        else:
+            self._learn(wordlist, stats, htmlFile, VERBOSE)
+        if htmlFile:
+            htmlFile.write(LEARN_HTML_FOOTER)
+        return stats
+
+    def _learn(self, wordlist, stats, htmlFile=None, VERBOSE=False, verboseFile=None):
+        """
+        The work of learn_stats, adding to stats and writing the HTML spans.
+        The VERBOSE output is printed to verboseFile (default: sys.stdout).
+        """
+        unknown = stats.unknown
         for w in wordlist:
             if w=="\n":
                 if htmlFile: htmlFile.write("</p>\n<p>")
                 continue
             # enthlt das Wort mindestens zwei verschiedene Buchstaben?
             wlower = w.lower()
-            nletters = 0
-            for ch in letters:
-                if ch in wlower:
-                    nletters  += 1
-            if nletters >= 2:
-                cntWords += 1
+            if len(_LEARN_LETTERS.intersection(wlower)) >= 2:
+                stats.cntWords += 1
                 if len(w) < self.minWordLength:
-                    cntTooShort += 1
+                    stats.cntTooShort += 1
                     if htmlFile:
                         htmlFile.write("<span class='untrennbar' title='untrennbar'>%s</span>\n" % escape(w))
                 else:
                     #print w
                     loesung = self.hyphenate(w)
                     if loesung is None:
-                        if wlower not in unknownWords:
-                            unknownWords.append(wlower)
+                        unknown[wlower] = unknown.get(wlower, 0) + 1
                     elif loesung.hyphenations:
-                        cntOK += 1
+                        stats.cntOK += 1
                         if htmlFile:
                             x = w
                             ins=0
@@ -204,16 +340,13 @@ class BaseHyphenator(Hyphenator):
                                     ins += 1
                             htmlFile.write("<span class=%s title=%s>%s</span>\n" % (quoteattr("ok"), quoteattr(str(loesung.hyphenations)), x))
                         elif VERBOSE:
-                            print(w, loesung.hyphenations)
+                            print(w, loesung.hyphenations, file=verboseFile)
                     else:
                         if htmlFile:
-                            htmlFile.write("<span class=%s title=%s>%s</span>\n" % (quoteattr("nicht trennbar"), quoteattr(hint), escape(w)))
+                            htmlFile.write("<span class=%s title=%s>%s</span>\n" % (quoteattr("nicht trennbar"), quoteattr("nicht trennbar"), escape(w)))
                         elif VERBOSE:
-                            print(w, "Nicht trennbar:", repr(loesung))
-        if htmlFile:
-            htmlFile.write("</p></body></html>")
-
-        return (cntWords, cntOK, cntTooShort, unknownWords)
+                            print(w, "Nicht trennbar:", repr(loesung), file=verboseFile)
+        return stats
 
 
     def test(self, encoding="iso-8859-1", outfname="out.html"):
@@ -221,7 +354,7 @@ class BaseHyphenator(Hyphenator):
         Testfunktion (Aufruf aus einem Hauptprogramm).
         """
         import sys
-        import time
+        from timeit import default_timer as timer
         wortliste = []
         args = sys.argv[1:]
 
@@ -249,11 +382,11 @@ class BaseHyphenator(Hyphenator):
 
         #timer = timeit.Timer(stmt="result=h.learn(wortliste)")
         #timer.timeit(runs)
-        startzeit = time.clock()
+        startzeit = timer()
         for x in range(runs):
             print("run %d" % x)
             result = self.learn(wortliste, VERBOSE=verbose, htmlFile=out)
-        endezeit = time.clock()
+        endezeit = timer()
         cntWords,cntOK,cntTooShort,unknownWords = result
 
         print("""
@@ -288,24 +421,12 @@ class BaseHyphenator(Hyphenator):
         E.g. each line is a test case.
         The test outputs those words where the hyphenated version does not match
         the expected output.
+        See wordaxe.wordlist.check_word_list for a faster version
+        which reports precision and recall.
         """
-        for zeile in codecs.open(fname,"rU", encoding):
-            assert isinstance(zeile,unicode_type)
-            word, expected = zeile.strip().split()
-            loesung = self.hyphenate(word)
-            if loesung is None:
-                output = word # unknown word
-            elif loesung.hyphenations:
-                x = word
-                ins=0
-                for h in loesung.hyphenations:
-                    h.sl = h.sl.replace(SHY, "-")
-                    ###if h.nl==0 and h.sl==self.shy:
-                    x = x[:ins+h.indx]+h.sl+x[ins+h.indx:]
-                    ins += len(h.sl) - h.nl
-                output = x
-            else:
-                output = word
+        from wordaxe.wordlist import read_word_list, hyphenated_form
+        for word, expected in read_word_list(fname, encoding):
+            output = hyphenated_form(word, self.hyphenate(word))
             if output != expected:
                 error ("%r: output=%r but expected=%r", word, output, expected)
 
@@ -10,9 +10,9 @@ __license__="""
 __version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
 
 import os,sys
-import copy
 import operator
 import codecs
+from hashlib import md5
 
 # Unicode type compatibility for Python 2 and 3
 if sys.version < '3':
@@ -24,12 +24,13 @@ from wordaxe.hyphen import SHY,HyphenationPoint,HyphenatedWord
 import time
 from wordaxe.BaseHyphenator import Stripper, BaseHyphenator
 from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+from wordaxe.dcwdict import DCWDictionary, load_dictionary
 
 from wordaxe.hyphrules import HyphRule, RULES, AlgorithmError
 
-from wordaxe.hyphrules import NO_CHECKS,StringWithProps,Prefix,Root,Suffix
+from wordaxe.hyphrules import NO_CHECKS,StringWithProps,Prefix,Root,Suffix,RuleList,check_mask
 from wordaxe.hyphrules import TRENNUNG,NO_SUFFIX,NEED_SUFFIX,KEEP_TOGETHER
-import wordaxe.dict.DEhyph as DEhyph
+from wordaxe.hyphrules import ONLY_FIRST_WORD,ONLY_LAST_WORD,NOT_AFTER_WORD,NOT_LAST_WORD,SINGLE_WORD
 
 DEBUG=0
 
@@ -40,21 +41,107 @@ log.setLevel(logging.INFO)
 if DEBUG:
     log.setLevel(logging.DEBUG)
 
+class Chain(object):
+    """An immutable list, which shares its items with the chain it
+       was made from: Chain(item, chain) is chain with item at the end,
+       created without copying chain.
+       Chains can be used like (read-only) lists; the last item
+       and the length are available without walking the chain.
+    """
+    __slots__ = ["last", "before", "length"]
+
+    def __init__(self, last=None, before=None):
+        self.last = last
+        self.before = before
+        self.length = before is not None and before.length + 1 or 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        items = []
+        chain = self
+        while chain.length:
+            items.append(chain.last)
+            chain = chain.before
+        items.reverse()
+        return iter(items)
+
+    def __getitem__(self, index):
+        if index == -1 and self.length:
+            return self.last
+        return list(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (Chain, list)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+EMPTY = Chain()
+
+class _Mark(object):
+    """The mark of a rule without its own slot in WordFrag
+       (see WordFrag.allow_mark), stored in the dict WordFrag.marks.
+    """
+    __slots__ = ["name"]
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, wfrag, cls=None):
+        if wfrag is None:
+            return self
+        marks = wfrag.marks
+        if marks is None or self.name not in marks:
+            raise AttributeError(self.name)
+        return marks[self.name]
+
+    def __set__(self, wfrag, value):
+        if wfrag.marks is None:
+            wfrag.marks = {}
+        wfrag.marks[self.name] = value
+
 class WordFrag(object):
     """Helper class for a (partially) parsed WordFrag.
        A WordFrag is made up from prefix_chars, prefix, root, suffix, and suffix_chars,
        i.e. the german word "(unveränderbarkeit)!" 
        is a WordFrag ( "(", ["un","ver"], "änder", ["bar","keit"], ")!" ).
+       prefix and suffix are Chains.
+       Rules can mark a WordFrag by setting an attribute (with the name
+       of the rule) to True: FREMDWORT, ENGLISCH and NOT_LAST_WORD have
+       their own slots, the marks of the other rules in hyphrules.RULES
+       are stored in the dict marks (None as long as there are none).
+       Rules using other attribute names have to call allow_mark.
     """
+    __slots__ = ["konsonantenverkuerzung_3_2", "prefix_chars", "prefix", "root", "suffix", "suffix_chars",
+                 "FREMDWORT", "ENGLISCH", "NOT_LAST_WORD", "marks"]
        
     def __init__(self,konsonantenverkuerzung_3_2=False):
         self.konsonantenverkuerzung_3_2 = konsonantenverkuerzung_3_2
         self.prefix_chars = ""
-        self.prefix = []
+        self.prefix = EMPTY
         self.root = None
         self.suffix = None
         self.suffix_chars = ""
-        self.checks = [[],[],[],[],[],[]]
+        self.FREMDWORT = self.ENGLISCH = self.NOT_LAST_WORD = False
+        self.marks = None
+
+    @staticmethod
+    def allow_mark(name):
+        "Allows rules to mark WordFrags by setting the attribute name."
+        if not hasattr(WordFrag, name):
+            setattr(WordFrag, name, _Mark(name))
 
     def isValid(self):
        "Is the WordFrag (stand alone) a valid word?"
@@ -67,35 +154,55 @@ class WordFrag(object):
     def __repr__(self):
        return self.__str__()
     
+    def _assign(self, tw):
+        "Copy all attributes of tw to self."
+        self.konsonantenverkuerzung_3_2 = tw.konsonantenverkuerzung_3_2
+        self.prefix_chars = tw.prefix_chars
+        self.prefix = tw.prefix
+        self.root = tw.root
+        self.suffix = tw.suffix
+        self.suffix_chars = tw.suffix_chars
+        self.FREMDWORT = tw.FREMDWORT
+        self.ENGLISCH = tw.ENGLISCH
+        self.NOT_LAST_WORD = tw.NOT_LAST_WORD
+        marks = tw.marks
+        if marks is not None:
+            marks = dict(marks)
+        self.marks = marks
+
     def clone(self):
-        return copy.copy(self)
+        n = object.__new__(self.__class__)
+        n._assign(self)
+        return n
 
 class PrefixWordFrag(WordFrag):
     """A WordFrag that does not yet contain the root.
     """
-    def __init__(self,tw,prefix_chars="",prefix=[]):
-        if tw is None: tw = WordFrag()
-        # Auch alle sonstigen Attribute der Vorlage mit übernehmen
-        # @TODO Dieser Code ist wirklich hässlich:
-        self.__dict__.update(tw.__dict__)
-        WordFrag.__init__(self,konsonantenverkuerzung_3_2=tw.konsonantenverkuerzung_3_2)
-        self.prefix_chars = prefix_chars or tw.prefix_chars
-        self.prefix = prefix or tw.prefix
+    __slots__ = []
+
+    def __init__(self,tw,prefix_chars="",prefix=EMPTY):
+        if tw is None:
+            WordFrag.__init__(self)
+        else:
+            # Auch alle sonstigen Attribute der Vorlage mit übernehmen
+            self._assign(tw)
+            self.root = None
+            self.suffix = None
+            self.suffix_chars = ""
+        self.prefix_chars = prefix_chars or self.prefix_chars
+        self.prefix = prefix or self.prefix
 
     def __str__(self):
        "String representation"
        return "PrefixWF " + self.prefix_chars + "-".join([p.strval for p in self.prefix])
-
-    def clone(self):
-        n = copy.copy(self)
-        n.prefix = self.prefix[:]
-        return n
         
 class SuffixWordFrag(PrefixWordFrag):
     """A WordFrag that does contain a root and eventually a suffix.
     """
-    def __init__(self,tw,root=None,suffix=[],suffix_chars=[]):
-        if tw is None: tw = PrefixWordFrag(None,[])
+    __slots__ = []
+
+    def __init__(self,tw,root=None,suffix=EMPTY,suffix_chars=""):
+        if tw is None: tw = PrefixWordFrag(None)
         PrefixWordFrag.__init__(self,tw)
         self.root = root or tw.root
         self.suffix = suffix
@@ -107,12 +214,6 @@ class SuffixWordFrag(PrefixWordFrag):
               "|" + self.root.strval + "|" + ":".join([s.strval for s in self.suffix]) + \
               (self.konsonantenverkuerzung_3_2 and "!3>2" or "")
 
-    def clone(self):
-        n = copy.copy(self)
-        n.suffix = self.suffix[:]
-        
-        return n
-
     def isValid(self):    
         if not self.suffix:
             for p in self.root.props:
@@ -122,8 +223,16 @@ class SuffixWordFrag(PrefixWordFrag):
         
 SWORD = SuffixWordFrag
 
+# The rules checked PRE_WORD, PRE_NEXT_WORD or AT_END which
+# DCWHyphenator knows how to handle when memoizing.
+_WORD_RULES = (ONLY_FIRST_WORD, ONLY_LAST_WORD, NOT_AFTER_WORD, NOT_LAST_WORD, SINGLE_WORD,
+               TRENNUNG, KEEP_TOGETHER)
+
 VOWELS = u"aeiouäöüy"
 
+# The additional PRE_NEXT_PIECE check for Konsonantenverkürzung
+_KV_NO_SUFFIX = NO_SUFFIX()
+
 ALTE_REGELN = False
 
 KONSTANTEN_VERKUERZUNG_3_2 = True
@@ -175,9 +284,22 @@ class DCWHyphenator(ExplicitHyphenator):
                   qVorsilbe=5,
                   qSchlecht=3,
                   hyphenDir=None,
+                  memoize=False,
+                  dictionary=None,
                   **options
                  ):
+        """ Note:
+            dictionary is a DCWDictionary or the file name of
+            a dictionary file (see wordaxe.dcwdict); by default,
+            the dictionary wordaxe/dict/DEhyph.py is used.
+            It is parsed only once and then shared by all instances.
+            If memoize is true, _zerlegeWort computes the decompositions
+            of the rest of the word after each simple word only once
+            (see _zerlegeWort). The results are the same, but far fewer
+            states are examined for long compound words.
+        """
         ExplicitHyphenator.__init__(self,language=language,minWordLength=minWordLength, **options)
+        self.memoize = memoize
 
         # Qualitäten für verschiedene Trennstellen
         self.qHaupt=qHaupt
@@ -186,87 +308,81 @@ class DCWHyphenator(ExplicitHyphenator):
         self.qSchlecht=qSchlecht
         
         # Stammdaten initialisieren
-        special_words = []
-        self.roots = []
-        self.prefixes = []
-        self.suffixes = []
-        self.prefix_chars = DEhyph.prefix_chars
-        self.suffix_chars = DEhyph.suffix_chars
+        if not isinstance(dictionary, DCWDictionary):
+            dictionary = load_dictionary(dictionary)
+        self.dictionary = dictionary
+        self.prefix_chars = dictionary.prefix_chars
+        self.suffix_chars = dictionary.suffix_chars
         self.maxLevel=20
         
         # Statistikdaten initialisieren
         self.numStatesExamined = 0
         
-        # [special_words] einlesen
-        for zeile in DEhyph.special_words.splitlines():
-            # Leerzeilen und Kommentare überspringen
-            zeile = zeile.strip()
-            if not zeile or zeile.startswith("#"):
-                continue
-            if "=" in zeile:
-                word, trennung = zeile.split("=")
-            else:
-                zeile = zeile.split(",")
-                word = zeile.pop(0)
-                assert len(zeile) >= 1
-                for attr in zeile:
-                    if ":" in attr:
-                        propnam, propval = attr.split(":")
-                    else:
-                        propnam, propval = attr, ""
-                    if propnam == u"TRENNUNG":
-                        trennung = propval
-                    elif propnam == u"KEEP_TOGETHER":
-                        trennung = word
-                    else:
-                        raise NameError("Unknown property for word %s: %s" % (word, propnam))
-                        pass # Attribut ignorieren
+        for word, trennung in dictionary.entries:
             self.add_entry(word, trennung)
-
-        
-        # roots, prefixes und suffixes einlesen.
-        # Bei diesen können noch - Komma-getrennt - Eigenschaften angegeben sein.
-        # Eine Eigenschaft hat die Form XXX oder XXX:a,b,c
-        for name in ["roots", "prefixes", "suffixes"]:
-            abschnitt = getattr(self, name)
-            zeilen = getattr(DEhyph, name)
-            assert isinstance(zeilen, unicode_type)
-            for zeile in zeilen.splitlines():
-                # Leerzeilen und Kommentare überspringen
-                zeile = zeile.strip()
-                if not zeile or zeile.startswith("#"):
-                    continue
-                # Aufteilen in word und props
-                zeile = zeile.split(",")
-                word = zeile.pop(0)
-                props = []
-                if len(zeile) >= 1:
-                  for attr in zeile:
-                    if ":" in attr:
-                        [propnam,propval] = attr.split(":")
-                    else:
-                        propnam = attr
-                        propval = ""
-                    try:
-                        cls = RULES[propnam]
-                        props.append(cls(propval)) # the class is the propnam
-                    except KeyError:
-                        raise NameError("Unknown property for word %s: %s" % (word,propnam))
-                # Jeder abschnitt ist eine Liste von Tupeln (lae, L), wobei L
-                # ein Dictionary von Wörtern der Länge lae ist und dazu die Liste
-                # der möglichen Eigenschaften enthält (dasselbe Wort kann je nach 
-                # Bedeutung unterschiedliche Eigenschaften haben).
-                lenword = len(word)
-                for (lae,L) in abschnitt:
-                    if lae==lenword:
-                      try:
-                          L[word].append(props)
-                      except KeyError:
-                          L[word]=[props]
-                      break
-                else:
-                    abschnitt.append((lenword,{word:[props]}))
         self.stripper = Stripper(self.prefix_chars, self.suffix_chars)
+        self._after_words = None
+        for name in RULES:
+            WordFrag.allow_mark(name)
+
+    # the lists (lae, L) of the dictionary, created on first use
+    roots = property(lambda self: self.dictionary.roots)
+    prefixes = property(lambda self: self.dictionary.prefixes)
+    suffixes = property(lambda self: self.dictionary.suffixes)
+
+    def _piece_lattice(self, zusgWort):
+        """
+        Finds all the prefixes, roots and suffixes in zusgWort at once.
+        Returns a list with an entry for each position in zusgWort:
+        a tuple of three lists (prefixes, roots, suffixes) of the pieces
+        starting there, each piece as a tuple (order, piece, end, candidates),
+        sorted like the (length, dict) buckets in self.prefixes,
+        self.roots and self.suffixes. candidates is the list of
+        (Prefix, Root or Suffix, checks) for each list of properties
+        (see DCWDictionary.find_pieces).
+        """
+        lattice = [([], [], []) for i in range(len(zusgWort) + 1)]
+        for start, end, (kind, order, piece, candidates) in self.dictionary.find_pieces(zusgWort):
+            lattice[start][kind].append((order, piece, end, candidates))
+        for pieces in lattice:
+            for L in pieces:
+                if len(L) > 1:
+                    L.sort(key=lambda x: x[0])
+        return lattice
+
+    def _memo_after_words(self):
+        """
+        Returns the set of the roots given in NOT_AFTER_WORD rules
+        (empty if there are none), or None if memoizing is not possible,
+        because there are rules for words unknown to _zerlegeWort.
+        """
+        if self._after_words is None:
+            word_checks = set([HyphRule.PRE_WORD, HyphRule.PRE_NEXT_WORD, HyphRule.AT_END])
+            after_words = set()
+            for p in [p for abschnitt in [self.prefixes, self.roots, self.suffixes]
+                        for lae, L in abschnitt
+                        for props_list in L.values()
+                        for props in props_list
+                        for p in props
+                        if word_checks & set(p.when)]:
+                if p.__class__ not in _WORD_RULES:
+                    after_words = False
+                    break
+                if isinstance(p, NOT_AFTER_WORD):
+                    after_words.update(p.args.split())
+            self._after_words = after_words
+        if self._after_words is False:
+            return None
+        return self._after_words
+
+    def dictionary_version(self):
+        """
+        Returns a hash value of the dictionary
+        and the explicitly given entries.
+        """
+        h = md5(self.dictionary.version.encode("ascii"))
+        h.update(ExplicitHyphenator.dictionary_version(self).encode("ascii"))
+        return h.hexdigest()
 
     def _zerlegeWort(self,zusgWort):
         """"
@@ -275,45 +391,63 @@ class DCWHyphenator(ExplicitHyphenator):
 
         A TODO list contains the cases that still have to be considered.
         Each element in this list is a tuple
-        (cword,frag,remainder,checks) characterising the state precisely.
+        (cword,frag,pos,checks) characterising the state precisely.
         
         Notation:
         CWORD = compound word, a list of SWORDs
         SWORD = simple word = prefix* root suffix*
 
-        cword is a list containing the already parsed SWORDs.
+        cword is a Chain containing the already parsed SWORDs.
         frag is a fragment of the current SWORD.
-        remainder is the remainder of the unparsed words.
+        pos is the position of the remainder of the unparsed words,
+        i.e. the remainder is zusgWort[pos:].
         checks describes the checks we still have to do.
+        The states share cword, the prefixes and suffixes
+        of frag and the lists of checks with the state they
+        were made from, nothing of it is ever modified.
         
         A solution list contains the solutions found so far
         (it is empty in the beginning).
         
         In the beginning, the TODO-list contains only one element,
         the initial status:
-        ([], None, zusgWort, [])
+        (EMPTY, None, 0, [])
         
         For the word "Wegbeschreibung", a status could
         look like this:
         ( [ SWORD([],Root("Weg"),[]) ],
           SuffixWordFrag ([Prefix("be")],Root("schreib"),[]),
-          "ung",
+          12, # "ung"
           []
         )
         
         If the TODO list is empty, the solutions found are returned.
+
+        The prefixes, roots and suffixes are not looked up for each
+        state, instead all of them are found once in advance
+        (see _piece_lattice).
         
         Otherwise, one element of the list is removed and examined.
         Depending on the frag, we try all possible extensions of the
         frag with a prefix,root or postfix.
         If a continuation is possible, then the continued frag
         and is appended to the TODO list.
+
+        If self.memoize is true, the solutions for the remainder after
+        a complete SWORD (i.e. a state with frag None) are remembered.
+        They only depend on the position in zusgWort, on the pending
+        AT_END checks and on the SWORD before (see memo_key),
+        so they are computed only once and combined with every
+        cword leading to the same position.
+
+        The solutions are returned as lists of SWORDs.
         """
 
         def mergeChecks(c1,c2):
             """Create a new list of checks from c1 and c2
+               (the lists of checks are never modified, so they can be shared).
             """
-            return list(map(operator.__add__,c1,c2))
+            return [(a + b if a else b) if b else a for a, b in zip(c1,c2)]
         
         def do_check_frag(when,cword,frag,checks):
             """Run the PRE_WORD or PRE_NEXT_WORD checks before appending frag to cword.
@@ -331,7 +465,15 @@ class DCWHyphenator(ExplicitHyphenator):
         def do_check_piece(when,frag,piece,checks):
             """Run the PRE_PIECE or PRE_NEXT_PIECE checks before appending piece to frag.
             """
-            for chk in checks[when]:
+            chks = checks[when]
+            if not chks:
+                return True
+            if chks.__class__ is RuleList and chks.mask is not None:
+                # only simple rules
+                result = check_mask(chks.mask,when,frag,piece)
+                if result is not None:
+                    return result
+            for chk in chks:
                 if not chk.check(frag,when,piece):
                     log.debug ("check (chk=%r, when=%d) failed for piece %r", chk, when, piece.strval)
                     return False
@@ -355,10 +497,26 @@ class DCWHyphenator(ExplicitHyphenator):
         def check_PRE_ROOT(frag,piece,checks):
             return do_check_piece(HyphRule.PRE_ROOT,frag,piece,checks)
 
+        def memo_key(cword,pos,checks):
+            """The canonical form of a state with frag None.
+            """
+            last = None
+            if cword and cword.last.root.strval in after_words:
+                last = cword.last.root.strval
+            return (pos, not cword, last,
+                    frozenset([id(chk) for chk in checks[HyphRule.AT_END] if not isinstance(chk, TRENNUNG)]))
+
         # Initialization
+        lattice = self._piece_lattice(zusgWort)
+        lenword = len(zusgWort)
+        memo = None
+        if self.memoize:
+            after_words = self._memo_after_words()
+            if after_words is not None:
+                memo = {}
         solutions = []
         todo = []
-        state = ( [], None, zusgWort, NO_CHECKS())
+        state = ( EMPTY, None, 0, NO_CHECKS())
         todo.append (state)
         
         while todo:
@@ -367,7 +525,22 @@ class DCWHyphenator(ExplicitHyphenator):
             
             # Consider the next state
             state = todo.pop()
-            (cword,frag,remainder,checks) = state
+            (cword,frag,pos,checks) = state
+
+            if cword is None:
+                # All states after a complete SWORD have been examined,
+                # remember the solutions found (see memo_key).
+                (_,key,start,n) = state
+                memo[key] = [solution[n:] for solution in solutions[start:]]
+                continue
+
+            if memo is not None and frag is None and pos < lenword:
+                key = memo_key(cword,pos,checks)
+                if key in memo:
+                    head = list(cword)
+                    solutions.extend([head + rest for rest in memo[key]])
+                    continue
+                todo.append( (None,key,len(solutions),len(cword)) )
             
             log.debug ("Examining state: %r", state)
             self.numStatesExamined += 1
@@ -382,15 +555,15 @@ class DCWHyphenator(ExplicitHyphenator):
                 #log.debug ("Since fragment has a root, add test with None.")
                 newChecks = NO_CHECKS()
                 newChecks[HyphRule.AT_END] = checks[HyphRule.AT_END]
-                todo.append( (cword+[frag],None,remainder,newChecks) )
+                todo.append( (Chain(frag,cword),None,pos,newChecks) )
             
-            if remainder=="":  # we have reached the end of the word.
+            if pos == lenword:  # we have reached the end of the word.
 
                 if frag is None:  # good, we have no incomplete fragment
                 
                     if check_AT_END(cword,checks): # the last checks are ok
                         log.debug ("found solution: %r", cword)
-                        solutions.append(cword)
+                        solutions.append(list(cword))
                     else:
                         pass
                         log.debug ("check_AT_END failed for %r", cword)
@@ -406,22 +579,21 @@ class DCWHyphenator(ExplicitHyphenator):
             
                 if frag is None: 
                 
-                    log.debug ("frag is None, remainder=%r bei zerlegeWort %r", remainder, zusgWort)
+                    log.debug ("frag is None, pos=%d bei zerlegeWort %r", pos, zusgWort)
                 
                     # check prefix characters
-                    l = 0
-                    while l<len(remainder) and remainder[l] in self.prefix_chars:
+                    l = pos
+                    while l<lenword and zusgWort[l] in self.prefix_chars:
                         l = l+1
-                    if l>0:
+                    if l>pos:
                         ###HVB, 14.10.2006 geändert
                         ###newfrag = frag.clone()
                         ###newfrag.prefix_chars = remainder[:l]
                         ###r = remainder[l:]
                         ###todo.append ( (cword,newfrag,r,checks) )
                         ###continue # do not examine the current state any more.
-                        newfrag = PrefixWordFrag(None, prefix_chars=remainder[:l])
-                        r = remainder[l:]
-                        todo.append ( (cword,newfrag,r,checks) )
+                        newfrag = PrefixWordFrag(None, prefix_chars=zusgWort[pos:l])
+                        todo.append ( (cword,newfrag,l,checks) )
                         continue # do not examine the current state any more.
                     else:
                         # we need a fragment (even if it is empty) from here on.
@@ -431,21 +603,18 @@ class DCWHyphenator(ExplicitHyphenator):
 
                     # check all possible prefixes.
                     #log.debug ("checking prefixes.")
-                    for (lae,L) in self.prefixes:
-                      l,r = remainder[:lae],remainder[lae:]
-                      for eigenschaften in L.get(l,[]):
-                          #log.debug ("trying prefix: %s with properties: %s", l,eigenschaften)
-                          piece = Prefix(l,eigenschaften)
-                          pChecks = piece.getChecks()
+                    for (order,l,end,candidates) in lattice[pos][0]:
+                      for piece,pChecks in candidates:
+                          #log.debug ("trying prefix: %s with properties: %s", l,piece.props)
                           if check_PRE_PIECE(frag,piece,pChecks):
                               if check_PRE_NEXT_PIECE(frag,piece,checks):
                                   # @TODO perhaps the next few lines could be faster and more elegant
                                   newChecks = mergeChecks(checks,pChecks)
                                   newChecks[HyphRule.PRE_PIECE] = []
                                   newChecks[HyphRule.PRE_NEXT_PIECE] = pChecks[HyphRule.PRE_NEXT_PIECE]
-                                  newfrag = copy.copy(frag)
-                                  newfrag.prefix = frag.prefix + [piece]
-                                  todo.append( (cword,newfrag,r,newChecks) )
+                                  newfrag = frag.clone()
+                                  newfrag.prefix = Chain(piece,frag.prefix)
+                                  todo.append( (cword,newfrag,end,newChecks) )
                               else:
                                   pass # pre next piece checks failed
                           else:
@@ -453,13 +622,10 @@ class DCWHyphenator(ExplicitHyphenator):
                      
                     # check all possible roots.
                     #log.debug ("checking roots.")
-                    for (lae,L) in self.roots:
-                      l,r = remainder[:lae],remainder[lae:]
-                      for eigenschaften in L.get(l,[]):
-                          #log.debug ("trying root: %r with properties: %r", l,eigenschaften)
-                          piece = Root(l,eigenschaften)
+                    for (order,l,end,candidates) in lattice[pos][1]:
+                      for piece,pChecks in candidates:
+                          #log.debug ("trying root: %r with properties: %r", l,piece.props)
                           if check_PRE_ROOT(frag,piece,checks):
-                              pChecks = piece.getChecks()
                               if check_PRE_PIECE(frag,piece,pChecks):
                                   if check_PRE_NEXT_PIECE(frag,piece,checks):
                                       # @TODO perhaps the next few lines could be faster and more elegant
@@ -467,7 +633,7 @@ class DCWHyphenator(ExplicitHyphenator):
                                       newChecks[HyphRule.PRE_PIECE] = []
                                       newChecks[HyphRule.PRE_NEXT_PIECE] = pChecks[HyphRule.PRE_NEXT_PIECE]
                                       newfrag = SuffixWordFrag(frag,piece)
-                                      todo.append( (cword,newfrag,r,newChecks) )
+                                      todo.append( (cword,newfrag,end,newChecks) )
                                       # Auch Verkürzung von 3 Konsonanten zu zweien berücksichtigen
                                       if KONSTANTEN_VERKUERZUNG_3_2 and l[-1]==l[-2] and l[-1] not in VOWELS:
                                           #log.debug ("konsonantenverkuerzung %s",l)
@@ -475,11 +641,11 @@ class DCWHyphenator(ExplicitHyphenator):
                                           newChecks[HyphRule.PRE_PIECE] = []
                                           # Konsonsantenverkürzung kommt nur bei Haupttrennstellen
                                           # vor, nicht vor Suffixes.
-                                          newChecks[HyphRule.PRE_NEXT_PIECE] = [NO_SUFFIX()] + pChecks[HyphRule.PRE_NEXT_PIECE]
-                                          newPiece = Root(l,eigenschaften)
-                                          newfrag = SuffixWordFrag(frag,newPiece)
+                                          newChecks[HyphRule.PRE_NEXT_PIECE] = RuleList([_KV_NO_SUFFIX] + pChecks[HyphRule.PRE_NEXT_PIECE])
+                                          newfrag = SuffixWordFrag(frag,piece)
                                           newfrag.konsonantenverkuerzung_3_2 = True
-                                          todo.append( (cword,newfrag,l[-1]+r,newChecks) )
+                                          # (the remainder starts with the last letter again)
+                                          todo.append( (cword,newfrag,end-1,newChecks) )
                                   else:
                                       pass # pre next piece checks failed
                               else:
@@ -490,21 +656,18 @@ class DCWHyphenator(ExplicitHyphenator):
                 else: # fragment already has a root.
                     #log.debug ("checking suffixes.")
                     # check all possible suffixes.
-                    for (lae,L) in self.suffixes:
-                      l,r = remainder[:lae],remainder[lae:]
-                      for eigenschaften in L.get(l,[]):
-                          log.debug ("trying suffix: %r with properties: %s", l,eigenschaften)
-                          piece = Suffix(l,eigenschaften)
-                          pChecks = piece.getChecks()
+                    for (order,l,end,candidates) in lattice[pos][2]:
+                      for piece,pChecks in candidates:
+                          log.debug ("trying suffix: %r with properties: %s", l,piece.props)
                           if check_PRE_PIECE(frag,piece,pChecks):
                               if check_PRE_NEXT_PIECE(frag,piece,checks):
                                   # @TODO perhaps the next few lines could be faster and more elegant
                                   newChecks = mergeChecks(checks,pChecks)
                                   newChecks[HyphRule.PRE_PIECE] = []
                                   newChecks[HyphRule.PRE_NEXT_PIECE] = pChecks[HyphRule.PRE_NEXT_PIECE]
-                                  newfrag = copy.copy(frag)
-                                  newfrag.suffix = frag.suffix + [piece]
-                                  todo.append( (cword,newfrag,r,newChecks) )
+                                  newfrag = frag.clone()
+                                  newfrag.suffix = Chain(piece,frag.suffix)
+                                  todo.append( (cword,newfrag,end,newChecks) )
                                   
                               else:
                                   log.debug("pre next piece checks failed")
@@ -515,20 +678,19 @@ class DCWHyphenator(ExplicitHyphenator):
                      
                     # check suffix characters
                     if not frag.suffix_chars:
-                        l = 0
-                        while l<len(remainder) and remainder[l] in self.suffix_chars:
+                        l = pos
+                        while l<lenword and zusgWort[l] in self.suffix_chars:
                             l = l+1
-                        if l>0:
+                        if l>pos:
                             newfrag = frag.clone()
-                            newfrag.suffix_chars = remainder[:l]
-                            r = remainder[l:]
+                            newfrag.suffix_chars = zusgWort[pos:l]
                             if check_PRE_WORD(cword,frag,checks) \
                             and check_PRE_NEXT_WORD(cword,frag,checks):
                                 #log.debug ("@TODO: The above IF statement is definitely wrong.\n" + 
                                 #    "We have to distinguish between the checks for CWORD and FRAG.\n" +
                                 #    "Thus it seems that we need TWO check variables.")
                                 chks = NO_CHECKS(HyphRule.AT_END) + checks[HyphRule.AT_END:]
-                                todo.append ( (cword+[newfrag],None,r,chks) )
+                                todo.append ( (Chain(newfrag,cword),None,l,chks) )
                                 continue # do not examine the current state any more.
                             else: # checks failed
                                 pass
@@ -757,6 +919,9 @@ class DCWHyphenator(ExplicitHyphenator):
     def i_hyphenate(self,aWord):
         return ExplicitHyphenator.i_hyphenate_derived(self, aWord)
 
+    def i_hyphenate_many(self, words):
+        return ExplicitHyphenator.i_hyphenate_many_derived(self, words)
+
 if __name__=="__main__":
     h = DCWHyphenator("DE",5)
     h.test(outfname="DCWLearn.html")
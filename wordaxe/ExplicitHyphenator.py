@@ -9,11 +9,16 @@ __license__="""
 
 __version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
 
-import codecs
+import io
+import os
+import re
+import weakref
+import threading
+from hashlib import md5
 
-from wordaxe.hyphen import SHY, HyphenatedWord
+from wordaxe.hyphen import SHY, HyphenatedWord, HyphenationPoint, invalidate_cache, _point, _copy_points, _MISSING
+from wordaxe.hyphcache import SharedCache
 from wordaxe.BaseHyphenator import BaseHyphenator
-from wordaxe.hyphrules import decodeTrennung
 
 # Unicode type compatibility for Python 2 and 3
 import sys
@@ -22,6 +27,51 @@ if sys.version < '3':
 else:
     unicode_type = str
 
+_MARKS = re.compile(u"[1-9~]")
+_NON_MARKS = re.compile(u"[^1-9~]")
+
+# shape of a hyphenation (see _decode) -> points
+_SHAPES = {}
+_MAX_SHAPES = 100000
+
+def _decode_shape(shape):
+    """
+    Returns the points for the shape of a hyphenation,
+    where all characters except the marks are replaced by ".".
+    """
+    try:
+        return _SHAPES[shape]
+    except KeyError:
+        points = []
+        for m in _MARKS.finditer(shape):
+            q = m.group()
+            points.append(_point(m.start() - len(points), q == u"~" and 5 or int(q)))
+        points = tuple(points)
+        if len(_SHAPES) < _MAX_SHAPES:
+            _SHAPES[shape] = points
+        return points
+
+def _decode(trennung):
+    """
+    Like decodeTrennung (with "~" meaning "5"), but returns a tuple
+    of canonical HyphenationPoint instances (which must not be modified).
+    Entries with the same "shape" (positions and qualities of
+    the points) share the same tuple.
+    """
+    if u"~" in trennung:
+        trennung = trennung.replace(u"~", u"5")
+    return _decode_shape(_NON_MARKS.sub(u".", trennung))
+
+def _file_stamp(filename):
+    "Returns a value that changes whenever the file is modified."
+    st = os.stat(filename)
+    return (st.st_mtime, st.st_size)
+
+# Used by add_entries_from_file
+_COMMENT_LINES = re.compile(u"^[ \t]*#.*$", re.MULTILINE)
+_ENTRY_LINES = re.compile(u"^[^\\S\n]*\\S+[^\\S\n]+\\S+[^\\S\n]*$", re.MULTILINE)
+_BAD_LINES = re.compile(u"^[^\\S\n]*\\S+[^\\S\n]*$|^[^\\S\n]*\\S+[^\\S\n]+\\S+[^\\S\n]+\\S", re.MULTILINE)
+
 class ExplicitHyphenator(BaseHyphenator):
     """
     Allow to explicitly specify how a word should be hyphenated.
@@ -49,6 +99,21 @@ class ExplicitHyphenator(BaseHyphenator):
     Instead of using numbers for defining the quality of a hyphenation
     point, you may use the "~" (tilde) character, corresponding to
     a medium quality hyphenation point: "bru~ti~gam".
+    
+    In derived classes, the results of the hyph method for the
+    subwords of a word (see i_hyphenate_derived) are cached in
+    subword_cache, by default a thread-safe LRU cache for subwordCache
+    entries (a wordaxe.hyphcache.SharedCache with a single stripe,
+    created when it is used for the first time),
+    so that the hyphenator can be used by several threads.
+    Instead of a number, you can pass another cache backend
+    (for example a wordaxe.hyphen.LRUCache, which is a bit faster,
+    if the hyphenator is used by only one thread at a time),
+    or 0 to switch the cache off.
+    
+    Files loaded with add_entries_from_file can be reloaded
+    when editors have changed them, see reload_entries and
+    watch_entries.
     """
 
     def __init__ (self, 
@@ -59,6 +124,7 @@ class ExplicitHyphenator(BaseHyphenator):
                   qVorsilbe=5,
                   qSchlecht=3,
                   hyphenDir=None,
+                  subwordCache=10000,
                   **options
                  ):
         BaseHyphenator.__init__(self,language=language,minWordLength=minWordLength,**options)
@@ -69,8 +135,28 @@ class ExplicitHyphenator(BaseHyphenator):
         self.qVorsilbe=qVorsilbe
         self.qSchlecht=qSchlecht
         
-        # Stammdaten initialisieren
-        self.sonderfaelle = []
+        # Stammdaten initialisieren:
+        # word (in lower case) -> hyphenation like "bru5ti5gam",
+        # replaced by a tuple of (shared) HyphenationPoints when it is
+        # used for the first time.
+        self.entries = {}
+        # CompiledEntries (see wordaxe.explicitdb), used for the words
+        # not contained in entries.
+        self.compiled = []
+        # filename -> (encoding, stamp, words) for reload_entries
+        self.entry_files = {}
+        self._reload_lock = threading.Lock()
+        self._reload_listeners = []
+        self._watcher = None
+        self._dictionary_version = None
+        
+        # subword -> hyphenation points found by hyph (or None);
+        # the default cache is created by _cached_hyph.
+        self._subword_cache_size = 0
+        if isinstance(subwordCache, int):
+            self._subword_cache_size = subwordCache
+            subwordCache = None
+        self.subword_cache = subwordCache
         
     def add_entry(self, word, trennung, encoding='utf-8'):
         if not isinstance(word, unicode_type):
@@ -78,19 +164,45 @@ class ExplicitHyphenator(BaseHyphenator):
         if not isinstance(trennung, unicode_type):
             trennung = unicode_type(trennung, encoding)
         # Ignore Case @TODO Umlaute usw.!
-        word = word.lower() 
-        trennung = trennung.replace(u"~", u"5")
-        lenword = len(word)
-        for (lae, L) in self.sonderfaelle:
-            if lae == lenword:
-                L[word] = trennung
-                break
-        else:
-            self.sonderfaelle.append((lenword,{word: trennung}))
+        self.entries[word.lower()] = trennung
+        self._dictionary_version = None
             
+    def dictionary_version(self):
+        """
+        Returns a hash value of the explicitly given entries
+        (including the compiled files).
+        """
+        if self._dictionary_version is None:
+            version = self._entries_version()
+            if self.compiled:
+                versions = [version] + [compiled.version for compiled in self.compiled]
+                version = md5(u" ".join(versions).encode("ascii")).hexdigest()
+            self._dictionary_version = version
+        return self._dictionary_version
+
+    def _entries_version(self):
+        "Returns a hash value of the entries (without the compiled files)."
+        h = md5()
+        for word in sorted(self.entries):
+            points = u" ".join([u"%d:%d" % (hp.indx, hp.quality) for hp in self._points(word)])
+            h.update((u"%s %s\n" % (word, points)).encode("utf-8"))
+        return h.hexdigest()
+
     def add_entries(self, mapping, encoding='utf-8'):
-        for word, trennung in mapping.items():
-            self.add_entry(word, trennung, encoding)
+        """
+        Adds the entries from mapping (a dict or
+        a sequence of (word, trennung) tuples).
+        """
+        if isinstance(mapping, dict):
+            mapping = mapping.items()
+        entries = self.entries
+        for word, trennung in mapping:
+            if not isinstance(word, unicode_type):
+                word = unicode_type(word, encoding)
+            if not isinstance(trennung, unicode_type):
+                trennung = unicode_type(trennung, encoding)
+            entries[word.lower()] = trennung
+        self._dictionary_version = None
             
     def add_entries_from_file(self, filename, encoding=None):
         """
@@ -99,55 +211,231 @@ class ExplicitHyphenator(BaseHyphenator):
         or None, try to extract the encoding from a line
         near the start of the file like
         # -*- coding: iso-8859-1 -*-
+        The whole file is read and split at once;
+        each entry is decoded when it is used for the first time.
+        """
+        encoding, entries = self._read_entries_file(filename, encoding)
+        self.entries.update(entries)
+        self.entry_files[filename] = (encoding, _file_stamp(filename), list(entries))
+        self._dictionary_version = None
+
+    def _read_entries_file(self, filename, encoding):
+        """
+        Reads a file in the format of add_entries_from_file.
+        Returns the encoding and a dict of the entries.
         """
         if encoding is None:
-            import re
-            frag = open(filename,"rt").read(1000)
+            frag = open(filename,"rb").read(1000).decode("iso-8859-1")
             m = re.search(r"-\*- coding: ([^ ]+) -\*-", frag)
             if m is not None:
                 encoding = m.group(1)
             else:
                 raise ValueError("Encoding not specified and not found in file")
-        fh = codecs.open(filename, "rt", encoding)
-        for line in fh:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            word, trennung = line.split()
-            self.add_entry(word, trennung)
-        fh.close()
+        with io.open(filename, "r", encoding=encoding) as fh:
+            text = fh.read()
+        if u"#" in text:
+            text = _COMMENT_LINES.sub(u"", text)
+        tokens = text.split()
+        # Each token must belong to a line with exactly two tokens.
+        entry_lines = 0
+        for m in _ENTRY_LINES.finditer(text):
+            entry_lines += 1
+        if 2 * entry_lines != len(tokens):
+            m = _BAD_LINES.search(text)
+            raise ValueError("%s: expected word and hyphenation, found %r" % (filename, m.group().strip()))
+        words = u"\n".join(tokens[0::2]).lower().split(u"\n")
+        return encoding, dict(zip(words, tokens[1::2]))
+
+    def reload_entries(self, filename=None):
+        """
+        Reloads the files loaded with add_entries_from_file.
+        If filename is given, only this file is reloaded,
+        otherwise all files which have been modified since
+        they were loaded.
         
+        Only the changed entries are applied (all at once,
+        so other threads see either the old or the new entries).
+        Entries that were removed from a file are removed, and
+        the entries of the reloaded file take precedence over
+        all other entries.
+        
+        The listeners (see add_reload_listener) are informed
+        about the changed words.
+        Returns the set of the changed words (in lower case).
+        """
+        with self._reload_lock:
+            if filename is None:
+                filenames = [fname for fname, (encoding, stamp, words) in self.entry_files.items()
+                             if _file_stamp(fname) != stamp]
+            else:
+                filenames = [filename]
+            changed = set()
+            for fname in filenames:
+                changed.update(self._reload_file(fname))
+        if changed:
+            for ref in list(self._reload_listeners):
+                listener = ref()
+                if listener is None:
+                    self._reload_listeners.remove(ref)
+                else:
+                    listener.invalidate(changed)
+        return changed
+
+    def _reload_file(self, filename):
+        "Reloads one file, returning the set of changed words."
+        encoding, stamp, old_words = self.entry_files[filename]
+        stamp = _file_stamp(filename)
+        encoding, new = self._read_entries_file(filename, encoding)
+        current = self.entries
+        updates = {}
+        for word, trennung in new.items():
+            value = current.get(word)
+            if value is None or value != trennung and (value.__class__ is not tuple
+                                                       or value != _decode(trennung)):
+                updates[word] = trennung
+        removed = [word for word in old_words if word not in new and word in current]
+        if updates or removed:
+            entries = dict(current)
+            entries.update(updates)
+            for word in removed:
+                del entries[word]
+            self.entries = entries
+            self._dictionary_version = None
+        self.entry_files[filename] = (encoding, stamp, list(new))
+        changed = set(updates)
+        changed.update(removed)
+        if changed and self.subword_cache is not None:
+            invalidate_cache(self.subword_cache, None, changed)
+        return changed
+
+    def add_reload_listener(self, listener):
+        """
+        Registers listener (for example a wordaxe.hyphen.Cached instance),
+        whose method invalidate(words) is called with the set of
+        changed words after reload_entries.
+        Only a weak reference to the listener is kept.
+        """
+        self._reload_listeners.append(weakref.ref(listener))
+
+    def watch_entries(self, interval=10.0):
+        """
+        Starts a background thread which calls reload_entries
+        every interval seconds, until stop_watching is called.
+        """
+        self.stop_watching()
+        stop = threading.Event()
+        def watch():
+            while not stop.wait(interval):
+                self.reload_entries()
+        thread = threading.Thread(target=watch, name="wordaxe entry watcher")
+        thread.daemon = True
+        self._watcher = stop
+        thread.start()
+
+    def stop_watching(self):
+        "Stops the thread started by watch_entries."
+        if self._watcher is not None:
+            self._watcher.set()
+            self._watcher = None
+
+    def __getstate__(self):
+        # locks, threads and weak references cannot be pickled
+        state = self.__dict__.copy()
+        state["_reload_lock"] = None
+        state["_reload_listeners"] = []
+        state["_watcher"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reload_lock = threading.Lock()
+
+    def add_compiled_file(self, filename):
+        """
+        Uses the entries of a compiled file (see wordaxe.explicitdb).
+        The file is not loaded, but mapped into memory.
+        Entries added with add_entry etc. take precedence.
+        """
+        from wordaxe.explicitdb import CompiledEntries
+        self.compiled.append(CompiledEntries(filename))
+        self._dictionary_version = None
+
+    def _points(self, key):
+        """
+        Returns the tuple of HyphenationPoints for the entry key
+        (decoding it on first use), or None.
+        """
+        points = self.entries.get(key)
+        if points is not None and points.__class__ is not tuple:
+            points = self.entries[key] = _decode(points)
+        return points
         
     def hyph(self, word):
         #print "ExplicitHyphenator hyph", word
-        lenword = len(word)
-        for (lae, L) in self.sonderfaelle:
-            if lae == lenword:
-                trennung = L.get(word.lower(), None)
-                if trennung is not None:
-                    hword = HyphenatedWord(word, decodeTrennung(trennung))
-                    return hword
-                break
-        # Wort nicht gefunden
-        return None
+        entries = self.entries
+        key = word
+        points = entries.get(key)
+        if points is None and not word.islower():
+            key = word.lower()
+            points = entries.get(key)
+        if points is None:
+            for compiled in self.compiled:
+                points = compiled.get(key)
+                if points is not None:
+                    return HyphenatedWord(word, _copy_points(points))
+            # Wort nicht gefunden
+            return None
+        if points.__class__ is not tuple:
+            points = entries[key] = _decode(points)
+        # (the stored points are shared, see _decode)
+        return HyphenatedWord(word, _copy_points(points))
         
     def i_hyphenate(self, aWord):
         assert isinstance(aWord, unicode_type)
         return self.stripper.apply_stripped(ExplicitHyphenator.hyph, self, aWord)
 
-    def i_hyphenate_derived(self,aWord):
+    def _cached_hyph(self, word):
+        """
+        Like hyph, but the results are cached in subword_cache.
+        """
+        cache = self.subword_cache
+        if cache is None:
+            if self._subword_cache_size <= 0:
+                return self.hyph(word)
+            with self._reload_lock:
+                if self.subword_cache is None:
+                    self.subword_cache = SharedCache(self._subword_cache_size, stripes=1)
+                cache = self.subword_cache
+        points = cache.get(word, _MISSING)
+        if points is _MISSING:
+            hword = self.hyph(word)
+            if hword is None:
+                points = None
+            else:
+                points = tuple(hword.hyphenations)
+            cache.put(word, points)
+        if points is None:
+            return None
+        return HyphenatedWord(word, _copy_points(points))
+
+    def i_hyphenate_derived(self,aWord,hyph=None):
         """
         You can use this method in classes derived from ExplicitHyphenator.
         It will first split the word using BaseHyphenator,
         then for each "subword" it will call ExplicitHyphenator,
         and only call the derived classes hyph method for the still
         unknown subwords.
+        If hyph is given, it is used instead of the derived classes
+        hyph method; otherwise the results of the hyph method
+        are cached (see subword_cache).
         
         TODO: The implementation does not match the docstring
               test: "hohenlimburg.de", "hohenlimburg.de)"
         """
         #print "ExplicitHyphenator.i_hyphenate_derived", aWord
         assert isinstance(aWord, unicode_type)
+        if hyph is None:
+            hyph = self._cached_hyph
 
         # Helper function
         
@@ -169,7 +457,7 @@ class ExplicitHyphenator(BaseHyphenator):
             else:
                 sub_hword = self.stripper.apply_stripped(ExplicitHyphenator.hyph, self, subword)
             if sub_hword is None:
-                sub_hword = self.stripper.apply_stripped(self.hyph, self, subword)
+                sub_hword = self.stripper.apply_stripped(hyph, self, subword)
             if sub_hword is None:
                 sub_hword = HyphenatedWord(subword, hyphenations=[])
             sub_hwords.append(sub_hword)
@@ -184,7 +472,7 @@ class ExplicitHyphenator(BaseHyphenator):
         else:
             sub_hword = self.stripper.apply_stripped(ExplicitHyphenator.hyph, self, subword)
         if sub_hword is None:
-            sub_hword = self.stripper.apply_stripped(self.hyph, self, subword)
+            sub_hword = self.stripper.apply_stripped(hyph, self, subword)
         if sub_hword is None:
             sub_hword = HyphenatedWord(subword, hyphenations=[])
         sub_hwords.append(sub_hword)
@@ -194,6 +482,31 @@ class ExplicitHyphenator(BaseHyphenator):
         else:        
             return sub_hwords[0] # Kann auch None sein.
 
+    def i_hyphenate_many_derived(self, words):
+        """
+        A bulk version of i_hyphenate_derived.
+        You can use this method in classes derived from ExplicitHyphenator
+        if the result of their hyph method does not depend on the case
+        of the word: Then hyph is called only once for all the subwords
+        in words which only differ in case.
+        """
+        memo = {}
+        def memo_hyph(hyphenator, subword):
+            key = subword.lower()
+            try:
+                hyphenations = memo[key]
+            except KeyError:
+                hword = hyphenator._cached_hyph(subword)
+                if hword is None:
+                    hyphenations = None
+                else:
+                    hyphenations = hword.hyphenations
+                memo[key] = hyphenations
+            if hyphenations is None:
+                return None
+            return HyphenatedWord(subword, [HyphenationPoint(h.indx,h.quality,h.nl,h.sl,h.nr,h.sr) for h in hyphenations])
+        return [self.i_hyphenate_derived(w, memo_hyph) for w in words]
+
 
 if __name__=="__main__":
     h = ExplicitHyphenator("DE",5)
@@ -11,6 +11,7 @@ __version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
 
 import os,sys
 import copy
+from hashlib import md5
 
 # Unicode type compatibility for Python 2 and 3
 if sys.version < '3':
@@ -22,6 +23,12 @@ from wordaxe.hyphen import *
 from xml.sax.saxutils import escape,quoteattr
 
 from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+from wordaxe.liang import PatternTrie, parse_pattern, read_patterns, compiled_patterns, patterns_version
+
+try:
+    from wordaxe.liangbatch import batch_matcher
+except ImportError:
+    batch_matcher = None # NumPy is not installed
 
 VERBOSE = False
 
@@ -33,77 +40,94 @@ class PyHnjHyphenator(ExplicitHyphenator):
     not use pyHnj/libhnj and should give the same results.
     """
 
+    # i_hyphenate_many uses wordaxe.liangbatch (if NumPy is installed)
+    # for at least this many plain words.
+    batch_size = 100
+
     def __init__ (self, 
                   language="EN",
                   minWordLength=4,
                   quality=8,
                   hyphenDir=None,
                   purePython=False,
+                  compiledPatterns=True,
                   **options
                  ):
         """ Note:
-            The purePython version does NOT use Knuth's algorithm,
-            but a more simple (and slower) algorithm.
+            The purePython version uses a trie of the patterns
+            (see wordaxe.liang) instead of libhnj.
+            If compiledPatterns is true, the trie is compiled to a file
+            on first use and then shared by all instances and processes
+            (construction is much faster, hyphenation a bit slower).
         """
         ExplicitHyphenator.__init__(self,language=language,minWordLength=minWordLength, **options)
         if hyphenDir is None:
             hyphenDir = os.path.join(os.path.split(__file__)[0], "dict")
         self.purePython = purePython
         fname = os.path.join(hyphenDir, "hyph_%s.dic" % language)
-        # first line is set of characters, all other lines are patterns
+        self.fname = fname
+        # the hash value of the pattern file, computed on first use
+        self._patterns_version = None
+        # first line is set of characters (or the encoding), all other lines are patterns
         if self.purePython:
-            # Note: we do not use a TRIE, we just store the patterns in a dict string:codes
-            lines = open(fname).read().splitlines()
-            self.characters = lines.pop(0)
-            self.patterns = {}
-            for pattern in lines:
-                pat = ""
-                codes = ""
-                digit = "0"
-                for ch in pattern:
-                    if ch>='0' and ch<='9':
-                        digit = ch
-                    else:
-                        codes = codes+digit
-                        pat = pat+ch
-                        digit = "0"
-                codes = codes+digit
-                self.patterns[pat.decode("iso-8859-1")] = codes
+            # Patterns for a single letter have never been used.
+            self.trie = None
+            if compiledPatterns:
+                try:
+                    self._patterns_version = patterns_version(fname)
+                    self.trie = compiled_patterns(fname, min_letters=2, version=self._patterns_version)
+                    self.characters = self.trie.characters
+                except EnvironmentError:
+                    pass # no place to store the compiled file
+            if self.trie is None:
+                self.characters, patterns = read_patterns(fname)
+                self.trie = PatternTrie([pattern for pattern in patterns
+                                         if len(parse_pattern(pattern)[0]) >= 2])
         else:
             import reportlab.lib.pyHnj as pyHnj
             self.hnj = pyHnj.Hyphen(fname)
         self.quality = quality
 
+    @property
+    def patterns(self):
+        """
+        The patterns as a dict letters -> priorities
+        (read from the pattern file on first use).
+        """
+        patterns = self.__dict__.get("_patterns")
+        if patterns is None:
+            characters, lines = read_patterns(self.fname)
+            patterns = self._patterns = dict([parse_pattern(pattern) for pattern in lines])
+        return patterns
+
+    def dictionary_version(self):
+        """
+        Returns a hash value of the pattern file
+        and the explicitly given entries.
+        """
+        if self._patterns_version is None:
+            self._patterns_version = patterns_version(self.fname)
+        h = md5(self._patterns_version.encode("ascii"))
+        h.update(ExplicitHyphenator.dictionary_version(self).encode("ascii"))
+        return h.hexdigest()
+
     # Hilfsfunktion
     def schiebe(self,offset,L):
         return [HyphenationPoint(h.indx+offset,h.quality,h.nl,h.sl,h.nr,h.sr) for h in L]
 
     def zerlegeWort(self,zusgWort):
         if self.purePython:
-            word = "." + zusgWort.lower() + "."
-            # Alle Lngen durchgehen (minimum: 2)
-            codes = ["0"]*len(word)
-            for patlen in range(2,len(word)):
-                #print "patlen %d" % patlen
-                for startindx in range(len(word)-patlen):
-                    #print "startindx %d" % startindx
-                    try:
-                        patcode = self.patterns[word[startindx:startindx+patlen]]
-                        #print "testpat=%s patcode=%s" % (word[startindx:startindx+patlen],patcode)
-                        for i,digit in enumerate(patcode):
-                            if digit > codes[i+startindx]:
-                                codes[i+startindx] = digit
-                    except KeyError:
-                        pass
-            codes = codes[2:-1]
+            # The final "." is left out, so the patterns for
+            # the end of the word are not used (as always).
+            codes = self.trie.priorities(u"." + zusgWort.lower())[2:-1]
         else:
-            codes = self.hnj.getCodes(zusgWort.lower())
+            codes = [ord(code) - 48 for code in self.hnj.getCodes(zusgWort.lower())]
         hyphPoints = []
         for i, code in enumerate(codes):
             # wir trennen nicht das erste oder letzte Zeichen ab
             if i==0 or i==len(codes)-1:
                 continue
-            if (ord(code)-ord('0')) % 2:
+            if code % 2:
                 hyphPoints.append(HyphenationPoint(i+1,self.quality,0,self.shy,0,""))
         return hyphPoints
         
@@ -117,6 +141,55 @@ class PyHnjHyphenator(ExplicitHyphenator):
 
     def i_hyphenate(self, aWord):
         return ExplicitHyphenator.i_hyphenate_derived(self, aWord)
+
+    def _is_plain(self, word, camelCase):
+        """
+        Returns True if word consists of letters only, so that
+        i_hyphenate_derived would call ExplicitHyphenator.hyph
+        and then zerlegeWort for the whole word.
+        """
+        return (word.isalpha()
+                and self.shy not in word
+                and word[0] not in self.stripper.prefix_chars
+                and word[-1] not in self.stripper.suffix_chars
+                and (not camelCase or word[1:].lower() == word[1:]))
+
+    def i_hyphenate_many(self, words):
+        """
+        With purePython and NumPy installed, the plain words
+        (see _is_plain) are hyphenated in bulk using wordaxe.liangbatch,
+        all other words with i_hyphenate_many_derived.
+        The results are the same.
+        """
+        if not self.purePython or batch_matcher is None or len(words) < self.batch_size:
+            return ExplicitHyphenator.i_hyphenate_many_derived(self, words)
+        camelCase = bool(self.options.get("CamelCase"))
+        results = [None] * len(words)
+        plain = []
+        other = []
+        for i, w in enumerate(words):
+            if self._is_plain(w, camelCase):
+                hword = ExplicitHyphenator.hyph(self, w)
+                if hword is None:
+                    plain.append(i)
+                else:
+                    results[i] = hword
+            else:
+                other.append(i)
+        if len(plain) < self.batch_size:
+            other.extend(plain)
+            plain = []
+        if other:
+            hwords = ExplicitHyphenator.i_hyphenate_many_derived(self, [words[i] for i in other])
+            for i, hword in zip(other, hwords):
+                results[i] = hword
+        if plain:
+            matcher = batch_matcher(self.trie)
+            quality, shy = self.quality, self.shy
+            positions = matcher.odd_positions([u"." + words[i].lower() for i in plain])
+            for i, indices in zip(plain, positions):
+                results[i] = HyphenatedWord(words[i], [HyphenationPoint(indx, quality, 0, shy, 0, u"") for indx in indices])
+        return results
     
 if __name__=="__main__":
     h = PyHnjHyphenator("de_DE",5, purePython=True)
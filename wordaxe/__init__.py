@@ -11,11 +11,15 @@ __doc__='Hyphenation support using different algorithms'
 
 __all__ = ["BaseHyphenator", "DCWHyphenator", "PyHnjHyphenator", "SHY", "HyphenationPoint", "HyphenatedWord"]
 
-from wordaxe.hyphen import SHY, HyphenationPoint, HyphenatedWord, Hyphenator, Cached
+from wordaxe.hyphen import SHY, HyphenationPoint, HyphenatedWord, Hyphenator, Cached, LRUCache, CompactHyphenations
+
+from wordaxe.registry import HyphenatorRegistry
 
 # This is meant as a registry for Hyphenators.
 # if you want to use a Hyphenator A for language B,
-# just set hyphRegistry[A]=B
-hyphRegistry = {}
+# just set hyphRegistry[B]=A
+# or, to build it only when it is needed for the first time,
+# call hyphRegistry.register(B, factory, *args)
+hyphRegistry = HyphenatorRegistry()
 
 version = "wordaxe 1.1.0beta"
@@ -0,0 +1,221 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+An Aho-Corasick automaton: finds all occurrences of many
+strings in a text in a single pass over the text.
+
+Usage:
+
+automaton = AhoCorasick()
+automaton.add(u"silbe", "root")
+automaton.add(u"ung", "suffix")
+for start, end, value in automaton.find_all(u"silbentrennung"):
+    ...
+
+If the values are integers, the automaton can be converted
+to flat arrays of integers (see CompiledAhoCorasick), which
+can be stored in a file and used without building it again.
+'''
+
+
+class AhoCorasick(object):
+    """
+    The states are numbers; for each state there is a dict
+    of the transitions (letter -> state), the failure link
+    (the state for the longest proper suffix which is a prefix
+    of a key) and the tuple of (length, value) pairs of
+    all the keys ending in this state.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._built = True
+
+    def add(self, key, value):
+        "Adds a key (a non-empty string) with a value."
+        assert key
+        goto = self._goto
+        state = 0
+        for ch in key:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = goto[state][ch] = len(goto)
+                goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(key), value))
+        self._built = False
+
+    def build(self):
+        "Computes the failure links (add calls this automatically)."
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = list(goto[0].values())
+        for state in queue:
+            fail[state] = 0
+        own = [tuple(o) for o in out]
+        out[:] = own
+        i = 0
+        while i < len(queue):
+            state = queue[i]
+            i += 1
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[nxt] = f
+                out[nxt] = own[nxt] + out[f]
+                queue.append(nxt)
+        self._built = True
+
+    def find_all(self, text):
+        """
+        Returns a list of (start, end, value) for all the
+        occurrences of the keys in text, sorted by end.
+        """
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        result = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                result.append((end - length, end, value))
+        return result
+
+    def arrays(self):
+        """
+        Returns the automaton as a CompiledAhoCorasick with flat lists.
+        The values must be non-negative integers.
+        """
+        if not self._built:
+            self.build()
+        goto = self._goto
+        alphabet = u"".join(sorted(set([ch for transitions in goto for ch in transitions])))
+        codes = dict([(ch, code + 1) for code, ch in enumerate(alphabet)])
+        base, check, slots = _double_array(goto, codes)
+        fail = [0] * len(check)
+        outs = [0] * len(check)
+        packed = [0]
+        for state, slot in enumerate(slots):
+            fail[slot] = slots[self._fail[state]]
+            if self._out[state]:
+                outs[slot] = len(packed)
+                packed.append(len(self._out[state]))
+                for length, value in self._out[state]:
+                    packed.extend([length, value])
+        return CompiledAhoCorasick(alphabet, base, check, fail, outs, packed)
+
+
+def _next_free(check, start):
+    "Returns the first free slot (check == -1) at or after start."
+    try:
+        return check.index(-1, start)
+    except ValueError:
+        return max(start, len(check))
+
+
+def _double_array(goto, codes):
+    """
+    Places the states of goto in a double array (see wordaxe.liang):
+    the transitions of the state in slot s are t = base[s] + code(letter)
+    with check[t] == s; the root is slot 0.
+    Returns base, check and the slot of each state.
+    """
+    base, check = [0], [-1]
+    slots = [0] * len(goto)
+    first_free = 1
+    # The children have higher numbers than their parents,
+    # so every state has got its slot before it is placed.
+    for state, transitions in enumerate(goto):
+        labels = sorted([(codes[ch], child) for ch, child in transitions.items()])
+        if not labels:
+            continue
+        first_free = _next_free(check, first_free)
+        slot = first_free
+        while True:
+            b = slot - labels[0][0]
+            if b >= 1:
+                for code, child in labels[1:]:
+                    if b + code < len(check) and check[b + code] != -1:
+                        break
+                else:
+                    break
+            slot = _next_free(check, slot + 1)
+        size = b + labels[-1][0] + 1
+        if size > len(check):
+            base.extend([0] * (size - len(check)))
+            check.extend([-1] * (size - len(check)))
+        base[slots[state]] = b
+        for code, child in labels:
+            check[b + code] = slots[state]
+            slots[child] = b + code
+    # (so that base[s] + code is always a valid index)
+    grow = max(base) + len(codes) + 1 - len(check)
+    if grow > 0:
+        base.extend([0] * grow)
+        check.extend([-1] * grow)
+    return base, check, slots
+
+
+class CompiledAhoCorasick(object):
+    """
+    An Aho-Corasick automaton with integer values, stored in flat
+    arrays of integers (lists, arrays or memoryviews):
+
+    base, check - the transitions, as a double array (see AhoCorasick.arrays)
+    fail        - the failure link of each slot
+    outs        - for each slot 0, or an index into packed, where the
+                  number of keys ending there is stored, followed by
+                  length and value for each of them
+    alphabet    - the letters for the codes 1, 2, ...
+    """
+
+    def __init__(self, alphabet, base, check, fail, outs, packed):
+        self.alphabet = alphabet
+        self.base = base
+        self.check = check
+        self.fail = fail
+        self.outs = outs
+        self.packed = packed
+        self._codes = dict([(ch, code + 1) for code, ch in enumerate(alphabet)])
+
+    def find_all(self, text):
+        "See AhoCorasick.find_all."
+        get = self._codes.get
+        base, check, fail, outs, packed = self.base, self.check, self.fail, self.outs, self.packed
+        result = []
+        state = 0
+        for end, ch in enumerate(text, 1):
+            code = get(ch)
+            if code is None:
+                # no key contains ch
+                state = 0
+                continue
+            t = base[state] + code
+            while check[t] != state:
+                if not state:
+                    t = 0
+                    break
+                state = fail[state]
+                t = base[state] + code
+            state = t
+            o = outs[state]
+            if o:
+                for k in range(o + 1, o + 1 + 2 * packed[o], 2):
+                    result.append((end - packed[k], end, packed[k + 1]))
+        return result
@@ -0,0 +1,173 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Hyphenation for asyncio applications (requires Python 3.5 or later).
+
+Hyphenating a long compound word can take some milliseconds.
+AsyncHyphenator runs the hyphenator in an executor, so that
+the event loop is not blocked.
+
+Usage:
+
+hyphenator = AsyncHyphenator(DCWHyphenator("DE",5), max_concurrency=4)
+hword = await hyphenator.ahyphenate("Silbentrennung")
+hwords = await hyphenator.ahyphenate_many(words)
+
+The hyphenator is called from several threads at the same time
+(unless max_concurrency is 1). If it is wrapped in Cached,
+use a SharedCache as the cache backend. The same holds for
+the subword_cache of the hyphenators derived from
+ExplicitHyphenator, if another backend than the default
+one is given (see ExplicitHyphenator).
+'''
+
+import asyncio
+from collections import OrderedDict
+
+import wordaxe
+
+
+class AsyncHyphenator(object):
+    """
+    An asyncio facade for a hyphenator.
+
+    hyphenator can be a language registered in wordaxe.hyphRegistry
+    or any object with the methods hyphenate and hyphenate_many
+    (a Hyphenator or a Cached instance).
+
+    The work is done in executor (a concurrent.futures.Executor),
+    or in the default executor of the event loop if executor is None.
+    At most max_concurrency calls are running at any time.
+
+    Concurrent requests for the same word are merged into
+    one computation.
+    """
+
+    def __init__(self, hyphenator, executor=None, max_concurrency=None, chunk_size=500):
+        if isinstance(hyphenator, str):
+            try:
+                hyphenator = wordaxe.hyphRegistry[hyphenator]
+            except KeyError:
+                raise ValueError("No hyphenator registered for language %r" % hyphenator)
+        self.hyphenator = hyphenator
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self.merged = 0
+        self._loop = None
+        self._semaphore = None
+        self._inflight = {}
+
+    def _state(self):
+        """
+        Returns the event loop, the semaphore and the futures in progress.
+        These are created on first use, because a semaphore
+        belongs to one event loop.
+        """
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._inflight = {}
+            self._semaphore = None
+            if self.max_concurrency:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return loop, self._semaphore, self._inflight
+
+    async def _run(self, func, *args):
+        "Calls func(*args) in the executor, respecting max_concurrency."
+        loop, semaphore, inflight = self._state()
+        if semaphore is None:
+            return await loop.run_in_executor(self.executor, func, *args)
+        async with semaphore:
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    def _register(self, word, future):
+        inflight = self._inflight
+        inflight[word] = future
+        def done(future):
+            if inflight.get(word) is future:
+                del inflight[word]
+        future.add_done_callback(done)
+
+    async def ahyphenate(self, word):
+        """
+        Hyphenates the word without blocking the event loop.
+        Returns a HyphenatedWord or None, like hyphenate.
+        """
+        loop, semaphore, inflight = self._state()
+        self.requests += 1
+        future = inflight.get(word)
+        if future is None:
+            future = asyncio.ensure_future(self._run(self.hyphenator.hyphenate, word))
+            self._register(word, future)
+        else:
+            self.merged += 1
+        # shield: a cancelled caller must not cancel the other callers.
+        return await asyncio.shield(future)
+
+    async def ahyphenate_many(self, words):
+        """
+        Hyphenates the words (any iterable) without blocking the event loop.
+        Returns a list with a HyphenatedWord or None for each word.
+
+        The unique words are passed to hyphenate_many in chunks
+        of chunk_size words, which run concurrently.
+        """
+        loop, semaphore, inflight = self._state()
+        words = list(words)
+        futures = OrderedDict()
+        missing = []
+        for word in words:
+            if word in futures:
+                continue
+            self.requests += 1
+            future = inflight.get(word)
+            if future is None:
+                future = loop.create_future()
+                self._register(word, future)
+                missing.append(word)
+            else:
+                self.merged += 1
+            futures[word] = future
+        for start in range(0, len(missing), self.chunk_size):
+            chunk = missing[start:start+self.chunk_size]
+            task = asyncio.ensure_future(self._run(self.hyphenator.hyphenate_many, chunk))
+            task.add_done_callback(self._chunk_done(chunk, futures))
+        results = await asyncio.shield(asyncio.gather(*futures.values()))
+        results = dict(zip(futures, results))
+        return [results[word] for word in words]
+
+    @staticmethod
+    def _chunk_done(chunk, futures):
+        "Returns a callback that passes the results of a chunk on to the futures of its words."
+        def done(task):
+            if task.cancelled():
+                for word in chunk:
+                    futures[word].cancel()
+            elif task.exception() is not None:
+                for word in chunk:
+                    futures[word].set_exception(task.exception())
+            else:
+                for word, hword in zip(chunk, task.result()):
+                    futures[word].set_result(hword)
+        return done
+
+    def stats(self):
+        """
+        Returns a dict with the number of requests,
+        the number of requests merged with a computation in progress
+        and the number of computations in progress.
+        """
+        return {"requests": self.requests,
+                "merged": self.merged,
+                "in_progress": len(self._inflight),
+               }
@@ -0,0 +1,324 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+A reproducible benchmark for the hyphenators.
+
+The hyphenators are run over fixed corpora: the German documentation
+(tests/dokumentation_de.txt) and, for each bundled hyph_*.dic file,
+a word list generated from the patterns with a fixed random seed.
+
+For each hyphenator and corpus, the result contains the
+words per second, the per-word latency percentiles, the construction
+time and the time for the first word (which includes the work
+done lazily, e.g. creating the subword cache) in a fresh
+interpreter (cold) and in the running one (warm) and the peak
+memory allocated by Python (measured with tracemalloc).
+For the warm timings and the peak memory, the dictionaries
+shared by all hyphenators in a process (see wordaxe.dcwdict)
+are loaded again, but the compiled files are used.
+Each timing run uses a new hyphenator, so that the words
+are never found in the caches of a previous run.
+
+Usage:
+
+python -m wordaxe.benchmark [-o results.json] [-r runs] [-n words]
+                            [-c corpus.txt] [-s seed] [--no-cold] [name ...]
+
+where name selects the hyphenators to run (e.g. DCWHyphenator or PyHnjHyphenator:en_US).
+The results are written as JSON (to stdout by default).
+'''
+
+import io
+import os
+import sys
+import gc
+import json
+import random
+import platform
+import subprocess
+from timeit import default_timer as timer
+
+import wordaxe
+
+DICT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dict")
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "tests", "dokumentation_de.txt")
+
+
+def _base(language):
+    from wordaxe.BaseHyphenator import BaseHyphenator
+    return BaseHyphenator(language, 5)
+
+def _explicit(language):
+    from wordaxe.ExplicitHyphenator import ExplicitHyphenator
+    return ExplicitHyphenator(language, 5)
+
+def _dcw(language):
+    from wordaxe.DCWHyphenator import DCWHyphenator
+    return DCWHyphenator(language, 5)
+
+def _pyhnj(language):
+    from wordaxe.PyHnjHyphenator import PyHnjHyphenator
+    return PyHnjHyphenator(language, 5, purePython=True)
+
+# name -> factory(language)
+FACTORIES = {
+    "BaseHyphenator": _base,
+    "ExplicitHyphenator": _explicit,
+    "DCWHyphenator": _dcw,
+    "PyHnjHyphenator": _pyhnj,
+}
+
+
+def pattern_languages():
+    "Returns the languages of the bundled hyph_*.dic files."
+    return sorted([fname[5:-4] for fname in os.listdir(DICT_DIR)
+                   if fname.startswith("hyph_") and fname.endswith(".dic")])
+
+
+def read_corpus(fname, limit=None, encoding="iso-8859-1"):
+    "Returns the words (separated by whitespace) of a text file."
+    with io.open(fname, "r", encoding=encoding) as f:
+        words = f.read().split()
+    return words[:limit]
+
+
+def generate_words(language, count, seed=0):
+    """
+    Generates count pseudo-words for a hyph_*.dic language
+    by concatenating fragments of the patterns.
+    The result only depends on the pattern file and the seed.
+    """
+    from wordaxe.PyHnjHyphenator import PyHnjHyphenator
+    patterns = sorted(PyHnjHyphenator(language, purePython=True).patterns)
+    fragments = [p.strip(u".") for p in patterns if len(p.strip(u".")) >= 2]
+    rnd = random.Random("%s:%s" % (seed, language))
+    words = []
+    for i in range(count):
+        length = rnd.randint(6, 16)
+        word = u""
+        while len(word) < length:
+            word += rnd.choice(fragments)
+        words.append(word)
+    return words
+
+
+def explicit_entries(words):
+    """
+    Returns explicit hyphenation entries for every second word,
+    with a medium quality point every three letters.
+    """
+    entries = {}
+    for word in words[::2]:
+        if len(word) >= 6 and word.isalpha():
+            entries[word] = u"~".join([word[i:i+3] for i in range(0, len(word), 3)])
+    return entries
+
+
+def _with_entries(factory, entries):
+    "Returns a factory for hyphenators with the explicit entries added."
+    def create(language):
+        hyphenator = factory(language)
+        hyphenator.add_entries(entries)
+        return hyphenator
+    return create
+
+
+def percentile(sorted_values, p):
+    "Returns the p-th percentile (nearest rank) of a sorted list."
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def construct_cold(name, language, word=None):
+    """
+    Returns the seconds needed to import and construct the hyphenator
+    in a fresh interpreter and the seconds needed to hyphenate word
+    with it (None without a word) as a tuple.
+    """
+    code = ("from timeit import default_timer as timer\n"
+            "start = timer()\n"
+            "from wordaxe.benchmark import FACTORIES\n"
+            "hyphenator = FACTORIES[%r](%r)\n"
+            "print(timer() - start)\n"
+            "word = %r\n"
+            "if word is not None:\n"
+            "    start = timer()\n"
+            "    hyphenator.hyphenate(word)\n"
+            "    print(timer() - start)\n" % (name, language, word))
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join([root] + [p for p in [env.get("PYTHONPATH")] if p])
+    out = subprocess.check_output([sys.executable, "-c", code], env=env)
+    times = [float(line) for line in out.decode("ascii").split()]
+    return times[0], word is not None and times[1] or None
+
+
+def forget_shared():
+    """
+    Forgets the dictionaries shared by all hyphenators in this process,
+    so that the next hyphenator has to load them again.
+    """
+    dcwdict = sys.modules.get("wordaxe.dcwdict")
+    if dcwdict is not None:
+        dcwdict.forget_loaded()
+
+
+def construct_warm(factory, language, word=None, runs=3):
+    """
+    Returns the best time to construct the hyphenator again in this
+    process and the best time to hyphenate word with the new hyphenator
+    (None without a word) as a tuple.
+    """
+    factory(language)
+    best = best_word = None
+    for i in range(runs):
+        forget_shared()
+        start = timer()
+        hyphenator = factory(language)
+        seconds = timer() - start
+        best = seconds if best is None else min(best, seconds)
+        if word is not None:
+            start = timer()
+            hyphenator.hyphenate(word)
+            seconds = timer() - start
+            best_word = seconds if best_word is None else min(best_word, seconds)
+    return best, best_word
+
+
+def peak_memory(factory, language, words):
+    """
+    Returns the peak memory (in bytes) allocated by Python
+    while constructing the hyphenator and hyphenating the words,
+    or None if tracemalloc is not available.
+    """
+    try:
+        import tracemalloc
+    except ImportError:
+        return None
+    forget_shared()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        hyphenator = factory(language)
+        for word in words:
+            hyphenator.hyphenate(word)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(factory, language, words, runs=3):
+    """
+    Hyphenates the words runs times, each time with a new hyphenator
+    (so that no run finds the words in the caches of another one),
+    returning the best words per second and the per-word latency
+    percentiles (in microseconds) of the best run.
+    """
+    best_total = best_latencies = None
+    for run in range(runs):
+        hyphenate = factory(language).hyphenate
+        latencies = []
+        append = latencies.append
+        total_start = timer()
+        for word in words:
+            start = timer()
+            hyphenate(word)
+            append(timer() - start)
+        total = timer() - total_start
+        if best_total is None or total < best_total:
+            best_total, best_latencies = total, latencies
+    best_latencies.sort()
+    return {"words_per_sec": best_total and len(words) / best_total or 0.0,
+            "latency_us": dict([(key, percentile(best_latencies, p) * 1e6)
+                                for key, p in [("p50", 50), ("p90", 90), ("p99", 99), ("max", 100)]]),
+           }
+
+
+def cases(corpus_words, count, seed=0, names=None):
+    """
+    Returns the benchmark cases as (name, language, corpus name, words) tuples.
+    names restricts the cases to those hyphenator names
+    (or name:language) given.
+    """
+    result = []
+    if corpus_words:
+        for name in ["BaseHyphenator", "ExplicitHyphenator", "DCWHyphenator", "PyHnjHyphenator"]:
+            language = name == "PyHnjHyphenator" and "de" or "DE"
+            result.append((name, language, "dokumentation_de", corpus_words))
+    for language in pattern_languages():
+        words = generate_words(language, count, seed)
+        result.append(("PyHnjHyphenator", language, "generated_%s" % language, words))
+    if names:
+        result = [case for case in result
+                  if case[0] in names or "%s:%s" % (case[0], case[1]) in names]
+    return result
+
+
+def run(corpus=DEFAULT_CORPUS, count=2000, runs=3, seed=0, names=None, cold=True):
+    "Runs the benchmark and returns the results as a dict."
+    corpus_words = corpus and os.path.exists(corpus) and read_corpus(corpus, count) or []
+    results = []
+    for name, language, corpus_name, words in cases(corpus_words, count, seed, names):
+        factory = FACTORIES[name]
+        if name == "ExplicitHyphenator":
+            factory = _with_entries(factory, explicit_entries(words))
+        first_word = words and words[0] or None
+        construct_cold_s, first_word_cold_s = cold and construct_cold(name, language, first_word) or (None, None)
+        construct_warm_s, first_word_warm_s = construct_warm(factory, language, first_word)
+        entry = {"hyphenator": name,
+                 "language": language,
+                 "corpus": corpus_name,
+                 "words": len(words),
+                 "unique_words": len(set(words)),
+                 "construct_cold_s": construct_cold_s,
+                 "first_word_cold_s": first_word_cold_s,
+                 "construct_warm_s": construct_warm_s,
+                 "first_word_warm_s": first_word_warm_s,
+                 "peak_memory_bytes": peak_memory(factory, language, words),
+                }
+        entry.update(measure(factory, language, words, runs))
+        results.append(entry)
+    return {"wordaxe": wordaxe.version,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "runs": runs,
+            "results": results,
+           }
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the wordaxe hyphenators.")
+    parser.add_argument("names", nargs="*", help="hyphenators to run, e.g. DCWHyphenator or PyHnjHyphenator:en_US")
+    parser.add_argument("-o", "--output", help="JSON output file (default: stdout)")
+    parser.add_argument("-c", "--corpus", default=DEFAULT_CORPUS, help="text corpus (iso-8859-1)")
+    parser.add_argument("-n", "--words", type=int, default=2000, help="number of words per corpus")
+    parser.add_argument("-r", "--runs", type=int, default=3, help="timing runs (the best is reported)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed for the generated word lists")
+    parser.add_argument("--no-cold", action="store_true", help="skip the cold construction timing")
+    options = parser.parse_args(args)
+    results = run(options.corpus, options.words, options.runs, options.seed,
+                  options.names, not options.no_cold)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+The directories where compiled files (patterns, dictionaries)
+are stored: a directory next to the source, and a directory
+in the temp directory which belongs to the current user only.
+
+Usage:
+
+for d in cache_dirs("hyph_de_DE.dic", "patterncache"):
+    ...
+'''
+
+import os
+import stat
+import getpass
+import tempfile
+
+
+def private_temp_dir(name):
+    """
+    Returns the directory wordaxe-name-user in the temp directory,
+    creating it with mode 0700 if necessary; or None if it cannot
+    be created, or if it is not a directory owned by the current user
+    which only the current user can write to.
+    """
+    try:
+        user = str(os.getuid())
+    except AttributeError:
+        user = getpass.getuser() # Windows: the temp directory is per user
+    path = os.path.join(tempfile.gettempdir(), "wordaxe-%s-%s" % (name, user))
+    try:
+        os.mkdir(path, 0o700)
+    except EnvironmentError:
+        pass # it already exists (checked below) or cannot be created
+    try:
+        st = os.lstat(path)
+    except EnvironmentError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+    if hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022):
+        return None
+    return path
+
+
+def cache_dirs(fname, name):
+    """
+    Returns the directories where compiled files for the source fname
+    are stored: __name__ next to fname and the private temp directory.
+    """
+    dirs = [os.path.join(os.path.dirname(os.path.abspath(fname)), "__%s__" % name)]
+    private = private_temp_dir(name)
+    if private is not None:
+        dirs.append(private)
+    return dirs
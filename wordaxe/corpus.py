@@ -0,0 +1,183 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Hyphenation of large text collections using a pool of worker processes.
+
+The words are sent to the workers in chunks. Each worker creates
+its hyphenator once, and the results are returned in the input order,
+with only a limited number of chunks in progress at any time.
+
+Usage:
+
+driver = CorpusHyphenator("DE", processes=4)
+for word, hword in driver.hyphenate(words_from_files(["archive.txt"], "utf-8")):
+    ...
+driver.close()
+print(driver.stats())
+'''
+
+import io
+import os
+import multiprocessing
+from collections import deque
+from itertools import islice
+from timeit import default_timer as timer
+
+import wordaxe
+from wordaxe.hyphen import Hyphenator
+
+# The hyphenator of the current worker process.
+_worker_hyphenator = None
+
+def _init_worker(hyphenator):
+    "Creates the hyphenator in a worker process."
+    global _worker_hyphenator
+    if not isinstance(hyphenator, Hyphenator):
+        hyphenator = hyphenator() # a factory
+    _worker_hyphenator = hyphenator
+
+def worker_hyphenator():
+    "Returns the hyphenator of the current worker process."
+    return _worker_hyphenator
+
+def _hyphenate_chunk(words):
+    "Hyphenates a chunk of words in a worker process."
+    start = timer()
+    results = _worker_hyphenator.hyphenate_many(words)
+    return os.getpid(), len(words), timer() - start, results
+
+def chunked(iterable, size):
+    "Splits an iterable into lists of at most size elements."
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def words_from_files(filenames, encoding="utf-8"):
+    """
+    Reads the words (separated by whitespace) from text files.
+    The files are read line by line.
+    """
+    for fname in filenames:
+        with io.open(fname, "r", encoding=encoding) as f:
+            for line in f:
+                for word in line.split():
+                    yield word
+
+
+class CorpusHyphenator(object):
+    """
+    Hyphenates a large amount of words using a pool of worker processes.
+
+    hyphenator can be a language registered in wordaxe.hyphRegistry,
+    a Hyphenator instance (which is copied to each worker process),
+    or a picklable factory (e.g. a class or a function) that is called
+    once in each worker process to create the hyphenator.
+
+    At most max_pending chunks of chunk_size words are in progress
+    at any time, so the memory usage does not depend on the size
+    of the input.
+    """
+
+    def __init__(self, hyphenator, processes=None, chunk_size=1000, max_pending=None):
+        if isinstance(hyphenator, (str, type(u""))):
+            try:
+                # Let the workers build a lazily registered hyphenator themselves.
+                hyphenator = wordaxe.hyphRegistry.factory(hyphenator) or wordaxe.hyphRegistry[hyphenator]
+            except KeyError:
+                raise ValueError("No hyphenator registered for language %r" % hyphenator)
+        self.hyphenator = hyphenator
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or 2 * self.processes
+        self.worker_stats = {}
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.processes, _init_worker, (self.hyphenator,))
+        return self._pool
+
+    def map_chunks(self, func, chunks):
+        """
+        Calls func(chunk) in the worker processes for each chunk
+        and yields (chunk, result) tuples in the order of the chunks.
+        func must be a picklable (module-level) function;
+        it can use the worker's hyphenator via worker_hyphenator().
+        """
+        pool = self._get_pool()
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.apply_async(func, (chunk,))))
+            if len(pending) >= self.max_pending:
+                chunk, result = pending.popleft()
+                yield chunk, result.get()
+        while pending:
+            chunk, result = pending.popleft()
+            yield chunk, result.get()
+
+    def hyphenate(self, words):
+        """
+        Hyphenates the words (any iterable),
+        yielding (word, HyphenatedWord or None) tuples in input order.
+        """
+        for chunk, (pid, count, seconds, results) in self.map_chunks(_hyphenate_chunk,
+                                                                     chunked(words, self.chunk_size)):
+            self._add_stats(pid, count, seconds)
+            for item in zip(chunk, results):
+                yield item
+
+    def _add_stats(self, pid, count, seconds):
+        entry = self.worker_stats.setdefault(pid, [0, 0.0])
+        entry[0] += count
+        entry[1] += seconds
+
+    def stats(self):
+        """
+        Returns a dict mapping the process id of each worker
+        to a dict with the number of words, the seconds spent
+        and the words per second.
+        """
+        result = {}
+        for pid, (count, seconds) in self.worker_stats.items():
+            result[pid] = {"words": count,
+                           "seconds": seconds,
+                           "words_per_sec": seconds and count / seconds or 0.0,
+                          }
+        return result
+
+    def close(self):
+        "Stops the worker processes."
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def hyphenate_corpus(words, hyphenator, **kwargs):
+    """
+    Convenience function: hyphenates the words using a CorpusHyphenator
+    (see there for the arguments), yielding (word, HyphenatedWord) tuples.
+    """
+    driver = CorpusHyphenator(hyphenator, **kwargs)
+    try:
+        for result in driver.hyphenate(words):
+            yield result
+    finally:
+        driver.close()
@@ -0,0 +1,546 @@
+# -*- coding: UTF-8 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+The dictionary of the DCWHyphenator: special words, roots,
+prefixes and suffixes (with their properties), and the
+prefix and suffix characters.
+
+Parsing the dictionary is done only once: the parsed dictionary
+is stored as a compiled file in the directory __dictcache__ next
+to the source (or in a directory of the current user in the temp
+directory if that is not writable, see wordaxe.cachedir), and
+shared by all DCWHyphenator instances in the process.
+A compiled file contains the Aho-Corasick automaton of the pieces
+(see wordaxe.ahocorasick) as flat arrays, which are memory-mapped,
+and the lines of the source for each piece; the properties of a
+piece are only created when it is found in a word.
+It is used as long as the modification time and the size of the
+source and the wordaxe version are the same; reading it never
+executes code.
+
+Usage:
+
+dictionary = load_dictionary()                  # wordaxe/dict/DEhyph.py
+dictionary = load_dictionary("my_words.txt")    # a dictionary file
+hyphenator = DCWHyphenator("DE", 5, dictionary=dictionary)
+
+or, to compile a dictionary file explicitly:
+
+compile_dictionary(["my_words.txt"], "my_words.wxc")
+hyphenator = DCWHyphenator("DE", 5, dictionary=read_compiled("my_words.wxc"))
+
+python -m wordaxe.dcwdict my_words.wxc my_words.txt
+
+A dictionary file is a UTF-8 text file in the format of
+wordaxe/dict/DEhyph.py, with a line [name] before each section:
+
+[special_words]
+urinstinkt,TRENNUNG:ur8instinkt
+[roots]
+silb
+[prefixes]
+ab
+[suffixes]
+ung,NOT_AFTER:n
+
+The sections prefix_chars and suffix_chars are optional,
+by default the characters from DEhyph are used.
+'''
+
+import os
+import io
+import re
+import sys
+import mmap
+import json
+import array
+import struct
+from hashlib import md5
+
+# Unicode type compatibility for Python 2 and 3
+if sys.version < '3':
+    unicode_type = unicode # @UndefinedVariable
+else:
+    unicode_type = str
+
+from wordaxe.hyphrules import RULES, Prefix, Root, Suffix
+from wordaxe.ahocorasick import AhoCorasick, CompiledAhoCorasick
+from wordaxe.cachedir import cache_dirs
+
+SECTIONS = ["special_words", "roots", "prefixes", "suffixes", "prefix_chars", "suffix_chars"]
+PIECES = ["prefixes", "roots", "suffixes"] # (the kinds 0, 1, 2)
+
+# Layout of a compiled file (native byte order):
+# header   magic, format, the number of pieces, slots and packed
+#          integers, the sizes of the meta data and of the lines
+# arrays   info (kind + 4 * order) of the pieces, first (the index
+#          of the first line of each piece, and the number of lines),
+#          base, check, fail and outs of the slots, and packed,
+#          see wordaxe.ahocorasick.CompiledAhoCorasick
+# meta     JSON: wordaxe version, version, source stamp, entries,
+#          prefix_chars, suffix_chars and the alphabet, UTF-8
+# lines    the lines of the source for the pieces, UTF-8
+MAGIC = b"WXDC"
+FORMAT = 4
+_HEADER = struct.Struct("=4siiiiii")
+
+
+def module_sections(module):
+    "Returns the sections of a module like wordaxe.dict.DEhyph as a dict."
+    return dict([(name, getattr(module, name)) for name in SECTIONS])
+
+
+def read_sections(fname, encoding="utf-8"):
+    """
+    Reads a dictionary file (see the module documentation)
+    and returns the sections contained in it as a dict.
+    """
+    sections = {}
+    lines = None
+    with io.open(fname, encoding=encoding) as f:
+        for zeile in f.read().splitlines():
+            name = zeile.strip()
+            if name.startswith(u"[") and name.endswith(u"]"):
+                if name[1:-1] not in SECTIONS:
+                    raise ValueError("%s: unknown section %s" % (fname, name))
+                lines = sections.setdefault(name[1:-1], [])
+            elif lines is not None:
+                lines.append(zeile)
+    for name, lines in sections.items():
+        if name in ["prefix_chars", "suffix_chars"]:
+            sections[name] = u"".join([zeile.strip() for zeile in lines])
+        else:
+            sections[name] = u"\n".join(lines) + u"\n"
+    return sections
+
+
+def _complete(sections):
+    "Adds the missing sections (the characters from DEhyph) to sections."
+    import wordaxe.dict.DEhyph as DEhyph
+    for name in SECTIONS:
+        if name not in sections:
+            sections[name] = name.endswith("_chars") and getattr(DEhyph, name) or u""
+    return sections
+
+
+def _version(sections):
+    "Returns an md5 hash of the sections."
+    h = md5()
+    for name in SECTIONS:
+        h.update(sections[name].encode("utf-8"))
+    return h.hexdigest()
+
+
+def _properties(zeile):
+    """
+    Returns the word and the properties (a list of HyphRules)
+    of a line of the roots, prefixes or suffixes.
+    """
+    # Aufteilen in word und props
+    zeile = zeile.split(",")
+    word = zeile.pop(0)
+    props = []
+    for attr in zeile:
+        if ":" in attr:
+            [propnam,propval] = attr.split(":")
+        else:
+            propnam = attr
+            propval = ""
+        if propnam not in RULES:
+            raise NameError("Unknown property for word %s: %s" % (word,propnam))
+        props.append(RULES[propnam](propval)) # the class is the propnam
+    return word, props
+
+
+class DCWDictionary(object):
+    """
+    A parsed dictionary:
+
+    entries      - the special words as a list of (word, trennung)
+    roots        - each of these is a list of tuples (lae, L),
+    prefixes       where L is a dict of the words of length lae
+    suffixes       with the list of their possible properties
+                   (created on first use)
+    prefix_chars
+    suffix_chars
+    version      - an md5 hash of the source
+
+    Internally, each (kind, word) is a piece with the lines of the
+    source for it; find_pieces finds them with an Aho-Corasick
+    automaton and creates their properties when needed.
+    """
+
+    def __init__(self, sections):
+        "sections is a dict with the sections of the source (see SECTIONS)."
+        entries = []
+
+        # [special_words] einlesen
+        for zeile in sections["special_words"].splitlines():
+            # Leerzeilen und Kommentare überspringen
+            zeile = zeile.strip()
+            if not zeile or zeile.startswith("#"):
+                continue
+            if "=" in zeile:
+                word, trennung = zeile.split("=")
+            else:
+                zeile = zeile.split(",")
+                word = zeile.pop(0)
+                assert len(zeile) >= 1
+                for attr in zeile:
+                    if ":" in attr:
+                        propnam, propval = attr.split(":")
+                    else:
+                        propnam, propval = attr, ""
+                    if propnam == u"TRENNUNG":
+                        trennung = propval
+                    elif propnam == u"KEEP_TOGETHER":
+                        trennung = word
+                    else:
+                        raise NameError("Unknown property for word %s: %s" % (word, propnam))
+            entries.append((word, trennung))
+
+        # roots, prefixes und suffixes einlesen.
+        # Bei diesen können noch - Komma-getrennt - Eigenschaften angegeben sein.
+        # Eine Eigenschaft hat die Form XXX oder XXX:a,b,c
+        pieces = {}   # (kind, word) -> (order, lines), in the order of the source
+        keys = []
+        for kind, name in enumerate(PIECES):
+            zeilen = sections[name]
+            assert isinstance(zeilen, unicode_type)
+            orders = {}  # length -> order of the (lae, L) bucket
+            for zeile in zeilen.splitlines():
+                # Leerzeilen und Kommentare überspringen
+                zeile = zeile.strip()
+                if not zeile or zeile.startswith("#"):
+                    continue
+                word, props = _properties(zeile)
+                piece = pieces.get((kind, word))
+                if piece is None:
+                    piece = pieces[kind, word] = (orders.setdefault(len(word), len(orders)), [])
+                    keys.append((kind, word))
+                piece[1].append(zeile)
+        automaton = AhoCorasick()
+        info, first, lines = [], [], []
+        for i, (kind, word) in enumerate(keys):
+            order, zeilen = pieces[kind, word]
+            info.append(kind + 4 * order)
+            first.append(len(lines))
+            lines.extend(zeilen)
+            automaton.add(word, i)
+        first.append(len(lines))
+        meta = {"version": _version(sections),
+                "stamp": None,
+                "entries": entries,
+                "prefix_chars": sections["prefix_chars"],
+                "suffix_chars": sections["suffix_chars"]}
+        self._setup(meta, info, first, lines, automaton.arrays())
+
+    def _setup(self, meta, info, first, lines, automaton):
+        "Initializes the dictionary (see __init__ and _from_buffer)."
+        self.version = meta["version"]
+        self.entries = [(word, trennung) for word, trennung in meta["entries"]]
+        self.prefix_chars = meta["prefix_chars"]
+        self.suffix_chars = meta["suffix_chars"]
+        self._stamp = meta["stamp"]
+        self._info = info
+        self._first = first
+        self._lines = lines
+        self._automaton = automaton
+        self._props = [None] * len(info)
+        self._values = [None] * len(info)
+        self._sections = None
+
+    def _props_list(self, i):
+        "Returns the list of the lists of properties of piece i."
+        props_list = self._props[i]
+        if props_list is None:
+            props_list = [_properties(zeile)[1]
+                          for zeile in self._lines[self._first[i]:self._first[i+1]]]
+            self._props[i] = props_list
+        return props_list
+
+    def _word(self, i):
+        return self._lines[self._first[i]].split(",", 1)[0]
+
+    def _value(self, i):
+        "Creates the value of piece i for find_pieces."
+        kind, order = self._info[i] & 3, self._info[i] >> 2
+        word = self._word(i)
+        cls = [Prefix, Root, Suffix][kind]
+        candidates = [(piece, piece.getChecks())
+                      for piece in [cls(word, props) for props in self._props_list(i)]]
+        value = self._values[i] = (kind, order, word, candidates)
+        return value
+
+    def find_pieces(self, word):
+        """
+        Finds all the prefixes, roots and suffixes in word at once.
+        Returns a list of (start, end, value), sorted by end, with the
+        values (kind, order, word, candidates): kind is 0, 1 or 2 for
+        prefixes, roots and suffixes, order the index of the
+        (lae, L) tuple in self.prefixes, self.roots or self.suffixes.
+        candidates contains a tuple (piece, checks) for each list of
+        properties of the word: the Prefix, Root or Suffix and its
+        checks (see StringWithProps.getChecks), computed when the
+        piece is found for the first time.
+        """
+        values = self._values
+        result = []
+        for start, end, i in self._automaton.find_all(word):
+            value = values[i]
+            if value is None:
+                value = self._value(i)
+            result.append((start, end, value))
+        return result
+
+    def _get_sections(self):
+        "Creates the lists (lae, L) of the prefixes, roots and suffixes."
+        if self._sections is None:
+            sections = [[], [], []]
+            for i, x in enumerate(self._info):
+                abschnitt = sections[x & 3]
+                order = x >> 2
+                word = self._word(i)
+                # Jeder abschnitt ist eine Liste von Tupeln (lae, L), wobei L
+                # ein Dictionary von Wörtern der Länge lae ist und dazu die Liste
+                # der möglichen Eigenschaften enthält (dasselbe Wort kann je nach
+                # Bedeutung unterschiedliche Eigenschaften haben).
+                if order == len(abschnitt):
+                    abschnitt.append((len(word), {}))
+                abschnitt[order][1][word] = self._props_list(i)
+            self._sections = sections
+        return self._sections
+
+    prefixes = property(lambda self: self._get_sections()[0])
+    roots = property(lambda self: self._get_sections()[1])
+    suffixes = property(lambda self: self._get_sections()[2])
+
+    def _meta(self):
+        return {"wordaxe": _package_version(),
+                "version": self.version,
+                "stamp": self._stamp,
+                "entries": self.entries,
+                "prefix_chars": self.prefix_chars,
+                "suffix_chars": self.suffix_chars,
+                "alphabet": self._automaton.alphabet}
+
+    def __reduce__(self):
+        # (memory-mapped arrays cannot be pickled)
+        return (_from_buffer, (_dump(self), "<pickle>"))
+
+
+def _package_version():
+    "The wordaxe version, for the names and the content of compiled files."
+    import wordaxe
+    return wordaxe.version
+
+
+def _dump(dictionary):
+    "Returns the content of a compiled file for dictionary."
+    automaton = dictionary._automaton
+    meta = json.dumps(dictionary._meta(), sort_keys=True).encode("utf-8")
+    lines = u"\n".join(dictionary._lines).encode("utf-8")
+    parts = [_HEADER.pack(MAGIC, FORMAT, len(dictionary._info), len(automaton.base),
+                          len(automaton.packed), len(meta), len(lines))]
+    for L in [dictionary._info, dictionary._first, automaton.base, automaton.check,
+              automaton.fail, automaton.outs, automaton.packed]:
+        a = array.array("i", L)
+        parts.append(a.tostring() if sys.version < '3' else a.tobytes())
+    parts.append(meta)
+    parts.append(lines)
+    return b"".join(parts)
+
+
+def save_compiled(dictionary, filename):
+    """
+    Writes the dictionary to a compiled file.
+    The file is replaced atomically.
+    """
+    tmpname = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmpname, "wb") as f:
+        f.write(_dump(dictionary))
+    getattr(os, "replace", os.rename)(tmpname, filename)
+
+
+def _from_buffer(buf, filename):
+    """
+    Returns the DCWDictionary in buf, the content of a compiled file.
+    Raises ValueError if it is not a compiled dictionary
+    of this wordaxe version.
+    """
+    if len(buf) < _HEADER.size:
+        raise ValueError("%s: not a compiled dictionary" % filename)
+    magic, fmt, npieces, nslots, npacked, nmeta, nlines = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or fmt != FORMAT:
+        raise ValueError("%s: not a compiled dictionary (format %d)" % (filename, fmt))
+    counts = [npieces, nslots, npacked, nmeta, nlines]
+    sizes = [npieces, npieces + 1, nslots, nslots, nslots, nslots, npacked]
+    if min(counts) < 0 or nslots < 1 or len(buf) != _HEADER.size + 4 * sum(sizes) + nmeta + nlines:
+        raise ValueError("%s: truncated or invalid compiled dictionary" % filename)
+    offset = _HEADER.size
+    arrays = []
+    for n in sizes:
+        if sys.version < '3':
+            # no memoryview.cast, so the arrays are copied
+            a = array.array("i")
+            a.fromstring(buf[offset:offset+4*n])
+        else:
+            a = memoryview(buf)[offset:offset+4*n].cast("i")
+        arrays.append(a)
+        offset += 4 * n
+    info, first, base, check, fail, outs, packed = arrays
+    try:
+        meta = json.loads(buf[offset:offset+nmeta].decode("utf-8"))
+        offset += nmeta
+        lines = buf[offset:offset+nlines].decode("utf-8").split(u"\n")
+    except ValueError:
+        raise ValueError("%s: not a compiled dictionary" % filename)
+    if not isinstance(meta, dict) or meta.get("wordaxe") != _package_version():
+        raise ValueError("%s: not a compiled dictionary of this wordaxe version" % filename)
+    try:
+        for text in [meta["version"], meta["prefix_chars"], meta["suffix_chars"], meta["alphabet"]]:
+            if not isinstance(text, unicode_type):
+                raise TypeError(text)
+        if npieces and (first[0] != 0 or first[npieces] != len(lines)):
+            raise ValueError(first)
+        dictionary = DCWDictionary.__new__(DCWDictionary)
+        dictionary._setup(meta, info, first, lines,
+                          CompiledAhoCorasick(meta["alphabet"], base, check, fail, outs, packed))
+    except Exception:
+        # (wrong data)
+        raise ValueError("%s: not a compiled dictionary" % filename)
+    return dictionary
+
+
+def read_compiled(filename):
+    """
+    Reads a compiled file written by save_compiled (it is memory-mapped).
+    Raises ValueError if it is not a compiled dictionary
+    of this wordaxe version.
+    """
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("%s: not a compiled dictionary" % filename)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _from_buffer(mm, filename)
+
+
+def compile_dictionary(sources, target, encoding="utf-8"):
+    """
+    Compiles the dictionary files sources (see the module documentation)
+    into the file target; the sections of several files are joined.
+    Returns the DCWDictionary.
+    """
+    if isinstance(sources, (str, unicode_type)):
+        sources = [sources]
+    sections = {}
+    for fname in sources:
+        for name, text in read_sections(fname, encoding).items():
+            if name in sections and not name.endswith("_chars"):
+                sections[name] += text
+            else:
+                sections[name] = text
+    dictionary = DCWDictionary(_complete(sections))
+    save_compiled(dictionary, target)
+    return dictionary
+
+
+# The default source, wordaxe/dict/DEhyph.py
+_DEFAULT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dict", "DEhyph.py")
+
+# (source file, encoding) -> (stamp, DCWDictionary),
+# for all dictionaries loaded in this process
+_LOADED = {}
+
+
+def load_dictionary(source=None, encoding="utf-8", cache_dir=None):
+    """
+    Returns the DCWDictionary for source: a dictionary file,
+    or a module like wordaxe.dict.DEhyph (the default).
+    The dictionary is read from a compiled file if there is one
+    for the current modification time and size of source (see
+    the module documentation), otherwise it is parsed and the
+    compiled file is written.
+    If cache_dir is given, the compiled file is stored there.
+    """
+    if source is None and not os.path.exists(_DEFAULT):
+        import wordaxe.dict.DEhyph as source
+    if source is None:
+        fname = _DEFAULT
+    elif isinstance(source, (str, unicode_type)):
+        fname = source
+    else:
+        fname = source.__file__
+    fname = os.path.abspath(fname)
+    st = os.stat(fname)
+    stamp = [st.st_mtime, st.st_size]
+    loaded = _LOADED.get((fname, encoding))
+    if loaded is not None and loaded[0] == stamp:
+        return loaded[1]
+    name = "%s-%d-%s.wxc" % (md5(repr((fname, encoding)).encode("utf-8")).hexdigest(), FORMAT,
+                             re.sub(r"[^0-9A-Za-z.]+", "_", _package_version()))
+    dirs = cache_dir and [cache_dir] or cache_dirs(fname, "dictcache")
+    dictionary = None
+    for d in dirs:
+        path = os.path.join(d, name)
+        if os.path.exists(path):
+            try:
+                dictionary = read_compiled(path)
+                break
+            except (ValueError, EnvironmentError):
+                pass # e.g. a truncated file, compile it again
+    if dictionary is None or dictionary._stamp != stamp:
+        if source is None:
+            import wordaxe.dict.DEhyph as source
+        if isinstance(source, (str, unicode_type)):
+            sections = _complete(read_sections(source, encoding))
+        else:
+            sections = module_sections(source)
+        if dictionary is None or dictionary.version != _version(sections):
+            dictionary = DCWDictionary(sections)
+        # (else only the stamp has changed)
+        dictionary._stamp = stamp
+        for d in dirs:
+            if not os.path.isdir(d):
+                try:
+                    os.makedirs(d)
+                except EnvironmentError:
+                    pass # created by another process, or not writable
+            try:
+                save_compiled(dictionary, os.path.join(d, name))
+                break
+            except EnvironmentError:
+                continue # not writable, try the next directory
+    _LOADED[fname, encoding] = (stamp, dictionary)
+    return dictionary
+
+
+def forget_loaded():
+    """
+    Forgets the dictionaries loaded in this process, so that
+    load_dictionary reads the compiled files again.
+    """
+    _LOADED.clear()
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile a dictionary for the DCWHyphenator.")
+    parser.add_argument("target")
+    parser.add_argument("sources", nargs="+")
+    parser.add_argument("-e", "--encoding", default="utf-8", help="encoding of the sources (default: utf-8)")
+    options = parser.parse_args(args)
+    dictionary = compile_dictionary(options.sources, options.target, options.encoding)
+    print("%d words written to %s" % (len(dictionary._info), options.target))
+
+
+if __name__ == "__main__":
+    main()
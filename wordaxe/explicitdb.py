@@ -0,0 +1,198 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+A compiled (binary) format for the entries of an ExplicitHyphenator.
+
+Parsing a large list of explicit hyphenations costs time and memory
+in every process. The compiled file is opened with mmap and queried
+without loading it, so all processes share the same copy
+in the operating system's page cache.
+
+Usage:
+
+compile_entries(["special_words.lst"], "special_words.wxd")
+...
+hyphenator = ExplicitHyphenator("DE", 5)
+hyphenator.add_compiled_file("special_words.wxd")
+
+or from the command line:
+
+python -m wordaxe.explicitdb special_words.wxd special_words.lst
+
+File format (all numbers are little endian unsigned 32 bit integers):
+
+header   "WXED", format version, count, number of slots,
+         the dictionary version (32 bytes, an md5 hex digest)
+slots    a hash table with linear probing: the number (1..count)
+         of the entry at the crc32 of its key, or 0 for an empty slot
+offsets  count+1 offsets of the entries, which are sorted by key
+entries  the key (the word in lower case, UTF-8), a zero byte
+         and the shape of the hyphenation (e.g. "....5..5...")
+'''
+
+import os
+import mmap
+import struct
+from zlib import crc32
+
+from wordaxe.ExplicitHyphenator import ExplicitHyphenator, _decode_shape
+
+MAGIC = b"WXED"
+FORMAT = 1
+_HEADER = struct.Struct("<4sIII32s")
+_UINT = struct.Struct("<I")
+_UINT2 = struct.Struct("<II")
+
+
+def _shape(word, points):
+    "Returns the shape of the hyphenation of word (see _decode_shape)."
+    shape = [u"."] * len(word)
+    for hp in reversed(points):
+        shape.insert(hp.indx, u"%d" % hp.quality)
+    return u"".join(shape)
+
+
+def save_entries(hyphenator, target):
+    """
+    Writes the entries of the ExplicitHyphenator hyphenator
+    (without its compiled files) to the compiled file target.
+    The file is replaced atomically.
+    Returns the number of entries.
+    """
+    keys = sorted([word.encode("utf-8") for word in hyphenator.entries])
+    records = []
+    for key in keys:
+        if b"\0" in key:
+            raise ValueError("Invalid word %r" % key)
+        word = key.decode("utf-8")
+        records.append(key + b"\0" + _shape(word, hyphenator._points(word)).encode("ascii"))
+    count = len(records)
+    nslots = 1
+    while nslots < 2 * count:
+        nslots *= 2
+    mask = nslots - 1
+    slots = [0] * nslots
+    for number, key in enumerate(keys):
+        slot = crc32(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = number + 1
+    offsets = []
+    offset = _HEADER.size + 4 * nslots + 4 * (count + 1)
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+    offsets.append(offset)
+    version = hyphenator._entries_version().encode("ascii")
+    tmpname = target + ".tmp"
+    with open(tmpname, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT, count, nslots, version))
+        f.write(struct.pack("<%dI" % nslots, *slots))
+        f.write(struct.pack("<%dI" % (count + 1), *offsets))
+        f.write(b"".join(records))
+    getattr(os, "replace", os.rename)(tmpname, target)
+    return count
+
+
+def compile_entries(sources, target, encoding=None):
+    """
+    Compiles the files sources (in the format of
+    ExplicitHyphenator.add_entries_from_file) to the file target.
+    Returns the number of entries.
+    """
+    if isinstance(sources, (str, type(u""))):
+        sources = [sources]
+    hyphenator = ExplicitHyphenator()
+    for fname in sources:
+        hyphenator.add_entries_from_file(fname, encoding)
+    return save_entries(hyphenator, target)
+
+
+class CompiledEntries(object):
+    """
+    A read-only mapping of words (in lower case) to hyphenation points,
+    stored in a compiled file (see the module documentation).
+
+    Instances can be pickled; the file is opened again on unpickling.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            raise ValueError("%s: not a compiled entries file" % filename)
+        magic, fmt, self._count, nslots, version = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError("%s: not a compiled entries file (format %d)" % (filename, fmt))
+        self.version = version.decode("ascii")
+        self._mask = nslots - 1
+        self._slots = _HEADER.size
+        self._offsets = _HEADER.size + 4 * nslots
+
+    def __reduce__(self):
+        return (CompiledEntries, (self.filename,))
+
+    def close(self):
+        self._mm.close()
+
+    def _record(self, number):
+        start, end = _UINT2.unpack_from(self._mm, self._offsets + 4 * number)
+        return self._mm[start:end]
+
+    def get(self, word, default=None):
+        """
+        Returns the tuple of HyphenationPoints for word (in lower case),
+        or default if it is not contained.
+        """
+        key = word.encode("utf-8") + b"\0"
+        mask = self._mask
+        slot = crc32(key[:-1]) & mask
+        while True:
+            number = _UINT.unpack_from(self._mm, self._slots + 4 * slot)[0]
+            if not number:
+                return default
+            record = self._record(number - 1)
+            if record.startswith(key):
+                return _decode_shape(record[len(key):].decode("ascii"))
+            slot = (slot + 1) & mask
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        return self._count
+
+    def keys(self):
+        "Returns the words, sorted by their UTF-8 representation."
+        return [self._record(number).split(b"\0")[0].decode("utf-8")
+                for number in range(self._count)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return "CompiledEntries(%r)" % self.filename
+
+
+def main(args=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile explicit hyphenation entries.")
+    parser.add_argument("target")
+    parser.add_argument("sources", nargs="+")
+    parser.add_argument("-e", "--encoding", help="encoding of the sources (default: from the coding line)")
+    options = parser.parse_args(args)
+    count = compile_entries(options.sources, options.target, options.encoding)
+    print("%d entries written to %s" % (count, options.target))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,7 @@ from .hyphen import *
 from xml.sax.saxutils import escape,quoteattr
 
 from wordaxe.BaseHyphenator import BaseHyphenator
+from wordaxe.liang import PatternTrie, read_patterns
 
 VERBOSE = False
 
@@ -44,24 +45,10 @@ class PyHnjHyphenator(BaseHyphenator):
         # load pattern file
         fname = os.path.join(hyphenDir,"hyph_%s.dic"%language)
         # first line is set of characters, all other lines are patterns
-        # Note: we do not use a TRIE, we just store the patterns in a dict string:codes
         self.quality = quality
-        lines = open(fname).read().splitlines()
-        self.characters = lines.pop(0)
-        self.patterns = {}
-        for pattern in lines:
-            pat = ""
-            codes = ""
-            digit = "0"
-            for ch in pattern:
-                if ch>='0' and ch<='9':
-                    digit = ch
-                else:
-                    codes = codes+digit
-                    pat = pat+ch
-                    digit = "0"
-            codes = codes+digit
-            self.patterns[pat.decode("iso-8859-1")] = codes
+        self.characters, patterns = read_patterns(fname)
+        self.trie = PatternTrie([pattern for pattern in patterns
+                                 if len(pattern.strip(u"0123456789")) >= 2])
         
     # Hilfsfunktion
     def schiebe(self,offset,L):
@@ -73,31 +60,14 @@ class PyHnjHyphenator(BaseHyphenator):
         ###
         ### Here comes the new logic.
         
-        word = "." + zusgWort.lower() + "."
-        #print "word=%s" % word
-        # Alle Lngen durchgehen (minimum: 2)
-        codes = ["0"]*len(word)
-        for patlen in range(2,len(word)-1):
-            #print "patlen %d" % patlen
-            for startindx in range(len(word)-patlen):
-                #print "startindx %d" % startindx
-                try:
-                    patcode = self.patterns[word[startindx:startindx+patlen]]
-                    #print "testpat=%s patcode=%s" % (word[startindx:startindx+patlen],patcode)
-                    for i,digit in enumerate(patcode):
-                        if digit > codes[i+startindx]:
-                            codes[i+startindx] = digit
-                except KeyError:
-                    pass
-        codes = codes[2:-1]
-        #print zusgWort
-        #print "".join(codes)
+        # (without the final ".", like PyHnjHyphenator)
+        codes = self.trie.priorities(u"." + zusgWort.lower())[2:-1]
 
         ### end of the new logic.
         
         hyphPoints = []
         for i in range(len(codes)):
-            if (ord(codes[i])-ord('0')) % 2:
+            if codes[i] % 2:
                 hyphPoints.append(HyphenationPoint(i+1,self.quality,0,self.shy,0,u""))
         return [hyphPoints]
         
@@ -0,0 +1,499 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Cache backends for wordaxe.hyphen.Cached.
+
+A cache backend has to provide the method get_or_compute(key, func, *args),
+plus discard(key), clear() and stats(); and keys() or invalidate(namespace, words)
+for removing the entries of changed words or of a whole namespace
+(see wordaxe.hyphen.invalidate_cache).
+The default backend is the private wordaxe.hyphen.LRUCache.
+
+Usage:
+
+cache = SharedCache(max_entries=100000)
+hyphenator = Cached(DCWHyphenator("DE",5), cache=cache)
+
+or, to keep the results across processes and runs:
+
+cache = PersistentCache("hyphenations.sqlite", max_entries=10000)
+hyphenator = Cached(DCWHyphenator("DE",5), cache=cache)
+...
+cache.close()
+'''
+
+import os
+import struct
+import threading
+
+from wordaxe.hyphen import SHY, HyphenationPoint, HyphenatedWord, LRUCache, _MISSING, _affected
+
+
+class _Pending(object):
+    """
+    A computation in progress.
+    Other threads asking for the same key wait for the result.
+    """
+    __slots__ = ["event", "value", "failed"]
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class _Stripe(object):
+    "One segment of a SharedCache, protected by its own lock."
+    __slots__ = ["lock", "cache", "pending", "merged"]
+    def __init__(self, max_entries, max_bytes):
+        self.lock = threading.Lock()
+        self.cache = LRUCache(max_entries, max_bytes)
+        self.pending = {}
+        self.merged = 0
+
+
+class SharedCache(object):
+    """
+    A thread-safe cache that can be shared by several Cached
+    instances and threads.
+
+    The keys are distributed over several stripes (segments),
+    each with its own lock and its own LRUCache, so that
+    threads rarely have to wait for each other.
+    The limits max_entries and max_bytes are split evenly
+    among the stripes.
+
+    If a thread asks for a key that another thread is just computing,
+    it waits for that result instead of computing it a second time.
+
+    A SharedCache can be pickled (as part of a hyphenator),
+    the unpickled copy is empty.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, stripes=16):
+        assert stripes >= 1
+        self._args = (max_entries, max_bytes, stripes)
+        if max_entries is not None:
+            max_entries = -(-max_entries // stripes)
+        if max_bytes is not None:
+            max_bytes = -(-max_bytes // stripes)
+        self._stripes = [_Stripe(max_entries, max_bytes) for i in range(stripes)]
+
+    def __reduce__(self):
+        # (locks cannot be pickled)
+        return (SharedCache, self._args)
+
+    def _stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def __len__(self):
+        return sum([len(stripe.cache) for stripe in self._stripes])
+
+    def __contains__(self, key):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return key in stripe.cache
+
+    def get(self, key, default=None):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            return stripe.cache.get(key, default)
+
+    def put(self, key, value):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.cache.put(key, value)
+
+    def get_or_compute(self, key, func, *args):
+        """
+        Returns the cached value for key.
+        If not found, the value is computed as func(*args)
+        (outside of the lock) and added to the cache.
+        Concurrent requests for the same key are merged.
+        """
+        stripe = self._stripe(key)
+        with stripe.lock:
+            value = stripe.cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            pending = stripe.pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = stripe.pending[key] = _Pending()
+            else:
+                stripe.merged += 1
+        if not owner:
+            pending.event.wait()
+            if pending.failed:
+                # The other thread failed, so try it ourselves
+                # (this will raise the exception again in most cases).
+                return func(*args)
+            return pending.value
+        try:
+            value = func(*args)
+        except:
+            with stripe.lock:
+                del stripe.pending[key]
+            pending.failed = True
+            pending.event.set()
+            raise
+        with stripe.lock:
+            stripe.cache.put(key, value)
+            del stripe.pending[key]
+        pending.value = value
+        pending.event.set()
+        return value
+
+    def discard(self, key):
+        stripe = self._stripe(key)
+        with stripe.lock:
+            stripe.cache.discard(key)
+
+    def keys(self):
+        result = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                result += stripe.cache.keys()
+        return result
+
+    def invalidate(self, namespace, words):
+        "See wordaxe.hyphen.invalidate_cache."
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                removed += stripe.cache.invalidate(namespace, words)
+        return removed
+
+    def clear(self):
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.cache.clear()
+                stripe.merged = 0
+
+    def stats(self):
+        """
+        Returns the statistics summed up over all stripes.
+        merged counts the requests that waited for a computation
+        started by another thread.
+        """
+        result = {"merged": 0}
+        for stripe in self._stripes:
+            with stripe.lock:
+                for name, value in stripe.cache.stats().items():
+                    result[name] = result.get(name, 0) + value
+                result["merged"] += stripe.merged
+        return result
+
+
+# Binary encoding of hyphenation points.
+# Each point starts with the index (2 bytes) and a byte containing
+# the quality (lower 4 bits) and the kind of the point (upper bits):
+_PLAIN = 0x00     # nl=0, sl=SHY, nr=0, sr=""
+_NO_SHY = 0x10    # nl=0, sl="",  nr=0, sr=""
+_EXTENDED = 0x20  # followed by nl, nr and the length-prefixed UTF-8 strings sl, sr
+_WIDE = 0x30      # like _EXTENDED, with wider fields (and the quality)
+
+_HEAD = struct.Struct("<HB")
+_EXT = struct.Struct("<BBBB")
+_WIDE_EXT = struct.Struct("<iHHII")
+
+def encode_hyphenations(hyphenations):
+    """
+    Encodes a list of HyphenationPoints as a compact byte string.
+    Points that don't fit into the compact encoding (a quality
+    outside 0..15, nl or nr above 255 or sl or sr longer than
+    255 bytes) use a wider encoding.
+    Raises ValueError if a point cannot be encoded at all.
+    """
+    parts = []
+    for hp in hyphenations:
+        try:
+            parts.extend(_encode_point(hp))
+        except struct.error:
+            raise ValueError("cannot encode %r" % (hp,))
+    return b"".join(parts)
+
+def _encode_point(hp):
+    "Returns the parts of the encoding of one HyphenationPoint."
+    compact = 0 <= hp.quality <= 0x0F
+    if compact and hp.nl == 0 and hp.nr == 0 and hp.sr == u"" and hp.sl in (SHY, u""):
+        if hp.sl:
+            kind = _PLAIN
+        else:
+            kind = _NO_SHY
+        return [_HEAD.pack(hp.indx, kind | hp.quality)]
+    sl = hp.sl.encode("utf-8")
+    sr = hp.sr.encode("utf-8")
+    if compact and 0 <= min(hp.nl, hp.nr) and max(hp.nl, hp.nr, len(sl), len(sr)) <= 0xFF:
+        return [_HEAD.pack(hp.indx, _EXTENDED | hp.quality),
+                _EXT.pack(hp.nl, hp.nr, len(sl), len(sr)), sl, sr]
+    return [_HEAD.pack(hp.indx, _WIDE),
+            _WIDE_EXT.pack(hp.quality, hp.nl, hp.nr, len(sl), len(sr)), sl, sr]
+
+def decode_hyphenations(data):
+    """
+    Decodes a byte string created by encode_hyphenations.
+    """
+    hyphenations = []
+    pos = 0
+    end = len(data)
+    while pos < end:
+        indx, flags = _HEAD.unpack_from(data, pos)
+        pos += _HEAD.size
+        kind, quality = flags & 0xF0, flags & 0x0F
+        if kind == _PLAIN:
+            hyphenations.append(HyphenationPoint(indx, quality, 0, SHY, 0, u""))
+        elif kind == _NO_SHY:
+            hyphenations.append(HyphenationPoint(indx, quality, 0, u"", 0, u""))
+        else:
+            if kind == _WIDE:
+                quality, nl, nr, lsl, lsr = _WIDE_EXT.unpack_from(data, pos)
+                pos += _WIDE_EXT.size
+            else:
+                nl, nr, lsl, lsr = _EXT.unpack_from(data, pos)
+                pos += _EXT.size
+            sl = data[pos:pos+lsl].decode("utf-8")
+            pos += lsl
+            sr = data[pos:pos+lsr].decode("utf-8")
+            pos += lsr
+            hyphenations.append(HyphenationPoint(indx, quality, nl, sl, nr, sr))
+    return hyphenations
+
+
+class PersistentCache(object):
+    """
+    A cache backend storing the results in an SQLite database file,
+    so that they survive the process and can be shared by
+    several processes (and threads) at the same time.
+
+    The results are keyed by the namespace of the Cached wrapper
+    (by default, the hyphenator class, language, minimum word length
+    and dictionary version, see Hyphenator.cache_namespace) and the word.
+    The hyphenation points are stored using encode_hyphenations.
+
+    New results are written in batches of batch_size entries
+    (call flush() or close() to write the remaining ones).
+    Optionally, an in-memory LRUCache with max_entries entries
+    is used in front of the database.
+    The database uses write-ahead logging, so readers don't
+    block writers; concurrent writers wait up to timeout seconds.
+    """
+
+    def __init__(self, filename, max_entries=None, batch_size=500, timeout=30.0):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.memory = None
+        if max_entries:
+            self.memory = LRUCache(max_entries)
+        self._lock = threading.RLock()
+        self._namespaces = {}
+        self._pending = {}
+        self._conn = None
+        self._pid = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._connect()
+
+    def _connect(self):
+        import sqlite3
+        conn = sqlite3.connect(self.filename, timeout=self.timeout,
+                               check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS hyphenations (
+                          namespace TEXT NOT NULL,
+                          word      TEXT NOT NULL,
+                          known     INTEGER NOT NULL,
+                          points    BLOB,
+                          PRIMARY KEY (namespace, word)
+                        ) WITHOUT ROWID""")
+        self._conn = conn
+        self._pid = os.getpid()
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            # The cache has been closed (then there are no pending entries),
+            # or we are in a forked child process, where the connection
+            # and the pending entries belong to the parent.
+            self._pending = {}
+            if self.memory is not None:
+                self.memory.clear()
+            self._connect()
+        return self._conn
+
+    def _split_key(self, key):
+        if isinstance(key, tuple):
+            namespace, word = key
+        else:
+            namespace, word = u"", key
+        try:
+            nstext = self._namespaces[namespace]
+        except KeyError:
+            if isinstance(namespace, tuple):
+                nstext = u"/".join([u"%s" % x for x in namespace])
+            else:
+                nstext = u"%s" % namespace
+            self._namespaces[namespace] = nstext
+        return nstext, word
+
+    def get(self, key, default=None):
+        with self._lock:
+            if self.memory is not None:
+                value = self.memory.get(key, _MISSING)
+                if value is not _MISSING:
+                    self.hits += 1
+                    return value
+            dbkey = self._split_key(key)
+            value = self._pending.get(dbkey, _MISSING)
+            if value is _MISSING:
+                row = self._connection().execute(
+                    "SELECT known, points FROM hyphenations WHERE namespace=? AND word=?",
+                    dbkey).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return default
+                known, points = row
+                if known:
+                    value = HyphenatedWord(dbkey[1], decode_hyphenations(bytes(points)))
+                else:
+                    value = None
+            self.hits += 1
+            if self.memory is not None:
+                self.memory.put(key, value)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._connection()
+            if self.memory is not None:
+                self.memory.put(key, value)
+            self._pending[self._split_key(key)] = value
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def get_or_compute(self, key, func, *args):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args)
+            self.put(key, value)
+        return value
+
+    def flush(self):
+        "Writes the pending entries to the database."
+        with self._lock:
+            if not self._pending:
+                return
+            rows = []
+            for (nstext, word), value in self._pending.items():
+                if value is None:
+                    rows.append((nstext, word, 0, None))
+                else:
+                    rows.append((nstext, word, 1, encode_hyphenations(value.hyphenations)))
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO hyphenations VALUES (?,?,?,?)", rows)
+            except:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            self.writes += len(rows)
+            self._pending = {}
+
+    def discard(self, key):
+        with self._lock:
+            if self.memory is not None:
+                self.memory.discard(key)
+            dbkey = self._split_key(key)
+            self._pending.pop(dbkey, None)
+            self._connection().execute(
+                "DELETE FROM hyphenations WHERE namespace=? AND word=?", dbkey)
+
+    def keys(self):
+        "Returns the keys (as (namespace, word) tuples of strings) stored in the database."
+        self.flush()
+        with self._lock:
+            return [tuple(row) for row in self._connection().execute(
+                        "SELECT namespace, word FROM hyphenations")]
+
+    def invalidate(self, namespace, words):
+        """
+        Removes the entries of namespace for the words and for the
+        words containing one of them (from the database, too),
+        see wordaxe.hyphen.invalidate_cache.
+        """
+        with self._lock:
+            conn = self._connection()
+            if self.memory is not None:
+                self.memory.invalidate(namespace, words)
+            nstext = self._split_key(namespace is None and u"" or (namespace, u""))[0]
+            removed = set([dbkey for dbkey in self._pending
+                           if dbkey[0] == nstext and _affected(dbkey[1], words)])
+            for dbkey in removed:
+                del self._pending[dbkey]
+            if words is None:
+                cursor = conn.execute("DELETE FROM hyphenations WHERE namespace=?", (nstext,))
+                return len(removed) + cursor.rowcount
+            rows = [(nstext, word) for (word,) in conn.execute(
+                        "SELECT word FROM hyphenations WHERE namespace=?", (nstext,))
+                    if _affected(word, words)]
+            if rows:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany("DELETE FROM hyphenations WHERE namespace=? AND word=?", rows)
+                except:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            removed.update(rows)
+            return len(removed)
+
+    def clear(self):
+        """
+        Removes all entries of all namespaces (from the database, too),
+        for every process using the database file.
+        """
+        with self._lock:
+            self._pending = {}
+            if self.memory is not None:
+                self.memory.clear()
+            self._connection().execute("DELETE FROM hyphenations")
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection().execute(
+                "SELECT COUNT(*) FROM hyphenations").fetchone()[0]
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "writes": self.writes,
+                    "pending": len(self._pending),
+                    "entries": entries,
+                   }
+
+    def close(self):
+        """
+        Writes the pending entries and closes the database.
+        If the cache is used again, the database is opened again.
+        """
+        with self._lock:
+            if self._conn is not None:
+                if self._pid == os.getpid():
+                    self.flush()
+                    self._conn.close()
+                self._conn = None
+                self._pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -9,6 +9,8 @@ __license__="""
 __version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
 
 from copy import copy
+from array import array
+from collections import OrderedDict
 SHY = b"\xAD".decode("iso-8859-1")
 
 # Unicode type compatibility for Python 2 and 3
@@ -72,9 +74,130 @@ class HyphenationPoint(object):
         return 'HyphP(%d,%d)' % (self.indx,self.quality)
     def __repr__(self):
         return 'HyphenationPoint(%d,%d,%d,%s,%d,%s)' % (self.indx,self.quality,self.nl,repr(self.sl),self.nr,repr(self.sr))
+    def __reduce__(self):
+        return (HyphenationPoint, (self.indx,self.quality,self.nl,self.sl,self.nr,self.sr))
+
+# Canonical (shared) HyphenationPoint instances, used for the
+# internal storage of ExplicitHyphenator. They are never returned
+# to callers (see _copy_points), which may modify the points.
+_POINTS = {}
+_MAX_POINTS = 10000
+_EXTRAS = {}
+
+def _point(indx, quality, nl=0, sl=SHY, nr=0, sr=u""):
+    "Returns a canonical HyphenationPoint instance."
+    key = (indx, quality, nl, sl, nr, sr)
+    try:
+        return _POINTS[key]
+    except KeyError:
+        hp = HyphenationPoint(indx, quality, nl, sl, nr, sr)
+        if len(_POINTS) < _MAX_POINTS:
+            _POINTS[key] = hp
+        return hp
+
+def _copy_points(points):
+    "Returns a list of new HyphenationPoints equal to points."
+    return [HyphenationPoint(hp.indx, hp.quality, hp.nl, hp.sl, hp.nr, hp.sr) for hp in points]
+
+class CompactHyphenations(object):
+    """
+    A memory-efficient, read-only replacement for the list
+    of HyphenationPoints in HyphenatedWord.hyphenations.
+    
+    Index, kind and quality of each point are packed into one
+    integer of an array. The usual points (indx,q,0,SHY,0,"") and
+    (indx,q,0,"",0,"") need nothing else; for the other points,
+    the integer contains an index into a tuple of the replacement
+    parameters (q,nl,sl,nr,sr), which are shared between words.
+    
+    Indexing and iteration return new HyphenationPoint instances
+    (modifying them does not change the CompactHyphenations).
+    """
+    
+    __slots__ = ["_data", "_extra"]
+    
+    # kinds of points
+    SHY_POINT = 0    # (indx,q,0,SHY,0,"")
+    PLAIN_POINT = 1  # (indx,q,0,"",0,"")
+    EXTENDED = 2     # see _extra
+    
+    def __init__(self, hyphenations=()):
+        data = array("I")
+        extra = []
+        for hp in hyphenations:
+            if hp.nl == 0 and hp.nr == 0 and not hp.sr and 0 <= hp.quality < 256:
+                if hp.sl == SHY:
+                    data.append(hp.indx << 10 | hp.quality)
+                    continue
+                elif not hp.sl:
+                    data.append(hp.indx << 10 | self.PLAIN_POINT << 8 | hp.quality)
+                    continue
+            params = (hp.quality, hp.nl, hp.sl, hp.nr, hp.sr)
+            data.append(hp.indx << 10 | self.EXTENDED << 8 | len(extra))
+            extra.append(_EXTRAS.setdefault(params, params))
+        if len(extra) > 256:
+            raise ValueError("too many unusual hyphenation points")
+        self._data = data
+        self._extra = extra and tuple(extra) or None
+        
+    def _get(self, pos):
+        v = self._data[pos]
+        kind = v >> 8 & 3
+        if kind == self.SHY_POINT:
+            return HyphenationPoint(v >> 10, v & 255, 0, SHY)
+        elif kind == self.PLAIN_POINT:
+            return HyphenationPoint(v >> 10, v & 255)
+        return HyphenationPoint(v >> 10, *self._extra[v & 255])
+        
+    def __len__(self):
+        return len(self._data)
+        
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(pos) for pos in range(*i.indices(len(self._data)))]
+        if i < 0:
+            i += len(self._data)
+        if not 0 <= i < len(self._data):
+            raise IndexError(i)
+        return self._get(i)
+        
+    def __iter__(self):
+        for pos in range(len(self._data)):
+            yield self._get(pos)
+            
+    def __add__(self, other):
+        return list(self) + list(other)
+        
+    def __radd__(self, other):
+        return list(other) + list(self)
+        
+    def __repr__(self):
+        return "CompactHyphenations(%r)" % list(self)
+        
+    def __reduce__(self):
+        return (CompactHyphenations, (list(self),))
+        
+    def __sizeof__(self):
+        size = object.__sizeof__(self) + sys.getsizeof(self._data)
+        if self._extra is not None:
+            size += sys.getsizeof(self._extra)
+        return size
+        
+    def shifted(self, amt):
+        """
+        Returns a new CompactHyphenations with the points moved left
+        by amt (dropping those at or before amt), see _lshift.
+        """
+        result = CompactHyphenations()
+        delta = amt << 10
+        result._data.extend([v - delta for v in self._data if v >> 10 > amt])
+        result._extra = self._extra
+        return result
 
 def _lshift(hyphenations, amt):
     "Moves the hyphenation points left"
+    if isinstance(hyphenations, CompactHyphenations):
+        return hyphenations.shifted(amt)
     hyph = []
     for h in hyphenations:
         if type(h) is int:
@@ -113,11 +236,16 @@ class HyphenatedWord(unicode_type):
         return o
             
     def __str__(self):
+        if unicode_type is str:
+            return self[:]
         return self.encode("utf-8")
 
     def __repr__(self):
         return ("HyphenatedWord(%s)" % super(HyphenatedWord, self).__repr__())
 
+    def __reduce__(self):
+        return (self.__class__, (self[:], self.hyphenations))
+
     def __add__(self, other):
         """(other) -> instance of this class
         Like unicode.__add__, but assumes that the other element
@@ -180,6 +308,16 @@ class HyphenatedWord(unicode_type):
         "Returns an iteration of the possible hyphenations."
         for hp in self.hyphenations:
             yield self.split(hp)
+
+    def compact(self):
+        """
+        Replaces the list of hyphenation points with a
+        (read-only) CompactHyphenations to save memory.
+        Returns the HyphenatedWord itself.
+        """
+        if type(self.hyphenations) is list:
+            self.hyphenations = CompactHyphenations(self.hyphenations)
+        return self
                 
     @staticmethod 
     def join(*hyphwords):
@@ -300,6 +438,22 @@ class Hyphenator(object):
         #return "%s(%s,%d,%s)" % (str(self.__class__),self.language,self.minWordLength,self.codec)
         return "%s(%s,%d)" % (str(self.__class__),self.language,self.minWordLength)
     
+    def dictionary_version(self):
+        """
+        Returns a string identifying the dictionaries (word lists,
+        patterns etc.) used by this hyphenator.
+        It changes whenever the dictionaries change.
+        This base class does not use any dictionaries.
+        """
+        return ""
+
+    def cache_namespace(self):
+        """
+        Returns a hashable value identifying this hyphenator
+        when results are stored in a cache shared by several hyphenators.
+        """
+        return (self.__class__.__name__, self.language, self.minWordLength, self.dictionary_version())
+
     def postHyphenate(self,hyphenatedWord):
         """This function is called whenever hyphenate has been called.
            It can be used to do some logging,
@@ -307,7 +461,7 @@ class Hyphenator(object):
         """
         if hyphenatedWord is not None:
             assert isinstance(hyphenatedWord, HyphenatedWord)
-            assert type(hyphenatedWord.hyphenations) == list
+            assert type(hyphenatedWord.hyphenations) in (list, CompactHyphenations)
 
     def i_hyphenate(self, aWord):
         """
@@ -325,25 +479,266 @@ class Hyphenator(object):
         self.postHyphenate(hword)
         return hword
         
+    def i_hyphenate_many(self, words):
+        """
+        Hyphenates a list of distinct words, returning a list of the results.
+        Derived classes can override this with a faster bulk implementation.
+        """
+        i_hyphenate = self.i_hyphenate
+        return [i_hyphenate(w) for w in words]
+        
+    def hyphenate_many(self, words):
+        """
+        Like hyphenate, but for an iterable of words.
+        Returns a list of HyphenatedWords (or None for unknown words)
+        in the same order as the input.
+        Each distinct word is only hyphenated once,
+        repeated words share the same result.
+        """
+        words = list(words)
+        distinct = list(OrderedDict.fromkeys(words))
+        for w in distinct:
+            assert isinstance(w,unicode_type)
+        hwords = self.i_hyphenate_many(distinct)
+        postHyphenate = self.postHyphenate
+        for hword in hwords:
+            postHyphenate(hword)
+        results = dict(zip(distinct, hwords))
+        return [results[w] for w in words]
+        
+def _sizeof_entry(key, value):
+    """
+    Estimates the memory used by a cache entry (in bytes).
+    This is only an approximation: shared objects like the
+    SHY string are not taken into account.
+    """
+    size = sys.getsizeof(key)
+    if value is not None:
+        size += sys.getsizeof(value)
+        hyphenations = getattr(value, "hyphenations", None)
+        if type(hyphenations) is list:
+            size += sys.getsizeof(hyphenations) + len(hyphenations) * _POINT_SIZE
+        elif hyphenations is not None:
+            size += sys.getsizeof(hyphenations)
+    return size
+
+_POINT_SIZE = sys.getsizeof(HyphenationPoint(0,0))
+
+def _affected(word, words):
+    """
+    Is the word (or a word containing it) one of the words (in lower case)?
+    If words is None, every word is affected.
+    """
+    if words is None:
+        return True
+    word = word.lower()
+    return word in words or any(w in word for w in words)
+
+def invalidate_cache(cache, namespace, words):
+    """
+    Removes the entries for the words (in lower case) and for all
+    words containing one of them (like compounds or hyphenated words)
+    from the cache backend. The keys are (namespace, word) tuples,
+    or the words themselves if namespace is None.
+    If words is None, all entries of the namespace are removed.
+    If the backend has a method invalidate(namespace, words),
+    it is used, otherwise the keys are checked one by one.
+    Returns the number of removed entries.
+    """
+    if words is not None:
+        words = set(words)
+        if not words:
+            return 0
+    invalidate = getattr(cache, "invalidate", None)
+    if invalidate is not None:
+        return invalidate(namespace, words)
+    return _invalidate_keys(cache, namespace, words)
+
+def _invalidate_keys(cache, namespace, words):
+    "invalidate_cache for a backend with the methods keys and discard."
+    removed = 0
+    for key in cache.keys():
+        if namespace is None:
+            word = key
+        elif type(key) is tuple and key[0] == namespace:
+            word = key[1]
+        else:
+            continue
+        if _affected(word, words):
+            cache.discard(key)
+            removed += 1
+    return removed
+
+class LRUCache(object):
+    """
+    A cache with a limited size.
+    When the cache is full, the least recently used entries
+    are evicted one by one (instead of wiping the whole cache).
+    
+    The size can be limited by the number of entries (max_entries)
+    and/or by the estimated memory usage in bytes (max_bytes).
+    If both are None, the cache grows without limit.
+    
+    The attributes hits, misses and evictions count the lookups
+    and evictions since the cache has been created (or cleared).
+    """
+    
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=_sizeof_entry):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.clear()
+        
+    def __len__(self):
+        return len(self._data)
+        
+    def __contains__(self, key):
+        return key in self._data
+        
+    def get(self, key, default=None):
+        """
+        Returns the cached value for key (or default if not found)
+        and marks the entry as the most recently used one.
+        """
+        data = self._data
+        try:
+            entry = data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        data[key] = entry
+        self.hits += 1
+        return entry[0]
+        
+    def put(self, key, value):
+        """
+        Adds or replaces an entry, evicting the least recently
+        used entries if the cache would become too large.
+        """
+        self.discard(key)
+        size = self.sizeof(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return # would never fit
+        if self.max_entries is not None and self.max_entries <= 0:
+            return
+        self._data[key] = (value, size)
+        self.nbytes += size
+        self._evict()
+        
+    def get_or_compute(self, key, func, *args):
+        """
+        Returns the cached value for key.
+        If not found, the value is computed as func(*args)
+        and added to the cache.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args)
+            self.put(key, value)
+        return value
+        
+    def discard(self, key):
+        "Removes the entry for key (if present)."
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+            
+    def keys(self):
+        "Returns a list of the cached keys (least recently used first)."
+        return list(self._data.keys())
+        
+    def invalidate(self, namespace, words):
+        """
+        Removes the entries for the words (a set of words in lower case,
+        or None for all words) and for the words containing one of them,
+        see invalidate_cache.
+        """
+        return _invalidate_keys(self, namespace, words)
+        
+    def clear(self):
+        "Removes all entries and resets the statistics."
+        self._data = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+    def stats(self):
+        "Returns the statistics as a dict."
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+                "bytes": self.nbytes,
+               }
+        
+    def _evict(self):
+        data = self._data
+        max_entries, max_bytes = self.max_entries, self.max_bytes
+        while data and ((max_entries is not None and len(data) > max_entries)
+                        or (max_bytes is not None and self.nbytes > max_bytes)):
+            key, (value, size) = data.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+# marker for "not found in cache" (None is a valid cached result)
+_MISSING = object()
+
 class Cached(Hyphenator):
     """
     This caches the results of the hyphenate function.
     Use it if the hyphenation is too slow.
     """
     
-    def __init__(self, hyphenator, max_entries):
+    def __init__(self, hyphenator, max_entries=None, max_bytes=None, cache=None, namespace=None, compact=False):
         """
         Creates a new, cached version of hyphenator
         that caches at most max_entries of the results
         from hyphenator.hyphenate.
+        If max_bytes is given, the (estimated) memory used
+        by the cache is limited to max_bytes, too.
+        When the cache is full, the least recently used
+        entries are evicted.
+        
+        Instead of the private LRUCache, another cache backend
+        can be given, for example a wordaxe.hyphcache.SharedCache
+        which can be used by several Cached instances and threads.
+        In this case, the entries are keyed by (namespace, word),
+        where namespace defaults to hyphenator.cache_namespace().
+        
+        If compact is true, the cached words use CompactHyphenations
+        (see HyphenatedWord.compact) to save memory.
+        
+        If the hyphenator can reload its dictionaries
+        (see ExplicitHyphenator.reload_entries), the cached
+        results for the changed words are invalidated.
+        
         If you need other functionality of the hyphenator,
         you have to access the attribute "hyphenator"
         directly.
         """
-        self._max_entries = max_entries
         assert isinstance(hyphenator, Hyphenator)
         self.hyphenator = hyphenator
-        self.cache = dict()
+        if cache is None:
+            cache = LRUCache(max_entries, max_bytes)
+        elif namespace is None:
+            namespace = hyphenator.cache_namespace()
+        self.cache = cache
+        self.namespace = namespace
+        if compact:
+            self._compute = self._hyphenate_compact
+            self._compute_many = self._hyphenate_many_compact
+        else:
+            self._compute = hyphenator.hyphenate
+            self._compute_many = hyphenator.hyphenate_many
+        add_reload_listener = getattr(hyphenator, "add_reload_listener", None)
+        if add_reload_listener is not None:
+            add_reload_listener(self)
+        
+    def _key(self, aWord):
+        if self.namespace is None:
+            return aWord
+        return (self.namespace, aWord)
         
     def hyphenate(self, aWord):
         """
@@ -351,15 +746,67 @@ class Cached(Hyphenator):
         If not found there, call the internal hyphenator
         and add to the cache (like a lazy setdefault).
         """
+        return self.cache.get_or_compute(self._key(aWord), self._compute, aWord)
+
+    def hyphenate_many(self, words):
+        """
+        Get the hyphenated words from the cache.
+        The words not found there are hyphenated with
+        a single call to hyphenator.hyphenate_many.
+        """
+        words = list(words)
         cache = self.cache
-        if aWord not in cache:
-            if len(cache) >= self._max_entries:
-                self.cache = dict()
-            self.cache[aWord] = self.hyphenator.hyphenate(aWord)
-        return self.cache[aWord]
+        results = {}
+        missing = []
+        for w in OrderedDict.fromkeys(words):
+            hword = cache.get(self._key(w), _MISSING)
+            if hword is _MISSING:
+                missing.append(w)
+            else:
+                results[w] = hword
+        if missing:
+            for w, hword in zip(missing, self._compute_many(missing)):
+                cache.put(self._key(w), hword)
+                results[w] = hword
+        return [results[w] for w in words]
+
+    def _hyphenate_compact(self, aWord):
+        hword = self.hyphenator.hyphenate(aWord)
+        if hword is not None:
+            hword.compact()
+        return hword
+
+    def _hyphenate_many_compact(self, words):
+        hwords = self.hyphenator.hyphenate_many(words)
+        for hword in hwords:
+            if hword is not None:
+                hword.compact()
+        return hwords
+
+    def invalidate(self, words):
+        """
+        Removes the cached results for the words (in lower case)
+        and for all cached words containing one of them
+        (like compounds or hyphenated words).
+        Returns the number of removed entries.
+        """
+        return invalidate_cache(self.cache, self.namespace, words)
 
     def purge_cache(self):
         """
         Purges the cache (freeing resources).
+        If the cache backend is shared, only the entries
+        of this wrapper's namespace are removed
+        (call cache.clear() to remove all entries).
+        """
+        if self.namespace is None:
+            self.cache.clear()
+        else:
+            invalidate_cache(self.cache, self.namespace, None)
+        
+    def stats(self):
+        """
+        Returns the cache statistics as a dict with the keys
+        hits, misses, evictions, entries and bytes.
         """
-        self.cache = dict()
+        return self.cache.stats()
@@ -32,10 +32,22 @@ def decodeTrennung(t):
             p += 1
     return W
 
+# The bits for the simple rules, see RuleList.
+NEED_PREFIX_BIT = 1
+NO_PREFIX_BIT   = 2
+ONLY_FIRST_BIT  = 4
+NEED_SUFFIX_BIT = 8
+NO_SUFFIX_BIT   = 16
+ONLY_LAST_BIT   = 32
+
 class HyphRule(object):
     """Definition of a rule for hyphenation.
     """
     name = "generic hyphenation rule - do not use directly"
+
+    # For simple rules, which only depend on the kind of the pieces,
+    # the bit used in RuleList.mask (0 for all other rules).
+    bit = 0
     
     # When to check this rule (in chronological order):
     PRE_PIECE       = 0 # before adding this piece to the WordFrag
@@ -72,6 +84,7 @@ class NEED_PREFIX(HyphRule):
             self.allowedPrefixes = " "+args+" "
         else:
             self.allowedPrefixes = None
+            self.bit = NEED_PREFIX_BIT
 
     def check(self,wfrag,when,nextPiece=None):
         if when==HyphRule.PRE_PIECE:
@@ -91,6 +104,7 @@ class NO_PREFIX(HyphRule):
        (if args is given, args must not contain any of the wordfrag's prefixes).
     """
     name = "NO_PREFIX"
+    bit = NO_PREFIX_BIT
 
     def __init__(self,args=""):
         HyphRule.__init__(self,[HyphRule.PRE_PIECE])
@@ -111,6 +125,7 @@ class NEED_SUFFIX(HyphRule):
     """The given wordfrag needs a suffix.
     """
     name = "NEED_SUFFIX"
+    bit = NEED_SUFFIX_BIT
     
     def __init__(self,args=""):
         HyphRule.__init__(self,[HyphRule.PRE_NEXT_PIECE])
@@ -127,6 +142,7 @@ class NO_SUFFIX(HyphRule):
     """The given wordfrag must not have any suffix.
     """
     name = "NO_SUFFIX"
+    bit = NO_SUFFIX_BIT
     
     def __init__(self,args=""):
         HyphRule.__init__(self,[HyphRule.PRE_NEXT_PIECE])
@@ -156,10 +172,11 @@ class ForeignWordRule(HyphRule):
                     log.debug("Attribut %s gesetzt bei Objekt %s %s", self.name, wfrag.__class__, id(wfrag))
                 return True
             else:               # called for a suffix
-                log.debug("PRE_PIECE called for a suffix")
-                log.debug("self.name=%s", self.name)
-                log.debug("wfrag.id=%s, wfrag.dir=%s", id(wfrag), dir(wfrag))
-                return hasattr(wfrag,self.name)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("PRE_PIECE called for a suffix")
+                    log.debug("self.name=%s", self.name)
+                    log.debug("wfrag.id=%s, wfrag.dir=%s", id(wfrag), dir(wfrag))
+                return getattr(wfrag,self.name,False)
         elif when==HyphRule.PRE_NEXT_PIECE:
             if isinstance(nextPiece,Root):    # called for the last prefix
                 for prop in nextPiece.props:           # return True iff the root is a FREMDWORT
@@ -195,6 +212,7 @@ class ONLY_FIRST(HyphRule):
     """This prefix (resp. suffix) must be the first prefix (resp. suffix).
     """
     name = "ONLY_FIRST"
+    bit = ONLY_FIRST_BIT
     
     def __init__(self,args=""):
         HyphRule.__init__(self,[HyphRule.PRE_PIECE])
@@ -213,6 +231,7 @@ class ONLY_LAST(HyphRule):
     """This prefix (resp. suffix) must be the last prefix (resp. suffix).
     """
     name = "ONLY_LAST"
+    bit = ONLY_LAST_BIT
 
     def __init__(self,args=""):
         HyphRule.__init__(self,[HyphRule.PRE_NEXT_PIECE])
@@ -287,7 +306,7 @@ class NOT_LAST_WORD(HyphRule):
                 setattr(wfrag[-1],self.name,True)
             return True
         elif when==HyphRule.AT_END:
-            return hasattr(wfrag[-1],self.name)
+            return getattr(wfrag[-1],self.name,False)
         raise AlgorithmError(when)
 
 class SINGLE_WORD(HyphRule):
@@ -433,6 +452,54 @@ RULES = dict([(r.name,r) for r in rulelist])
 def NO_CHECKS(siz=6):
     return [list() for x in range(siz)]
 
+class RuleList(list):
+    """A list of HyphRules to check at the same time.
+       If all of them are simple rules, mask is the sum of their bits,
+       so that they can be checked with check_mask; otherwise None.
+    """
+    __slots__ = ["mask"]
+    def __init__(self,rules=()):
+        list.__init__(self,rules)
+        self.update_mask()
+
+    def update_mask(self):
+        "Computes mask (call this after modifying the list)."
+        mask = 0
+        for rule in self:
+            if not rule.bit:
+                mask = None
+                break
+            mask |= rule.bit
+        self.mask = mask
+
+def check_mask(mask,when,wfrag,nextPiece):
+    """Checks the simple rules given by mask, like HyphRule.check.
+       Returns None if the rules have to be called after all
+       (because they would raise an exception).
+    """
+    if when==HyphRule.PRE_PIECE:
+        if mask & ONLY_FIRST_BIT:
+            if isinstance(nextPiece,Prefix):
+                if wfrag.prefix:
+                    return False
+            elif isinstance(nextPiece,Suffix):
+                if wfrag.suffix:
+                    return False
+            else:
+                return None
+        if mask & NEED_PREFIX_BIT and not wfrag.prefix:
+            return False
+        if mask & NO_PREFIX_BIT and wfrag.prefix:
+            return False
+        return True
+    elif when==HyphRule.PRE_NEXT_PIECE:
+        if isinstance(nextPiece,Suffix):
+            return not (mask & (NO_SUFFIX_BIT | ONLY_LAST_BIT))
+        if mask & (NEED_SUFFIX_BIT | NO_SUFFIX_BIT):
+            return None
+        return not (mask & ONLY_LAST_BIT and isinstance(nextPiece,Prefix))
+    return None
+
 class StringWithProps(object):
     """A string with properties."""
     __slots__ = ["strval", "props"]
@@ -444,14 +511,16 @@ class StringWithProps(object):
         return self.strval
         
     def getChecks(self):
-        """return a 6-element list, where each element is a list of HyphRules:
+        """return a 6-element list, where each element is a RuleList:
            [PRE_PIECE checks, PRE_ROOT checks, PRE_NEXT_PIECE checks,
             PRE_WORD checks, PRE_NEXT_WORD checks, AT_END checks].
         """
-        chks=NO_CHECKS()
+        chks=[RuleList() for x in range(6)]
         for p in self.props:
             for w in p.when:
                 chks[w].append(p)
+        for rules in chks:
+            rules.update_mask()
         return chks
 
 class Prefix(StringWithProps):
@@ -0,0 +1,361 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Liang's hyphenation patterns (as used by TeX and libhnj),
+stored in a trie.
+
+A pattern like "a1b" means: between "a" and "b", the priority is 1.
+For each position in a word, the highest priority of all patterns
+matching there counts; odd priorities allow a hyphenation.
+
+Usage:
+
+characters, patterns = read_patterns("hyph_en_US.dic")
+trie = PatternTrie(patterns)
+priorities = trie.priorities(u".hyphenation.")
+
+For a pattern file, compiled_patterns returns a CompiledPatterns
+instead, which is compiled once into a binary file (a double-array
+trie) and then opened with mmap, so that all processes
+share the same copy of the patterns:
+
+patterns = compiled_patterns("hyph_en_US.dic")
+priorities = patterns.priorities(u".hyphenation.")
+
+The compiled files are stored in the directory __patterncache__
+next to the pattern file (or in a directory of the current user
+in the temp directory if that is not writable, see wordaxe.cachedir),
+named by the md5 hash of the pattern file.
+'''
+
+import os
+import sys
+import mmap
+import array
+import codecs
+import struct
+from hashlib import md5
+
+from wordaxe.cachedir import cache_dirs
+
+# key of the priorities in a trie node (never a letter)
+_VALUES = u""
+
+
+def parse_pattern(pattern):
+    """
+    Splits a pattern like u"a1b" into the letters (u"ab")
+    and the priorities as a tuple of len(letters)+1 integers
+    (the priority before each letter and at the end).
+    """
+    letters = []
+    priorities = []
+    priority = 0
+    for ch in pattern:
+        if u"0" <= ch <= u"9":
+            priority = ord(ch) - 48
+        else:
+            letters.append(ch)
+            priorities.append(priority)
+            priority = 0
+    priorities.append(priority)
+    return u"".join(letters), tuple(priorities)
+
+
+def read_patterns(fname):
+    """
+    Reads a hyph_*.dic file.
+    The first line is the set of characters or the encoding
+    of the file (iso-8859-1 if it is not a known encoding),
+    all other lines are patterns.
+    Returns the first line and the list of patterns.
+    """
+    with open(fname, "rb") as f:
+        lines = f.read().splitlines()
+    encoding = lines[0].strip().decode("iso-8859-1")
+    try:
+        codecs.lookup(encoding)
+    except LookupError:
+        encoding = "iso-8859-1"
+    lines = [line.decode(encoding) for line in lines]
+    return lines[0], [line.strip() for line in lines[1:] if line.strip()]
+
+
+class PatternTrie(object):
+    """
+    A trie of hyphenation patterns.
+
+    Each node is a dict mapping a letter to the next node;
+    the priorities of a pattern ending at a node are stored
+    as a tuple of (position, priority) pairs for the
+    non-zero priorities.
+    """
+
+    def __init__(self, patterns=()):
+        "patterns is an iterable of patterns like u\"a1b\"."
+        self.root = {}
+        self.max_length = 0
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern):
+        "Adds a pattern (replacing an existing one with the same letters)."
+        self.insert(*parse_pattern(pattern))
+
+    def insert(self, letters, priorities):
+        "Adds a pattern already split with parse_pattern."
+        node = self.root
+        for ch in letters:
+            node = node.setdefault(ch, {})
+        node[_VALUES] = tuple([(pos, prio) for pos, prio in enumerate(priorities) if prio])
+        self.max_length = max(self.max_length, len(letters))
+
+    def priorities(self, word):
+        """
+        Returns a list of len(word)+1 integers: the highest priority
+        of all patterns matching at each position of word
+        (before each letter and at the end).
+        The word has to be in lower case, with "." marking
+        the start and end of the word.
+        """
+        prios = [0] * (len(word) + 1)
+        root = self.root
+        max_length = self.max_length
+        for start in range(len(word)):
+            node = root
+            for ch in word[start:start+max_length]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                values = node.get(_VALUES)
+                if values:
+                    for pos, prio in values:
+                        if prio > prios[start+pos]:
+                            prios[start+pos] = prio
+        return prios
+
+
+# File format of the compiled patterns (all numbers are native int32):
+# header   "WXPT", format version, number of states, number of values,
+#          max. pattern length, length of the alphabet and of the
+#          first line of the pattern file (UTF-8, in bytes)
+# arrays   base, check and values (an index into packed) of the states,
+#          packed: for each state with priorities, their count
+#          followed by position * 16 + priority for each of them
+# strings  the alphabet (the letter for code 1, 2, ...) and
+#          the first line of the pattern file, UTF-8
+MAGIC = b"WXPT"
+FORMAT = 1
+_HEADER = struct.Struct("=4siiiiii")
+
+
+def _next_free(check, start):
+    "Returns the first free slot (check == -1) at or after start."
+    try:
+        return check.index(-1, start)
+    except ValueError:
+        return max(start, len(check))
+
+
+def _double_array(trie, codes):
+    """
+    Converts the trie into the arrays base, check, values and packed.
+    Each state s has the transitions t = base[s] + code(letter)
+    with check[t] == s; the root is state 0.
+    The arrays are padded, so that t is always a valid index.
+    """
+    base, check, values, packed = [0], [-1], [0], [0]
+    first_free = 1
+    stack = [(trie.root, 0)]
+    while stack:
+        node, state = stack.pop()
+        prios = node.get(_VALUES)
+        if prios:
+            values[state] = len(packed)
+            packed.append(len(prios))
+            packed.extend([pos * 16 + prio for pos, prio in prios])
+        labels = sorted([(codes[ch], child) for ch, child in node.items() if ch != _VALUES])
+        if not labels:
+            continue
+        first_free = _next_free(check, first_free)
+        # Try the free slots for the first label, until
+        # the slots for the other labels are free, too.
+        slot = first_free
+        while True:
+            b = slot - labels[0][0]
+            if b >= 1:
+                for code, child in labels[1:]:
+                    if b + code < len(check) and check[b + code] != -1:
+                        break
+                else:
+                    break
+            slot = _next_free(check, slot + 1)
+        size = b + labels[-1][0] + 1
+        if size > len(check):
+            grow = size - len(check)
+            base.extend([0] * grow)
+            check.extend([-1] * grow)
+            values.extend([0] * grow)
+        base[state] = b
+        for code, child in labels:
+            check[b + code] = state
+            stack.append((child, b + code))
+    grow = max(base) + len(codes) + 1 - len(check)
+    if grow > 0:
+        base.extend([0] * grow)
+        check.extend([-1] * grow)
+        values.extend([0] * grow)
+    return base, check, values, packed
+
+
+def save_compiled(trie, filename, characters=u""):
+    """
+    Writes the trie as a compiled file (see CompiledPatterns).
+    characters is the first line of the pattern file.
+    The file is replaced atomically.
+    """
+    letters = set()
+    stack = [trie.root]
+    while stack:
+        node = stack.pop()
+        for ch, child in node.items():
+            if ch != _VALUES:
+                letters.add(ch)
+                stack.append(child)
+    alphabet = u"".join(sorted(letters))
+    codes = dict([(ch, code + 1) for code, ch in enumerate(alphabet)])
+    base, check, values, packed = _double_array(trie, codes)
+    alphabet = alphabet.encode("utf-8")
+    characters = characters.encode("utf-8")
+    tmpname = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmpname, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT, len(base), len(packed), trie.max_length,
+                             len(alphabet), len(characters)))
+        for L in [base, check, values, packed]:
+            a = array.array("i", L)
+            f.write(a.tostring() if sys.version < '3' else a.tobytes())
+        f.write(alphabet)
+        f.write(characters)
+    getattr(os, "replace", os.rename)(tmpname, filename)
+
+
+class CompiledPatterns(object):
+    """
+    Hyphenation patterns in a compiled file (a double-array trie),
+    opened with mmap. It can be used like a PatternTrie.
+
+    Instances can be pickled; the file is opened again on unpickling.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < _HEADER.size:
+            raise ValueError("%s: not a compiled pattern file" % filename)
+        magic, fmt, nstates, npacked, self.max_length, nalphabet, ncharacters = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError("%s: not a compiled pattern file (format %d)" % (filename, fmt))
+        counts = [nstates, npacked, self.max_length, nalphabet, ncharacters]
+        if min(counts) < 0 or nstates < 1 or \
+           len(mm) != _HEADER.size + 4 * (3 * nstates + npacked) + nalphabet + ncharacters:
+            raise ValueError("%s: truncated or invalid compiled pattern file" % filename)
+        offset = _HEADER.size
+        arrays = []
+        for n in [nstates, nstates, nstates, npacked]:
+            if sys.version < '3':
+                # no memoryview.cast, so the arrays are copied
+                a = array.array("i")
+                a.fromstring(mm[offset:offset+4*n])
+            else:
+                a = memoryview(mm)[offset:offset+4*n].cast("i")
+            arrays.append(a)
+            offset += 4 * n
+        self._base, self._check, self._values, self._packed = arrays
+        alphabet = mm[offset:offset+nalphabet].decode("utf-8")
+        offset += nalphabet
+        self.characters = mm[offset:offset+ncharacters].decode("utf-8")
+        self._codes = dict([(ch, code + 1) for code, ch in enumerate(alphabet)])
+        self._mm = mm
+
+    def __reduce__(self):
+        return (CompiledPatterns, (self.filename,))
+
+    def priorities(self, word):
+        "See PatternTrie.priorities."
+        n = len(word)
+        prios = [0] * (n + 1)
+        get = self._codes.get
+        codes = [get(ch, 0) for ch in word]
+        base, check, values, packed = self._base, self._check, self._values, self._packed
+        max_length = self.max_length
+        for start in range(n):
+            state = 0
+            for code in codes[start:start+max_length]:
+                if not code:
+                    break
+                t = base[state] + code
+                if check[t] != state:
+                    break
+                state = t
+                v = values[state]
+                if v:
+                    for k in range(v + 1, v + 1 + packed[v]):
+                        x = packed[k]
+                        pos = start + (x >> 4)
+                        if x & 15 > prios[pos]:
+                            prios[pos] = x & 15
+        return prios
+
+
+def patterns_version(fname):
+    "Returns a hash value of the pattern file fname."
+    with open(fname, "rb") as f:
+        return md5(f.read()).hexdigest()
+
+
+def compiled_patterns(fname, min_letters=1, cache_dir=None, version=None):
+    """
+    Returns a CompiledPatterns for the pattern file fname,
+    compiling it if that has not been done before.
+    Patterns with fewer than min_letters letters are left out.
+    If cache_dir is given, the compiled file is stored there.
+    version is the patterns_version of fname (computed if None).
+    """
+    if version is None:
+        version = patterns_version(fname)
+    name = "%s-%d-%d-%s.wxp" % (version, min_letters, FORMAT, sys.byteorder)
+    dirs = cache_dir and [cache_dir] or cache_dirs(fname, "patterncache")
+    for d in dirs:
+        path = os.path.join(d, name)
+        if os.path.exists(path):
+            try:
+                return CompiledPatterns(path)
+            except (ValueError, EnvironmentError):
+                pass # e.g. a truncated file, compile it again
+    characters, patterns = read_patterns(fname)
+    trie = PatternTrie()
+    for letters, priorities in [parse_pattern(pattern) for pattern in patterns]:
+        if len(letters) >= min_letters:
+            trie.insert(letters, priorities)
+    for d in dirs:
+        path = os.path.join(d, name)
+        if not os.path.isdir(d):
+            try:
+                os.makedirs(d)
+            except EnvironmentError:
+                pass # created by another process, or not writable
+        try:
+            save_compiled(trie, path, characters)
+        except EnvironmentError:
+            continue # not writable, try the next directory
+        return CompiledPatterns(path)
+    raise EnvironmentError("Cannot write the compiled patterns for %s" % fname)
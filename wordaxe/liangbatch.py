@@ -0,0 +1,150 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Liang's algorithm for many words at once, using NumPy.
+
+The words are encoded into a padded integer array, and the
+double-array trie of the patterns (see wordaxe.liang) is walked
+for all words and start positions at the same time;
+the priorities are combined with NumPy max-reductions.
+
+This module requires NumPy. PyHnjHyphenator uses it
+automatically for hyphenate_many if NumPy is installed.
+
+Usage:
+
+matcher = batch_matcher(PatternTrie(patterns))
+for positions in matcher.odd_positions([u".hyphenation", u".pattern"]):
+    ...
+'''
+
+import weakref
+
+import numpy as np
+
+from wordaxe.liang import CompiledPatterns, _double_array
+
+
+class BatchMatcher(object):
+    """
+    Computes the priorities of a PatternTrie or CompiledPatterns
+    for many words at once.
+    """
+
+    # the number of words processed at once
+    chunk_size = 2048
+
+    def __init__(self, trie):
+        if isinstance(trie, CompiledPatterns):
+            base, check, values, packed = [np.frombuffer(a, dtype=np.int32) for a in
+                                           (trie._base, trie._check, trie._values, trie._packed)]
+            codes = trie._codes
+        else:
+            letters = set()
+            stack = [trie.root]
+            while stack:
+                node = stack.pop()
+                for ch, child in node.items():
+                    if ch:
+                        letters.add(ch)
+                        stack.append(child)
+            codes = dict([(ch, code + 1) for code, ch in enumerate(sorted(letters))])
+            base, check, values, packed = [np.array(a, dtype=np.int32)
+                                           for a in _double_array(trie, codes)]
+        self.max_length = trie.max_length
+        self._base = base
+        self._check = check
+        # the priorities of each state, as a dense array
+        prios = np.zeros((len(values), self.max_length + 1), dtype=np.int8)
+        for state in np.nonzero(values)[0]:
+            v = values[state]
+            for x in packed[v+1:v+1+packed[v]]:
+                prios[state, x >> 4] = x & 15
+        self._prios = prios
+        # code point -> letter code
+        lut = np.zeros(max([ord(ch) for ch in codes] + [0]) + 1, dtype=np.int32)
+        for ch, code in codes.items():
+            lut[ord(ch)] = code
+        self._lut = lut
+
+    def _encode(self, words, width):
+        "Returns the letter codes of the words as an array, padded with 0."
+        text = u"".join([w.ljust(width, u"\0") for w in words])
+        points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        lut = self._lut
+        codes = np.where(points < len(lut), lut[np.minimum(points, len(lut) - 1)], 0)
+        return codes.reshape(len(words), width)
+
+    def priorities(self, words):
+        """
+        Returns an array with a row of priorities for each word
+        (like PatternTrie.priorities, padded with 0 to the same length).
+        The words have to be in lower case.
+        """
+        width = max([len(w) for w in words] + [1])
+        codes = self._encode(words, width)
+        n = len(words)
+        max_length = self.max_length
+        base, check, state_prios = self._base, self._check, self._prios
+        # the state for each word and start position
+        states = np.zeros((n, width), dtype=np.int32)
+        alive = np.ones((n, width), dtype=bool)
+        prios = np.zeros((n, width + max_length + 1), dtype=np.int8)
+        padded = np.concatenate([codes, np.zeros((n, max_length), dtype=codes.dtype)], axis=1)
+        for k in range(max_length):
+            letters = padded[:, k:k+width]
+            targets = base[states] + letters
+            alive &= (letters != 0) & (check[targets] == states)
+            if not alive.any():
+                break
+            states = np.where(alive, targets, 0)
+            values = state_prios[states]
+            for pos in range(k + 2):
+                window = prios[:, pos:pos+width]
+                np.maximum(window, values[:, :, pos], out=window)
+        return prios[:, :width+1]
+
+    def odd_positions(self, words):
+        """
+        For each word, returns the list of the positions i
+        (1 < i < len(word)-1) with an odd priority, like
+        PyHnjHyphenator.zerlegeWort for u"." + word.lower().
+        The words have to be in lower case and start with ".".
+        """
+        result = [None] * len(words)
+        order = sorted(range(len(words)), key=lambda i: len(words[i]))
+        for start in range(0, len(order), self.chunk_size):
+            chunk = order[start:start+self.chunk_size]
+            chunk_words = [words[i] for i in chunk]
+            prios = self.priorities(chunk_words)
+            lengths = np.array([len(w) for w in chunk_words])
+            columns = np.arange(prios.shape[1])
+            # Only the positions 3 .. len(word)-2 can be hyphenated.
+            mask = (prios & 1).astype(bool) & (columns >= 3) & (columns[None, :] < lengths[:, None] - 1)
+            rows, cols = np.nonzero(mask)
+            counts = np.bincount(rows, minlength=len(chunk)).tolist()
+            cols = (cols - 1).tolist()
+            offset = 0
+            for i, count in zip(chunk, counts):
+                result[i] = cols[offset:offset+count]
+                offset += count
+        return result
+
+
+# trie -> BatchMatcher
+_MATCHERS = weakref.WeakKeyDictionary()
+
+def batch_matcher(trie):
+    "Returns the (shared) BatchMatcher for trie."
+    matcher = _MATCHERS.get(trie)
+    if matcher is None:
+        matcher = _MATCHERS[trie] = BatchMatcher(trie)
+    return matcher
@@ -0,0 +1,224 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Counters and timing for hyphenators.
+
+Usage:
+
+hyphenator = Instrumented(DCWHyphenator("DE",5), sample_every=100)
+...
+print(hyphenator.metrics.snapshot())
+
+The counters (calls, words, unknown words, hyphenation points)
+are always updated. The latency is only measured for every
+sample_every-th call, so that the instrumentation is cheap enough
+to leave it switched on in production.
+
+To export the data to another metrics system, pass a callback;
+it is called as callback(instrumented, words, hwords, seconds)
+for each measured call.
+'''
+
+import threading
+from bisect import bisect_left
+from timeit import default_timer as timer
+
+from wordaxe.hyphen import Hyphenator
+
+
+# Upper bounds (in seconds) of the latency histogram buckets.
+LATENCY_BOUNDS = (1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 2e-3, 5e-3,
+                  1e-2, 2e-2, 5e-2, 0.1, 0.2, 0.5, 1.0)
+
+
+class LatencyHistogram(object):
+    """
+    A histogram of latencies with fixed buckets.
+    The last bucket counts the values above the last bound.
+    """
+
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds, n=1):
+        "Adds n observations of seconds."
+        self.counts[bisect_left(self.bounds, seconds)] += n
+        self.count += n
+        self.total += seconds * n
+
+    def percentile(self, p):
+        """
+        Returns an upper bound for the p-th percentile (0 < p <= 100),
+        that is the bound of the bucket containing it,
+        or None if there are no observations
+        (or the percentile is above the last bound).
+        """
+        if not self.count:
+            return None
+        rank = self.count * p / 100.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        return {"bounds": list(self.bounds),
+                "counts": list(self.counts),
+                "count": self.count,
+                "mean": self.count and self.total / self.count or 0.0,
+                "p50": self.percentile(50),
+                "p90": self.percentile(90),
+                "p99": self.percentile(99),
+               }
+
+
+class HyphenatorMetrics(object):
+    """
+    The counters of an Instrumented hyphenator.
+    All updates are protected by a lock.
+    """
+
+    def __init__(self, bounds=LATENCY_BOUNDS):
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram(bounds)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.words = 0
+            self.unknown = 0
+            self.points = 0
+            self.latency.reset()
+
+    def record(self, hwords, seconds=None):
+        """
+        Records one call that returned the list hwords.
+        If seconds is given, the latency per word is recorded, too.
+        """
+        unknown = points = 0
+        for hword in hwords:
+            if hword is None:
+                unknown += 1
+            else:
+                points += len(hword.hyphenations)
+        with self._lock:
+            self.calls += 1
+            self.words += len(hwords)
+            self.unknown += unknown
+            self.points += points
+            if seconds is not None and hwords:
+                self.latency.observe(seconds / len(hwords), len(hwords))
+
+    def snapshot(self):
+        """
+        Returns the current values as a dict with the keys
+        calls, words, unknown, points, points_per_word
+        (the average over the known words) and latency
+        (see LatencyHistogram.as_dict).
+        """
+        with self._lock:
+            known = self.words - self.unknown
+            return {"calls": self.calls,
+                    "words": self.words,
+                    "unknown": self.unknown,
+                    "points": self.points,
+                    "points_per_word": known and float(self.points) / known or 0.0,
+                    "latency": self.latency.as_dict(),
+                   }
+
+
+class Instrumented(Hyphenator):
+    """
+    Collects counters and latencies for the calls to a hyphenator
+    (see the module documentation).
+
+    If you need other functionality of the hyphenator,
+    you have to access the attribute "hyphenator" directly.
+    """
+
+    def __init__(self, hyphenator, sample_every=1, callback=None, metrics=None):
+        """
+        Creates an instrumented version of hyphenator.
+        The latency is measured for every sample_every-th call
+        (0 means never).
+        Several Instrumented instances can share the same metrics.
+        """
+        assert isinstance(hyphenator, Hyphenator)
+        assert sample_every >= 0
+        self.hyphenator = hyphenator
+        self.sample_every = sample_every
+        self.callback = callback
+        if metrics is None:
+            metrics = HyphenatorMetrics()
+        self.metrics = metrics
+        self._countdown = 1
+
+    def dictionary_version(self):
+        return self.hyphenator.dictionary_version()
+
+    def cache_namespace(self):
+        return self.hyphenator.cache_namespace()
+
+    def _sample(self):
+        "Returns True if the current call should be measured."
+        if not self.sample_every:
+            return False
+        self._countdown -= 1
+        if self._countdown > 0:
+            return False
+        self._countdown = self.sample_every
+        return True
+
+    def _call(self, func, words):
+        if not self._sample():
+            hwords = func(words)
+            self.metrics.record(hwords)
+            return hwords
+        start = timer()
+        hwords = func(words)
+        seconds = timer() - start
+        self.metrics.record(hwords, seconds)
+        if self.callback is not None:
+            self.callback(self, words, hwords, seconds)
+        return hwords
+
+    def _hyphenate_one(self, words):
+        return [self.hyphenator.hyphenate(words[0])]
+
+    def hyphenate(self, aWord):
+        return self._call(self._hyphenate_one, [aWord])[0]
+
+    def hyphenate_many(self, words):
+        return self._call(self.hyphenator.hyphenate_many, list(words))
+
+    def stats(self):
+        """
+        Returns the metrics (see HyphenatorMetrics.snapshot).
+        For a DCWHyphenator, the number of states examined is added,
+        for hyphenators with a subword cache its statistics.
+        """
+        stats = self.metrics.snapshot()
+        numStatesExamined = getattr(self.hyphenator, "numStatesExamined", None)
+        if numStatesExamined is not None:
+            stats["states_examined"] = numStatesExamined
+        subword_cache = getattr(self.hyphenator, "subword_cache", None)
+        if subword_cache is not None:
+            stats["subword_cache"] = subword_cache.stats()
+        return stats
@@ -0,0 +1,184 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+A registry of hyphenators that builds them on demand.
+
+Building a hyphenator can be expensive (DCWHyphenator parses
+the whole DEhyph dictionary, PyHnjHyphenator loads a pattern file).
+Instead of a hyphenator, a factory can be registered for a language;
+the hyphenator is built on the first lookup and then shared
+by all users (e.g. all paragraphs).
+
+Usage:
+
+wordaxe.hyphRegistry.register("DE", DCWHyphenator, "DE", 5)
+wordaxe.hyphRegistry.register("EN", PyHnjHyphenator, "en_US", 4)
+
+The old way (registering an instance) still works:
+
+wordaxe.hyphRegistry["DE"] = DCWHyphenator("DE", 5)
+'''
+
+import threading
+from functools import partial
+from timeit import default_timer as timer
+
+
+class _Entry(object):
+    "A registered language."
+    __slots__ = ["factory", "args", "kwargs", "hyphenator", "last_used"]
+    def __init__(self, factory, args, kwargs, hyphenator=None):
+        self.factory = factory
+        self.args = args
+        self.kwargs = kwargs
+        self.hyphenator = hyphenator
+        self.last_used = timer()
+
+
+class HyphenatorRegistry(object):
+    """
+    Maps a language to a hyphenator.
+
+    It can be used like a dict of hyphenators, but with register()
+    a factory can be registered instead, which is called
+    (with the given arguments) on the first lookup of the language.
+
+    If max_idle (seconds) is given, hyphenators built by a factory
+    are unloaded when they have not been used for that time;
+    they are built again when they are needed.
+    Use unload_idle() to do that explicitly.
+    """
+
+    def __init__(self, max_idle=None):
+        self.max_idle = max_idle
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._next_sweep = None
+
+    def register(self, language, factory, *args, **kwargs):
+        """
+        Registers factory for language.
+        The hyphenator is created as factory(*args, **kwargs)
+        when it is needed for the first time.
+        """
+        with self._lock:
+            self._entries[language] = _Entry(factory, args, kwargs)
+
+    def __setitem__(self, language, hyphenator):
+        "Registers an already built hyphenator (it is never unloaded)."
+        with self._lock:
+            self._entries[language] = _Entry(None, None, None, hyphenator)
+
+    def __getitem__(self, language):
+        "Returns the hyphenator for language, building it if necessary."
+        entry = self._entries[language]
+        now = timer()
+        entry.last_used = now
+        hyphenator = entry.hyphenator
+        if hyphenator is None:
+            with self._lock:
+                hyphenator = entry.hyphenator
+                if hyphenator is None:
+                    hyphenator = entry.factory(*entry.args, **entry.kwargs)
+                    entry.hyphenator = hyphenator
+        if self.max_idle is not None:
+            if self._next_sweep is None:
+                self._next_sweep = now + self.max_idle
+            elif now >= self._next_sweep:
+                self._next_sweep = now + self.max_idle
+                self.unload_idle(self.max_idle)
+        return hyphenator
+
+    def get(self, language, default=None):
+        try:
+            return self[language]
+        except KeyError:
+            return default
+
+    def __delitem__(self, language):
+        with self._lock:
+            del self._entries[language]
+
+    def __contains__(self, language):
+        return language in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        return list(self._entries)
+
+    def pop(self, language, *default):
+        """
+        Removes language from the registry.
+        Returns the hyphenator if it was built, else None.
+        """
+        with self._lock:
+            entry = self._entries.pop(language, None)
+        if entry is None:
+            if default:
+                return default[0]
+            raise KeyError(language)
+        return entry.hyphenator
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def factory(self, language):
+        """
+        Returns a function that builds a new hyphenator for language
+        (or None if an instance was registered).
+        It can be pickled if the factory can be pickled.
+        """
+        entry = self._entries[language]
+        if entry.factory is None:
+            return None
+        return partial(entry.factory, *entry.args, **entry.kwargs)
+
+    def loaded(self):
+        "Returns the languages whose hyphenators are currently built."
+        return [language for language, entry in list(self._entries.items())
+                if entry.hyphenator is not None]
+
+    def unload(self, language):
+        """
+        Drops the hyphenator for language, if it was built by a factory.
+        Returns True if it was dropped.
+        """
+        with self._lock:
+            entry = self._entries[language]
+            if entry.factory is None or entry.hyphenator is None:
+                return False
+            entry.hyphenator = None
+            return True
+
+    def unload_idle(self, max_idle):
+        """
+        Drops the hyphenators built by a factory that have not
+        been used for max_idle seconds.
+        Returns the list of the unloaded languages.
+        """
+        limit = timer() - max_idle
+        unloaded = []
+        with self._lock:
+            for language, entry in self._entries.items():
+                if entry.factory is not None and entry.hyphenator is not None \
+                   and entry.last_used < limit:
+                    entry.hyphenator = None
+                    unloaded.append(language)
+        return unloaded
+
+    def __repr__(self):
+        return "HyphenatorRegistry(%r)" % sorted(self._entries)
@@ -1038,6 +1038,8 @@ class Paragraph(Flowable):
         assert isinstance(word, StyledWord)
         assert space_remaining <= word.width
         if getattr(self.style, 'hyphenation', False) and not hasattr(word, "nobr"):
+            # The registry builds the hyphenator on the first lookup
+            # and shares it between all paragraphs.
             hyphenator = wordaxe.hyphRegistry.get(self.style.language,None)
         else:
             # Hyphenation deactivated
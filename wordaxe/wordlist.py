@@ -0,0 +1,242 @@
+# -*- coding: iso-8859-1 -*-
+
+__license__="""
+   Copyright 2004-2008 Henning von Bargen (henning.vonbargen arcor.de)
+   This software is dual-licenced under the Apache 2.0 and the
+   2-clauses BSD license. For details, see license.txt
+"""
+
+__version__=''' $Id: __init__.py,v 1.2 2004/05/31 22:22:12 hvbargen Exp $ '''
+
+__doc__='''
+Regression tests of a hyphenator against lists of reference hyphenations.
+
+A word list contains one test case per line, the word and its
+expected hyphenation separated by whitespace:
+
+silbentrennung  sil-ben-tren-nung
+
+Lists in the format of ExplicitHyphenator.add_entries_from_file
+(e.g. "Bl�tenpracht Bl�ten8pracht") can be used with explicit=True.
+Empty lines and lines starting with "#" are ignored.
+
+Usage:
+
+report = check_word_list(DCWHyphenator("DE",5), ["test_wordlist.txt"],
+                         processes=4, diff_file="mismatches.txt")
+print(report.as_dict())
+
+or from the command line:
+
+python -m wordaxe.wordlist -p 4 -d mismatches.txt DCWHyphenator DE test_wordlist.txt
+'''
+
+import io
+import sys
+from timeit import default_timer as timer
+
+from wordaxe.hyphen import SHY
+
+
+def read_word_list(fname, encoding="utf-8", explicit=False):
+    """
+    Yields the (word, expected) tuples of a word list file.
+    expected is the word with "-" at the expected hyphenation points;
+    with explicit=True, the digits (and "~") in the file mark the points.
+    """
+    with io.open(fname, "r", encoding=encoding) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(u"#"):
+                continue
+            word, expected = line.split()
+            if explicit:
+                expected = u"".join([(ch in u"123456789~" and u"-" or ch) for ch in expected])
+            yield word, expected
+
+
+def hyphenated_form(word, hword):
+    """
+    Returns the word with "-" inserted at the hyphenation points of hword
+    (a HyphenatedWord or None), in the format of the word lists.
+    """
+    if hword is None or not hword.hyphenations:
+        return word # unknown word or no hyphenation points
+    x = word
+    ins = 0
+    for h in hword.hyphenations:
+        sl = h.sl.replace(SHY, u"-")
+        x = x[:ins+h.indx-h.nl]+sl+h.sr+x[ins+h.indx+h.nr:]
+        ins += len(sl) + len(h.sr) - h.nl - h.nr
+    return x
+
+
+def marked_points(word, hyphenated):
+    """
+    Returns the set of positions in word where hyphenated
+    contains an additional "-",
+    or None if hyphenated is not just word with "-" inserted
+    (e.g. with a spelling change like "bak-ken").
+    """
+    points = set()
+    i = 0
+    for ch in hyphenated:
+        if i < len(word) and ch == word[i]:
+            i += 1
+        elif ch == u"-":
+            points.add(i)
+        else:
+            return None
+    if i < len(word):
+        return None
+    return points
+
+
+class WordListReport(object):
+    """
+    The results of check_word_list.
+
+    words       - the number of test cases
+    correct     - the number of words hyphenated exactly as expected
+    tp, fp, fn  - the number of correct, unexpected and missing
+                  hyphenation points (counted for the words where
+                  the points can be compared by position)
+    seconds     - the time spent in the hyphenator
+    wall        - the elapsed (wall clock) time
+    mismatches  - a list of (word, expected, output) tuples
+    """
+
+    def __init__(self):
+        self.words = 0
+        self.correct = 0
+        self.tp = 0
+        self.fp = 0
+        self.fn = 0
+        self.seconds = 0.0
+        self.wall = 0.0
+        self.mismatches = []
+
+    def add(self, word, expected, output):
+        "Adds a test case."
+        self.words += 1
+        if output == expected:
+            self.correct += 1
+        else:
+            self.mismatches.append((word, expected, output))
+        expected_points = marked_points(word, expected)
+        output_points = marked_points(word, output)
+        if expected_points is not None and output_points is not None:
+            tp = len(expected_points & output_points)
+            self.tp += tp
+            self.fp += len(output_points) - tp
+            self.fn += len(expected_points) - tp
+
+    def merge(self, other):
+        "Adds the results of other (e.g. from another chunk)."
+        self.words += other.words
+        self.correct += other.correct
+        self.tp += other.tp
+        self.fp += other.fp
+        self.fn += other.fn
+        self.seconds += other.seconds
+        self.mismatches.extend(other.mismatches)
+        return self
+
+    def precision(self):
+        found = self.tp + self.fp
+        return found and float(self.tp) / found or 1.0
+
+    def recall(self):
+        expected = self.tp + self.fn
+        return expected and float(self.tp) / expected or 1.0
+
+    def words_per_sec(self):
+        "Returns the words per second (wall clock time)."
+        return self.wall and self.words / self.wall or 0.0
+
+    def as_dict(self):
+        return {"words": self.words,
+                "correct": self.correct,
+                "mismatches": len(self.mismatches),
+                "precision": self.precision(),
+                "recall": self.recall(),
+                "seconds": self.seconds,
+                "wall": self.wall,
+                "words_per_sec": self.words_per_sec(),
+               }
+
+    def write_diff(self, fname, encoding="utf-8"):
+        "Writes the mismatches to a text file, one per line."
+        with io.open(fname, "w", encoding=encoding) as f:
+            f.write(u"# word\texpected\toutput\n")
+            for word, expected, output in self.mismatches:
+                f.write(u"%s\t%s\t%s\n" % (word, expected, output))
+
+
+def check_pairs(hyphenator, pairs):
+    "Checks a list of (word, expected) tuples, returning a WordListReport."
+    report = WordListReport()
+    hyphenate = hyphenator.hyphenate
+    for word, expected in pairs:
+        start = timer()
+        hword = hyphenate(word)
+        report.seconds += timer() - start
+        report.add(word, expected, hyphenated_form(word, hword))
+    return report
+
+def _check_chunk(pairs):
+    "Checks a chunk of test cases in a worker process."
+    from wordaxe.corpus import worker_hyphenator
+    return check_pairs(worker_hyphenator(), pairs)
+
+
+def check_word_list(hyphenator, filenames, encoding="utf-8", explicit=False,
+                    processes=None, chunk_size=5000, diff_file=None):
+    """
+    Checks the hyphenator against the word lists in filenames.
+    If processes is given, the test cases are checked by that many
+    worker processes (see wordaxe.corpus.CorpusHyphenator).
+    If diff_file is given, the mismatches are written to it.
+    Returns a WordListReport.
+    """
+    if isinstance(filenames, (str, type(u""))):
+        filenames = [filenames]
+    pairs = (pair for fname in filenames for pair in read_word_list(fname, encoding, explicit))
+    start = timer()
+    if processes:
+        from wordaxe.corpus import CorpusHyphenator, chunked
+        report = WordListReport()
+        with CorpusHyphenator(hyphenator, processes=processes, chunk_size=chunk_size) as driver:
+            for chunk, chunk_report in driver.map_chunks(_check_chunk, chunked(pairs, chunk_size)):
+                report.merge(chunk_report)
+    else:
+        report = check_pairs(hyphenator, pairs)
+    report.wall = timer() - start
+    if diff_file:
+        report.write_diff(diff_file)
+    return report
+
+
+def main(args=None):
+    import json
+    import argparse
+    from wordaxe.benchmark import FACTORIES
+    parser = argparse.ArgumentParser(description="Check a hyphenator against word lists.")
+    parser.add_argument("hyphenator", choices=sorted(FACTORIES))
+    parser.add_argument("language")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("-e", "--encoding", default="utf-8")
+    parser.add_argument("-x", "--explicit", action="store_true", help="the lists use the ExplicitHyphenator format")
+    parser.add_argument("-p", "--processes", type=int, help="number of worker processes")
+    parser.add_argument("-d", "--diff", help="write the mismatches to this file")
+    options = parser.parse_args(args)
+    hyphenator = FACTORIES[options.hyphenator](options.language)
+    report = check_word_list(hyphenator, options.files, options.encoding, options.explicit,
+                             options.processes, diff_file=options.diff)
+    print(json.dumps(report.as_dict(), indent=2, sort_keys=True))
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    sys.exit(report.mismatches and 1 or 0)